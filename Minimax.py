@@ -1,4 +1,8 @@
 import math
+import time
+from bitboard import WINS, FULL
+from transposition import EXACT, LOWER, UPPER
+from local_table import code_of, EMPTY, CELLS
 
 X = "X"
 O = "O"
@@ -6,17 +10,18 @@ O = "O"
 def legal_moves(superboard):
     if superboard.next_board is not None:
         nb = superboard.next_board
-        if (not superboard.grid[nb].winner) and (not superboard.is_full(nb)):
-            for pos, cell in enumerate(superboard.grid[nb].grid):
-                if cell is None:
+        b = superboard.grid[nb]
+        if not b.winner:
+            empty = EMPTY[code_of(b.grid)]
+            if empty:
+                for pos in CELLS[empty]:
                     yield (nb, pos)
-            return
+                return
     for b_idx, b in enumerate(superboard.grid):
-        if b.winner or superboard.is_full(b_idx):
+        if b.winner:
             continue
-        for pos, cell in enumerate(b.grid):
-            if cell is None:
-                yield (b_idx, pos)
+        for pos in CELLS[EMPTY[code_of(b.grid)]]:
+            yield (b_idx, pos)
 
 def heuristic(superboard, ai_player=X):
     superboard.check_winner()
@@ -50,7 +55,9 @@ def minimax(superboard, maximizing=True, ai_player=X, depth=4, alpha=-math.inf,
         return (-100000, None)
 
     moves = list(legal_moves(superboard))
-    if depth == 0 or not moves:
+    if not moves:
+        return (0, None)  # every board won or full and no winner: a draw
+    if depth == 0:
         return (heuristic(superboard, ai_player), None)
 
     if maximizing:
@@ -91,3 +98,357 @@ def minimax(superboard, maximizing=True, ai_player=X, depth=4, alpha=-math.inf,
             if beta <= alpha:
                 break
         return (min_eval, best_move)
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its deadline has passed."""
+
+
+WIN = 100000
+INF = 10**9
+
+# move ordering tiers; history scores stay well below _PENALTY
+_HASH_MOVE = 1 << 30
+_WINS_BOARD = 1 << 28
+_BLOCKS_WIN = 1 << 27
+_KILLER = 1 << 26
+_PENALTY = 1 << 25
+
+ASPIRATION_WINDOW = 64
+
+
+_clock = time.perf_counter
+
+
+class SearchStats:
+    """
+    Opt-in counters and timings filled in by Searcher.search.
+
+    Pass one to Strategy.minimax_pick/timed_pick (or Searcher) and print it
+    afterwards. Counts accumulate until reset(); depth, score, pv and
+    elapsed describe the last completed iteration.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.nodes_by_ply = [0] * 82
+        self.evaluations = 0
+        self.terminals = 0
+        self.tt_cutoffs = 0
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.movegen_time = 0.0
+        self.order_time = 0.0
+        self.eval_time = 0.0
+        self.move_time = 0.0
+        self.depth = 0
+        self.score = None
+        self.pv = []
+        self.elapsed = 0.0
+        self._pv_table = [[] for _ in range(83)]
+
+    def enter(self, ply):
+        self.nodes_by_ply[ply] += 1
+        self._pv_table[ply] = []
+
+    def update_pv(self, ply, move):
+        self._pv_table[ply] = [move] + self._pv_table[ply + 1]
+
+    def timed_moves(self, pos):
+        """push/pop for pos that add their time to move_time."""
+        def push(board, position):
+            t = _clock()
+            pos.push(board, position)
+            self.move_time += _clock() - t
+
+        def pop():
+            t = _clock()
+            pos.pop()
+            self.move_time += _clock() - t
+
+        return push, pop
+
+    def cutoff(self, move_index):
+        self.beta_cutoffs += 1
+        if move_index == 0:
+            self.first_move_cutoffs += 1
+
+    def finish_iteration(self, depth, score, elapsed):
+        self.depth = depth
+        self.score = score
+        self.pv = list(self._pv_table[0])
+        self.elapsed = elapsed
+
+    @property
+    def nodes(self):
+        return sum(self.nodes_by_ply)
+
+    @property
+    def first_move_cutoff_rate(self):
+        return self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else 0.0
+
+    def as_dict(self):
+        last = max((i for i, n in enumerate(self.nodes_by_ply) if n), default=-1)
+        return {
+            'depth': self.depth,
+            'score': self.score,
+            'pv': self.pv,
+            'nodes': self.nodes,
+            'nodes_by_ply': self.nodes_by_ply[:last + 1],
+            'evaluations': self.evaluations,
+            'terminals': self.terminals,
+            'tt_cutoffs': self.tt_cutoffs,
+            'beta_cutoffs': self.beta_cutoffs,
+            'first_move_cutoff_rate': self.first_move_cutoff_rate,
+            'movegen_time': self.movegen_time,
+            'order_time': self.order_time,
+            'eval_time': self.eval_time,
+            'move_time': self.move_time,
+            'elapsed': self.elapsed,
+        }
+
+    def __str__(self):
+        d = self.as_dict()
+        nps = d['nodes'] / d['elapsed'] if d['elapsed'] else 0
+        pv = ' '.join(f"{b}:{p}" for b, p in d['pv'])
+        return '\n'.join([
+            f"depth {d['depth']}  score {d['score']}  nodes {d['nodes']}  "
+            f"time {d['elapsed'] * 1000:.1f}ms  nps {nps:.0f}",
+            f"nodes by ply: {d['nodes_by_ply']}",
+            f"evals {d['evaluations']}  terminals {d['terminals']}  tt cutoffs {d['tt_cutoffs']}  "
+            f"beta cutoffs {d['beta_cutoffs']} ({d['first_move_cutoff_rate']:.0%} on first move)",
+            f"movegen {d['movegen_time'] * 1000:.1f}ms  ordering {d['order_time'] * 1000:.1f}ms  "
+            f"eval {d['eval_time'] * 1000:.1f}ms  make/unmake {d['move_time'] * 1000:.1f}ms",
+            f"pv: {pv}",
+        ])
+
+
+class Searcher:
+    """
+    Negamax principal-variation search over a bitboard.BitBoard.
+
+    Scores are from the side to move and match minimax at
+    equal depth; only the order moves are tried in differs. Moves are
+    ordered hash move first, then moves that win a local board, moves
+    that block an opponent's local win, killer moves, and finally by the
+    history table. Moves that send the opponent to a won or full board
+    (a free choice) are pushed to the back of their group.
+    """
+
+    def __init__(self, tt=None, stats=None):
+        self.tt = tt
+        self.stats = stats
+        self.killers = [[None, None] for _ in range(82)]
+        self.history = [0] * 162
+        self.nodes = 0
+        self.deadline = None
+        self.time_limit = math.inf
+        self.best_move = None
+
+    def order_moves(self, pos, moves, ply, hash_move):
+        if pos.current_player == X:
+            own, opp, side = pos.xbits, pos.obits, 0
+        else:
+            own, opp, side = pos.obits, pos.xbits, 81
+        occ = own | opp
+        closed = pos.closed
+        killers = self.killers[ply]
+        history = self.history
+        scored = []
+        for mv in moves:
+            b, p = mv
+            shift = 9 * b
+            bit = 1 << p
+            wins = WINS[((own >> shift) & FULL) | bit]
+            if mv == hash_move:
+                score = _HASH_MOVE
+            elif wins:
+                score = _WINS_BOARD
+            elif WINS[((opp >> shift) & FULL) | bit]:
+                score = _BLOCKS_WIN
+            elif mv == killers[0] or mv == killers[1]:
+                score = _KILLER
+            else:
+                score = history[side + shift + p]
+            if closed >> p & 1 or (p == b and (wins or ((occ >> shift) & FULL) | bit == FULL)):
+                score -= _PENALTY
+            scored.append((score, mv))
+        scored.sort(key=_first, reverse=True)
+        return [mv for _, mv in scored]
+
+    def search(self, pos, depth, alpha=-INF, beta=INF, ply=0):
+        """
+        Return the negamax score; at ply 0 the best move is left in self.best_move.
+
+        With self.stats set, the search also fills in that SearchStats.
+        Instrumentation is chosen once per node (timed push/pop closures,
+        timed move generation), so a search without stats pays only a few
+        `stats is None` tests per node and nothing per child.
+        """
+        self.nodes += 1
+        stats = self.stats
+        if stats is not None:
+            stats.enter(ply)
+        if pos.winner is not None:
+            if stats is not None:
+                stats.terminals += 1
+            return WIN if pos.winner == pos.current_player else -WIN
+
+        tt = self.tt
+        hash_move = None
+        if tt is not None:
+            entry = tt.probe(pos.key)
+            if entry is not None:
+                e_depth, flag, score, hash_move = entry
+                if ply and e_depth >= depth and (
+                        flag == EXACT or (flag == LOWER and score >= beta)
+                        or (flag == UPPER and score <= alpha)):
+                    if stats is not None:
+                        stats.tt_cutoffs += 1
+                    return score
+
+        if stats is None:
+            moves = pos.legal_moves()
+            if not moves:
+                return 0
+            if depth == 0:
+                return pos.evaluate(pos.current_player)
+        else:
+            t = _clock()
+            moves = pos.legal_moves()
+            stats.movegen_time += _clock() - t
+            if not moves:
+                stats.terminals += 1
+                return 0
+            if depth == 0:
+                t = _clock()
+                score = pos.evaluate(pos.current_player)
+                stats.eval_time += _clock() - t
+                stats.evaluations += 1
+                return score
+
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        alpha0 = alpha
+        best = -INF
+        best_move = None
+        if stats is None:
+            push = pos.push
+            pop = pos.pop
+            ordered = self.order_moves(pos, moves, ply, hash_move)
+        else:
+            push, pop = stats.timed_moves(pos)
+            t = _clock()
+            ordered = self.order_moves(pos, moves, ply, hash_move)
+            stats.order_time += _clock() - t
+        for i, mv in enumerate(ordered):
+            push(mv[0], mv[1])
+            if i == 0:
+                score = -self.search(pos, depth - 1, -beta, -alpha, ply + 1)
+            else:
+                score = -self.search(pos, depth - 1, -alpha - 1, -alpha, ply + 1)
+                if alpha < score < beta:
+                    score = -self.search(pos, depth - 1, -beta, -alpha, ply + 1)
+            pop()
+            if score > best:
+                best = score
+                best_move = mv
+                if score > alpha:
+                    alpha = score
+                    if stats is not None:
+                        stats.update_pv(ply, mv)
+                    if alpha >= beta:
+                        if stats is not None:
+                            stats.cutoff(i)
+                        self._reward(pos, mv, depth, ply)
+                        break
+
+        if tt is not None:
+            flag = UPPER if best <= alpha0 else LOWER if best >= beta else EXACT
+            tt.store(pos.key, depth, flag, best, best_move)
+        if ply == 0:
+            self.best_move = best_move
+        return best
+
+    def _reward(self, pos, mv, depth, ply):
+        """Update killers and history after mv caused a beta cutoff."""
+        killers = self.killers[ply]
+        if mv != killers[0]:
+            killers[1] = killers[0]
+            killers[0] = mv
+        idx = (0 if pos.current_player == X else 81) + mv[0] * 9 + mv[1]
+        self.history[idx] += depth * depth
+        if self.history[idx] >= _PENALTY >> 1:
+            self.history = [h >> 1 for h in self.history]
+
+    def pick(self, pos, depth):
+        """Fixed-depth search with a full window. Returns (score, move)."""
+        start = _clock()
+        score = self.search(pos, depth)
+        if self.stats is not None:
+            self.stats.finish_iteration(depth, score, _clock() - start)
+        return score, self.best_move
+
+    def iterate(self, pos, time_ms=1000, max_depth=20, progress=None):
+        """
+        Iterative deepening with aspiration windows around the previous
+        iteration's score. Returns (score, move, depth) of the deepest
+        completed iteration; depth 1 always completes.
+
+        time_ms=None searches until max_depth unless another thread lowers
+        self.time_limit (and self.deadline) meanwhile, as ai_worker does to
+        stop or time a search. progress, if given, is called as
+        progress(depth, score, move, nodes) after every iteration.
+        """
+        start = time.perf_counter()
+        self.time_limit = math.inf if time_ms is None else start + time_ms / 1000
+        empty = 81 - (pos.xbits | pos.obits).bit_count()
+        score, move, reached = None, None, 0
+        for depth in range(1, min(max_depth, empty) + 1):
+            root = pos.clone()
+            self.deadline = None if depth == 1 else self.time_limit
+            try:
+                if score is None or abs(score) >= WIN or depth < 3:
+                    s = self.search(root, depth)
+                else:
+                    alpha, beta = score - ASPIRATION_WINDOW, score + ASPIRATION_WINDOW
+                    while True:
+                        s = self.search(root, depth, alpha, beta)
+                        if s <= alpha:
+                            alpha = -INF
+                        elif s >= beta:
+                            beta = INF
+                        else:
+                            break
+            except SearchTimeout:
+                break
+            score, move, reached = s, self.best_move, depth
+            if self.stats is not None:
+                self.stats.finish_iteration(depth, score, time.perf_counter() - start)
+            if progress is not None:
+                progress(depth, score, move, self.nodes)
+            if abs(score) >= WIN or time.perf_counter() > self.time_limit:
+                break
+        self.deadline = None
+        if self.stats is not None:
+            self.stats.elapsed = time.perf_counter() - start
+        return (score, move, reached)
+
+
+def _first(item):
+    return item[0]
+
+
+def iterative_deepening(pos, ai_player=X, time_ms=1000, max_depth=20, tt=None, stats=None):
+    """
+    Search pos at depth 1, 2, ... until time_ms runs out or max_depth is done.
+
+    Returns (score, move, depth) from the deepest search that completed,
+    with the score from ai_player's side. See Searcher.iterate.
+    """
+    score, move, depth = Searcher(tt, stats).iterate(pos, time_ms, max_depth)
+    if score is not None and pos.current_player != ai_player:
+        score = -score
+    return (score, move, depth)
@@ -0,0 +1,339 @@
+import math
+import multiprocessing
+import queue
+import threading
+import time
+
+from evaluation import EvalBoard
+from Minimax import Searcher, SearchStats
+from transposition import TranspositionTable
+from mcts import MCTSTree
+from opening_book import OpeningBook
+from endgame import Solver, playable_cells, search_score
+
+PREDICT_MS = 100     # search spent guessing the human's reply before pondering it
+PROGRESS_SECS = 0.1  # how often a running search reports its node count
+
+
+class _Job:
+    """A search or ponder running in the worker, and how to stop it."""
+
+    def __init__(self, kind, sid, pos, time_ms):
+        self.kind = kind
+        self.sid = sid
+        self.pos = pos
+        self.time_ms = time_ms
+        self.target = None   # the Searcher or MCTSTree doing the work
+        self.limit = None    # perf_counter time the work must stop at, once known
+        self.started = None  # when the pondered position's search began
+        self.hit = False
+        self.stopped = False
+        self.info = {}
+
+    def stop(self):
+        self.stopped = True
+        self.limit = 0.0
+
+    def ponderhit(self, time_ms):
+        """The human played the predicted move: finish within time_ms of pondering start."""
+        self.hit = True
+        self.time_ms = time_ms
+        if self.started is not None:
+            self.limit = self.started + time_ms / 1000
+
+    def enforce(self):
+        target = self.target
+        if target is None or self.limit is None:
+            return
+        target.time_limit = self.limit
+        if getattr(target, 'deadline', None) is not None:
+            target.deadline = self.limit
+
+
+def _listen(requests, results, jobs, state):
+    """Worker thread: route control messages and report progress while searching."""
+    while True:
+        try:
+            msg = requests.get(timeout=PROGRESS_SECS)
+        except queue.Empty:
+            msg = None
+        job = state.get('job')
+        if msg is not None:
+            kind = msg[0]
+            if kind == 'ponderhit':
+                if job is not None and job.sid == msg[1]:
+                    job.ponderhit(msg[2])
+            else:
+                # anything else supersedes the running and queued work
+                if job is not None:
+                    job.stop()
+                while not jobs.empty():
+                    jobs.get_nowait()
+                if kind in ('search', 'ponder'):
+                    jobs.put(_Job(*msg))
+                elif kind == 'quit':
+                    jobs.put(None)
+                    return
+        if job is not None:
+            job.enforce()
+            if job.target is not None and not job.stopped:
+                nodes = getattr(job.target, 'nodes', None)
+                if nodes is None:
+                    nodes = job.target.visits[0]
+                results.put(('progress', job.sid, dict(job.info, nodes=nodes)))
+
+
+def _worker_main(requests, results, engine, tt_mb, use_book, with_stats):
+    tt = TranspositionTable(size_mb=tt_mb)
+    tree = MCTSTree()
+    book = OpeningBook.open_default() if use_book else None
+    stats = SearchStats() if with_stats else None
+    solver = Solver()
+    jobs = queue.Queue()
+    state = {}
+    threading.Thread(target=_listen, args=(requests, results, jobs, state), daemon=True).start()
+
+    def book_move(job, pos):
+        entry = book.probe(pos) if book is not None else None
+        if entry is not None:
+            job.info.update(depth=entry[1], score=entry[2], book=True)
+            return entry[0]
+        return None
+
+    def timed_search(job, pos, time_ms):
+        def progress(depth, score, move, nodes):
+            job.info.update(depth=depth, score=score, move=move)
+
+        if engine == 'mcts':
+            tree.set_root(pos)
+            job.target = tree
+            job.enforce()
+            tree.run(time_ms=math.inf if time_ms is None else time_ms)
+            job.info['playouts'] = tree.last_playouts
+            return tree.best_move()
+        start = time.perf_counter()
+        job.target = solver  # a ponder's solve has an infinite deadline that _Job.enforce can cut
+        solved = solver.pick_move(pos, time_ms)
+        if solved is not None:
+            if solved[1] is None:
+                job.info.update(depth=0, nodes=0)
+            else:
+                job.info.update(depth=playable_cells(pos), score=search_score(solved[1]),
+                                nodes=solver.nodes)
+            return solved[0]
+        if time_ms is not None:
+            time_ms = max(1, time_ms - (time.perf_counter() - start) * 1000)
+        tt.new_search()
+        if stats is not None:
+            stats.reset()
+        searcher = Searcher(tt, stats)
+        job.target = searcher
+        _, move, _ = searcher.iterate(pos, time_ms, progress=progress)
+        job.info['nodes'] = searcher.nodes
+        return move
+
+    def run(job):
+        pos = job.pos
+        pos.check_winner()
+        start = time.perf_counter()
+        move = None
+        if job.kind == 'search':
+            move = book_move(job, pos)
+            if move is None:
+                move = timed_search(job, pos, job.time_ms)
+        elif engine == 'mcts':
+            # the tree grows under every reply, and the next search keeps that subtree
+            timed_search(job, pos, None)
+        else:
+            guess = timed_search(job, pos, PREDICT_MS)
+            if guess is not None and not job.stopped:
+                results.put(('predicted', job.sid, guess))
+                pos = pos.clone()
+                pos.push(*guess)
+                job.info = {}
+                job.target = None
+                job.started = time.perf_counter()
+                move = book_move(job, pos)
+                if move is None:
+                    move = timed_search(job, pos, job.time_ms if job.hit else None)
+        return {
+            'sid': job.sid,
+            'move': move,
+            'depth': job.info.get('depth'),
+            'score': job.info.get('score'),
+            'nodes': job.info.get('nodes', 0),
+            'playouts': job.info.get('playouts'),
+            'book': job.info.get('book', False),
+            'ponderhit': job.hit,
+            'stopped': job.stopped and not job.hit,
+            'seconds': time.perf_counter() - start,
+            'stats': str(stats) if stats is not None and job.kind == 'search' and move else None,
+        }
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        state['job'] = job
+        result = run(job)
+        state['job'] = None
+        results.put(('done', job.sid, result))
+
+
+class AIWorker:
+    """
+    Runs the AI in a background process so a UI stays responsive.
+
+    search(sb) starts a timed search (iterative deepening with the
+    worker's own transposition table and opening book, or MCTS), poll()
+    returns the result dict once it is ready and meanwhile keeps
+    `progress` (depth, score, nodes so far) up to date, cancel() drops the
+    search. The result has 'move', 'depth', 'score', 'nodes', 'book',
+    'ponderhit', 'seconds' and, with stats=True, a SearchStats printout.
+
+    ponder(sb), called once the AI has moved, keeps the worker busy while
+    the human thinks: it guesses the human's reply and searches the
+    position after it with no time limit. If the human plays the guess,
+    the next search() turns the ponder into the real search, which stops
+    time_ms after pondering began, so a long think by the human makes
+    the reply instant. Any other move stops the ponder and searches from
+    scratch, still with the transposition entries the ponder left. With
+    MCTS the ponder grows the tree under every reply instead.
+    """
+
+    def __init__(self, engine='minimax', time_ms=1000, tt_mb=16, book=True, stats=False):
+        ctx = multiprocessing.get_context('spawn')
+        self.time_ms = time_ms
+        self.engine = engine
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        self._process = ctx.Process(target=_worker_main, daemon=True,
+                                    args=(self._requests, self._results, engine, tt_mb, book, stats))
+        self._process.start()
+        self._sid = 0
+        self._awaiting = None
+        self._ready = None       # a result that was in hand when search() was called
+        self._pondering = None   # [sid, position pondered, key after the predicted reply]
+        self._ponder_result = None
+        self.progress = {}
+        self.last_result = None
+
+    @property
+    def busy(self):
+        return self._awaiting is not None
+
+    def _next_sid(self):
+        self._sid += 1
+        return self._sid
+
+    def search(self, sb):
+        """Start searching sb for the side to move."""
+        pos = EvalBoard.from_superboard(sb)
+        self.progress = {}
+        # the front ends don't poll while the human thinks, so the ponder's
+        # predicted reply may still be waiting in the queue
+        self._awaiting = None
+        self._drain()
+        pondering, self._pondering = self._pondering, None
+        if pondering is not None and pondering[2] == pos.key:
+            sid = self._awaiting = pondering[0]
+            result = self._ponder_result
+            if result is not None and result['sid'] == sid:
+                self._ready = result
+            else:
+                self._requests.put(('ponderhit', sid, self.time_ms))
+            return sid
+        sid = self._awaiting = self._next_sid()
+        self._requests.put(('search', sid, pos, self.time_ms))
+        return sid
+
+    def ponder(self, sb):
+        """Use the human's thinking time, see the class docstring."""
+        if sb.winner:
+            return
+        sid = self._next_sid()
+        pos = EvalBoard.from_superboard(sb)
+        self._pondering = [sid, pos, None]
+        self._ponder_result = None
+        self._requests.put(('ponder', sid, pos, self.time_ms))
+
+    def cancel(self):
+        """Stop whatever the worker is doing and forget the pending search."""
+        self._awaiting = None
+        self._ready = None
+        self._pondering = None
+        self.progress = {}
+        self._requests.put(('stop',))
+
+    def _handle(self, msg):
+        kind, sid, data = msg
+        pondering = self._pondering
+        if kind == 'predicted':
+            if pondering is not None and pondering[0] == sid:
+                child = pondering[1].clone()
+                child.push(*data)
+                pondering[2] = child.key
+        elif kind == 'progress':
+            if sid == self._awaiting:
+                self.progress = data
+        elif kind == 'done':
+            if sid == self._awaiting:
+                self._awaiting = None
+                self.last_result = data
+                return data
+            if pondering is not None and pondering[0] == sid:
+                self._ponder_result = data
+        return None
+
+    def _take_ready(self):
+        result, self._ready = self._ready, None
+        if result is not None:
+            self._awaiting = None
+            self.last_result = result
+        return result
+
+    def _drain(self):
+        """Handle the messages already queued; returns the awaited result if among them."""
+        while True:
+            try:
+                msg = self._results.get_nowait()
+            except queue.Empty:
+                return None
+            result = self._handle(msg)
+            if result is not None:
+                return result
+
+    def poll(self):
+        """The awaited result if it has arrived, else None. Never blocks."""
+        if self._ready is not None:
+            return self._take_ready()
+        return self._drain()
+
+    def wait(self, timeout=None, on_progress=None):
+        """Block until the awaited search is done and return its result."""
+        if self._ready is not None:
+            return self._take_ready()
+        end = None if timeout is None else time.perf_counter() + timeout
+        while self._awaiting is not None:
+            remaining = None if end is None else end - time.perf_counter()
+            if remaining is not None and remaining <= 0:
+                return None
+            try:
+                msg = self._results.get(timeout=min(remaining or 0.5, 0.5))
+            except queue.Empty:
+                if not self._process.is_alive():
+                    raise RuntimeError("AI worker process died")
+                continue
+            result = self._handle(msg)
+            if result is not None:
+                return result
+            if msg[0] == 'progress' and on_progress is not None and msg[1] == self._awaiting:
+                on_progress(self.progress)
+        return None
+
+    def close(self):
+        if self._process.is_alive():
+            self._requests.put(('quit',))
+            self._process.join(timeout=2)
+            if self._process.is_alive():
+                self._process.terminate()
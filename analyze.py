@@ -0,0 +1,153 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from game_engine import File, Strategy, TranspositionTable, SearchStats
+from Minimax import legal_moves
+
+
+def _file_positions(name, stream):
+    try:
+        for k, sb in enumerate(File.iter_boards(stream)):
+            yield f"{name}:{k}", sb
+    except ValueError as e:
+        raise ValueError(f"{name}: {e}") from e
+
+
+def iter_positions(paths):
+    """
+    Yield (source, SuperBoard) for every position in paths, in a fixed
+    order: files as given, directories by sorted walk, '-' for stdin.
+    source is "path:k" for the k-th position of that input. A file
+    without any position raises ValueError.
+    """
+    for path in paths:
+        if path == '-':
+            files = [('-', sys.stdin)]
+        elif os.path.isdir(path):
+            files = []
+            for root, dirs, names in os.walk(path):
+                dirs.sort()
+                files += [(os.path.join(root, n), None) for n in sorted(names)]
+        else:
+            files = [(path, None)]
+        for name, stream in files:
+            if stream is not None:
+                yield from _file_positions(name, stream)
+                continue
+            with open(name, encoding='utf-8') as f:
+                yield from _file_positions(name, f)
+
+
+def analyze_position(sb, time_ms=1000, max_depth=20, tt_mb=16):
+    """Search sb for the side to move. Returns a JSON-ready dict (score from the side to move)."""
+    result = {'position': File.to_compact(sb), 'move': None, 'score': None,
+              'depth': 0, 'nodes': 0, 'ms': 0.0}
+    if sb.winner or next(legal_moves(sb), None) is None:
+        result['winner'] = sb.winner
+        return result
+    stats = SearchStats()
+    start = time.perf_counter()
+    move, depth = Strategy.timed_pick(sb, time_ms=time_ms, max_depth=max_depth,
+                                      tt=TranspositionTable(size_mb=tt_mb), stats=stats)
+    result.update(move=list(move), score=stats.score, depth=depth, nodes=stats.nodes,
+                  ms=round((time.perf_counter() - start) * 1000, 1))
+    return result
+
+
+def _analyze_task(source, sb, time_ms, max_depth):
+    result = analyze_position(sb, time_ms, max_depth)
+    return dict(source=source, **result)
+
+
+def analyze_stream(positions, time_ms=1000, max_depth=20, workers=1):
+    """
+    Analyze (source, SuperBoard) pairs on a process pool and yield the
+    result dicts in input order. Only a few positions per worker are in
+    flight at once, so positions can come from an endless stream.
+    """
+    if workers <= 1:
+        for source, sb in positions:
+            yield _analyze_task(source, sb, time_ms, max_depth)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for source, sb in positions:
+            pending.append(pool.submit(_analyze_task, source, sb, time_ms, max_depth))
+            if len(pending) >= 4 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def completed_lines(path):
+    """
+    Number of complete JSON lines already in path. A torn last line left
+    by an interrupted run is cut off so appending continues cleanly.
+    """
+    if not os.path.exists(path):
+        return 0
+    done = 0
+    good = 0
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            done += 1
+            good += len(line)
+    if good < os.path.getsize(path):
+        os.truncate(path, good)
+    return done
+
+
+def run(paths, out, time_ms=1000, max_depth=20, workers=1, resume=True, log=None):
+    """Analyze every position in paths into the JSONL file out. Returns the number written."""
+    skip = completed_lines(out) if resume else 0
+    positions = iter_positions(paths)
+    for _ in range(skip):
+        if next(positions, None) is None:
+            break
+    if log and skip:
+        log(f"resuming after {skip} positions")
+    written = 0
+    with open(out, 'a' if resume else 'w', encoding='utf-8') as f:
+        for result in analyze_stream(positions, time_ms, max_depth, workers):
+            f.write(json.dumps(result) + '\n')
+            f.flush()
+            written += 1
+            if log and written % 100 == 0:
+                log(f"{skip + written} positions")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Analyze positions (board files, compact lines, directories, or - for stdin) to JSONL.")
+    parser.add_argument('inputs', nargs='+')
+    parser.add_argument('--out', default='analysis.jsonl')
+    parser.add_argument('--time-ms', type=int, default=1000, help="search time per position")
+    parser.add_argument('--max-depth', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--restart', action='store_true', help="overwrite --out instead of resuming")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        n = run(args.inputs, args.out, args.time_ms, args.max_depth, args.workers,
+                resume=not args.restart, log=lambda msg: print(msg, file=sys.stderr))
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"analyzed {n} positions in {time.perf_counter() - start:.1f}s, results in {args.out}",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+import argparse
+import time
+
+import numpy as np
+
+from game_engine import SuperBoard, WINNING_COMBINATIONS, X, O
+
+EMPTY, X_CELL, O_CELL = 0, 1, 2
+DRAW = 0
+ONGOING = -1
+FULL = 0x1FF
+
+LINES = np.array(WINNING_COMBINATIONS, dtype=np.intp)  # (8, 3) cell indices of each line
+
+# Lookup tables over 9-bit cell masks, built from LINES.
+BITS = (np.arange(512)[:, None] >> np.arange(9)) & 1 == 1          # (512, 9) mask -> cells
+WINS = BITS[:, LINES].all(axis=2).any(axis=1)                      # (512,) mask holds a line
+POPCOUNT = BITS.sum(axis=1).astype(np.int8)                        # (512,)
+NTH_BIT = np.zeros((512, 9), dtype=np.int8)                        # (512, 9) k-th set bit
+for _m in range(512):
+    _set = np.flatnonzero(BITS[_m])
+    NTH_BIT[_m, :len(_set)] = _set
+del _m, _set
+MOVE_BOARD = np.arange(81) // 9                                    # move -> board
+MOVE_POSITION = np.arange(81) % 9                                  # move -> position
+CELL_BIT = (1 << np.arange(9)).astype(np.uint16)                   # position/board -> bit
+
+
+FREE = 9  # next-board value meaning "play anywhere"; empty[:, FREE] is always 0
+
+
+class BatchSimulator:
+    """
+    N games of Super Tic-Tac-Toe held as NumPy arrays and stepped together.
+
+    Each local board is a pair of 9-bit masks, marks[0] (N, 9) for X and
+    marks[1] for O. empty (N, 10) holds the empty cells of every board
+    that is still open (zero once a board is won or full, and column 9 is
+    always zero so a free choice looks like a closed forced board).
+    owned (2, N) are the 9-bit masks of local boards won by each side,
+    open_boards (N,) counts boards still open, and side (N,) is 0 when X
+    is to move and 1 for O. Wins and move choice are lookups into tables
+    precomputed from WINNING_COMBINATIONS, so a step is a couple of dozen
+    whole-array operations. result is -1 while a game runs, then 0 for a
+    draw or 1/2 for an X/O win. Every move is logged as board*9 + position
+    so finished games can be replayed into SuperBoard objects.
+    """
+
+    def __init__(self, n_games, seed=None):
+        self.n = n_games
+        self.rng = np.random.default_rng(seed)
+        self.marks = np.zeros((2, n_games, 9), dtype=np.uint16)
+        self.empty = np.zeros((n_games, 10), dtype=np.uint16)
+        self.empty[:, :9] = FULL
+        self.owned = np.zeros((2, n_games), dtype=np.uint16)
+        self.open_boards = np.full(n_games, 9, dtype=np.int8)
+        self.forced = np.full(n_games, FREE, dtype=np.intp)
+        self.side = np.zeros(n_games, dtype=np.intp)
+        self.result = np.full(n_games, ONGOING, dtype=np.int8)
+        self.moves = np.zeros((n_games, 81), dtype=np.int8)
+        self.length = np.zeros(n_games, dtype=np.intp)
+
+    @property
+    def cells(self):
+        """(N, 81) array of 0/1/2 for empty/X/O, indexed board*9 + position."""
+        return (BITS[self.marks[0]] + 2 * BITS[self.marks[1]].astype(np.int8)).reshape(self.n, 81)
+
+    @property
+    def owners(self):
+        """(N, 9) array of local board winners, 0/1/2."""
+        return BITS[self.owned[0]] + 2 * BITS[self.owned[1]].astype(np.int8)
+
+    @property
+    def next_board(self):
+        """(N,) forced board of the last move, -1 before the first move."""
+        return np.where(self.forced == FREE, -1, self.forced)
+
+    @property
+    def player(self):
+        """(N,) side to move as 1 for X, 2 for O."""
+        return self.side + 1
+
+    def active(self):
+        return np.flatnonzero(self.result == ONGOING)
+
+    def legal_mask(self, games=None):
+        """(len(games), 81) bool mask of legal moves, indexed board*9 + position."""
+        if games is None:
+            games = np.arange(self.n)
+        empty = self.empty[games]
+        rows = np.arange(len(games))
+        forced = self.forced[games]
+        allowed = np.where((empty[rows, forced] != 0)[:, None],
+                           np.arange(10) == forced[:, None], True)
+        return BITS[empty * allowed][:, :9].reshape(len(games), 81)
+
+    def random_moves(self, games):
+        """Pick a uniformly random legal move for each game in games."""
+        rand = self.rng.random(len(games), dtype=np.float32)
+        nb = self.forced[games]
+        empty = self.empty.reshape(-1)[games * 10 + nb]
+        k = (rand * POPCOUNT[empty]).astype(np.intp)
+        moves = nb * 9 + NTH_BIT.reshape(-1)[empty * 9 + k]
+
+        free = empty == 0
+        if free.any():
+            rand = rand[free]
+            empty = self.empty[games[free], :9]
+            counts = POPCOUNT[empty].astype(np.intp)
+            cum = counts.cumsum(axis=1)
+            k = (rand * cum[:, -1]).astype(np.intp)
+            b = (cum <= k[:, None]).sum(axis=1)
+            rows = np.arange(len(b))
+            k -= cum[rows, b] - counts[rows, b]
+            moves[free] = b * 9 + NTH_BIT[empty[rows, b], k]
+        return moves
+
+    def step(self, games, moves):
+        """
+        Play moves (board*9 + position) in games and finalize any that end.
+        Moves are not validated; pick them from legal_mask() or random_moves().
+        """
+        games = np.asarray(games, dtype=np.intp)
+        moves = np.asarray(moves, dtype=np.intp)
+        n = self.n
+        board = MOVE_BOARD[moves]
+        position = MOVE_POSITION[moves]
+        side = self.side[games]
+        bit = CELL_BIT[position]
+        board_bit = CELL_BIT[board]
+
+        # flat views so each array is gathered and scattered once
+        marks = self.marks.reshape(-1)
+        cell = (side * n + games) * 9 + board
+        own = marks[cell] | bit
+        marks[cell] = own
+
+        length = self.length[games]
+        self.moves.reshape(-1)[games * 81 + length] = moves
+        self.length[games] = length + 1
+
+        won = WINS[own]
+        flat_empty = self.empty.reshape(-1)
+        slot = games * 10 + board
+        empty = (flat_empty[slot] & ~bit) * ~won
+        flat_empty[slot] = empty
+        open_boards = self.open_boards[games] - (empty == 0)
+        self.open_boards[games] = open_boards
+
+        owned_flat = self.owned.reshape(-1)
+        owner = side * n + games
+        owned = owned_flat[owner] | board_bit * won
+        owned_flat[owner] = owned
+
+        self.forced[games] = position
+        self.side[games] = 1 - side
+
+        winner = WINS[owned]
+        self.result[games[winner]] = side[winner] + 1
+        draw = ~winner & (open_boards == 0)
+        self.result[games[draw]] = DRAW
+
+    def run(self, policy=None):
+        """
+        Play every game to the end. policy(sim, games) returns a move per
+        game; the default plays uniformly random legal moves.
+        """
+        if policy is None:
+            policy = BatchSimulator.random_moves
+        games = self.active()
+        while len(games):
+            self.step(games, policy(self, games))
+            games = games[self.result[games] == ONGOING]
+        return self.result
+
+    def to_superboard(self, game):
+        """Replay game through SuperBoard.make_move, history included."""
+        sb = SuperBoard()
+        for mv in self.moves[game, :self.length[game]]:
+            board, position = divmod(int(mv), 9)
+            sb.make_move(position, board=board)
+        return sb
+
+    def histories(self, games=None):
+        """Yield (game, SuperBoard) for finished games."""
+        if games is None:
+            games = np.flatnonzero(self.result != ONGOING)
+        for g in games:
+            yield int(g), self.to_superboard(int(g))
+
+
+def play_random(n_games, batch_size=8192, seed=None):
+    """
+    Play n_games random games in batches of batch_size (small batches keep
+    the working set in cache) and yield each finished BatchSimulator.
+    """
+    rng = np.random.default_rng(seed)
+    while n_games > 0:
+        sim = BatchSimulator(min(batch_size, n_games), seed=rng.integers(2**63))
+        sim.run()
+        n_games -= sim.n
+        yield sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play random games in batches and report throughput.")
+    parser.add_argument('--games', type=int, default=100_000)
+    parser.add_argument('--batch', type=int, default=8192)
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = np.zeros(3, dtype=np.int64)
+    plies = 0
+    for sim in play_random(args.games, args.batch, args.seed):
+        results += np.bincount(sim.result, minlength=3)
+        plies += int(sim.length.sum())
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games in {elapsed:.2f}s ({args.games / elapsed:.0f} games/s), "
+          f"avg length {plies / args.games:.1f}")
+    print(f"{X}: {results[X_CELL]}  {O}: {results[O_CELL]}  draws: {results[DRAW]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# what each entry point costs to start; the last line adds back pandas,
+# which game_engine imported at load time before history_df imported it lazily
+CASES = [
+    ('game_engine', 'import game_engine'),
+    ('cli_game', 'import cli_game'),
+    ('game_engine + history_df', 'import game_engine; game_engine.SuperBoard().history_df()'),
+    ('game_engine + pandas (old startup)', 'import game_engine; import pandas'),
+]
+
+
+def time_import(code, runs):
+    """Median wall time in ms of `runs` fresh interpreters running code."""
+    timer = ("import time; _t = time.perf_counter(); " + code +
+             "; print((time.perf_counter() - _t) * 1000)")
+    times = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', timer], cwd=ROOT, check=True,
+                             capture_output=True, text=True).stdout
+        times.append(float(out.split()[-1]))
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time module imports in fresh interpreters.")
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    for name, code in CASES:
+        print(f"{name:38} {time_import(code, args.runs):8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
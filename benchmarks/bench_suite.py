@@ -0,0 +1,292 @@
+import argparse
+import cProfile
+import json
+import os
+import platform
+import pstats
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)  # run as a script from anywhere
+
+from game_engine import File, Strategy, X
+from Minimax import minimax, heuristic, legal_moves, Searcher
+from evaluation import EvalBoard
+from transposition import TranspositionTable
+from endgame import Solver
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+EXAMPLE = os.path.join(ROOT, 'assets', 'example.txt')
+THRESHOLD = 0.25  # a benchmark regresses when it is this much slower than the baseline
+
+# Fixed positions in File.to_compact notation. Never edit one in place:
+# baselines are only comparable over the same corpus.
+CORPUS = {
+    'opening/start': '........./........./........./........./........./........./........./........./......... X -',
+    'opening/example': 'XO..X...O/OX......./........./........./........./..O.X..../........./........./......... X 3',
+    'middle/24': '..OO...XO/.X....O../....O..X./X...XO.../..OOX..../X.......O/..X....../.O.....OX/X..X.X..O X 2',
+    'middle/36': '.X.OO..X./O.O....XX/...O.X..X/XOOX....X/..X...O.X/X..X...O./O......X./.X..OOXOO/.O..XOOXO X 6',
+    # mid-game with two legal moves: must go to the search, not the endgame solver
+    'middle/forced': '.OX....OO/XXXOOXXOO/XOO.X..XO/OX.OX...X/.OO.XXO../.O.....OO/.XXO.X.../.X.XO.O.X/XOOX..OXX X 8',
+    'end/50': 'OXO.X.X.X/...XXX..X/XXOOO..XX/.OX..XXO./OO..OXOXO/OOXOX..../X.OX...O./..OOX.OXO/OOX.OO..X X 4',
+    'end/56': '.OX.XX.OO/XXXOOXXOO/XOO.X..XO/OX.OX...X/OOO.XXO.O/OOO....OO/.XXO.X.../.X.XO.O.X/XOOXXXOXX X 2',
+}
+DEPTHS = (2, 3, 4, 5, 6)
+TT_MB = 4  # a fresh table per run, so every sample searches the same tree
+
+
+def corpus():
+    return [(name, File.parse_compact(line)) for name, line in CORPUS.items()]
+
+
+# Each benchmark is (name, setup): setup() returns (run, ops) where run()
+# does ops operations once; only run() is timed, and times are per op.
+
+def bench_make_move():
+    boards = corpus()
+
+    def setup():
+        work = []
+        for _, sb in boards:
+            for b, p in list(legal_moves(sb))[:8]:
+                work.append((sb.clone(), b, p))
+
+        def run():
+            for sb, b, p in work:
+                sb.make_move(p, board=b)
+        return run, len(work)
+    return setup
+
+
+def bench_clone():
+    boards = [sb for _, sb in corpus()]
+
+    def setup():
+        def run():
+            for sb in boards:
+                sb.clone()
+        return run, len(boards)
+    return setup
+
+
+def bench_legal_moves():
+    boards = [sb for _, sb in corpus()]
+
+    def setup():
+        def run():
+            for sb in boards:
+                list(legal_moves(sb))
+        return run, len(boards)
+    return setup
+
+
+def bench_heuristic():
+    boards = [sb for _, sb in corpus()]
+
+    def setup():
+        def run():
+            for sb in boards:
+                heuristic(sb, X)
+        return run, len(boards)
+    return setup
+
+
+def bench_parse_board():
+    with open(EXAMPLE, encoding='utf-8') as f:
+        lines = f.read().splitlines()
+
+    def setup():
+        def run():
+            File.parse_board(lines)
+        return run, 1
+    return setup
+
+
+def bench_minimax(name, sb, depth):
+    def setup():
+        pos = sb.clone()
+
+        def run():
+            minimax(pos, True, pos.current_player, depth)
+        return run, 1
+    return setup
+
+
+def bench_searcher(sb, depth):
+    def setup():
+        pos = EvalBoard.from_superboard(sb)
+        pos.check_winner()
+        searcher = Searcher(TranspositionTable(size_mb=TT_MB))
+
+        def run():
+            searcher.pick(pos, depth)
+        return run, 1
+    return setup
+
+
+def bench_minimax_pick(sb, depth):
+    """What the AI plays: EvalBoard, transposition table and endgame solver."""
+    def setup():
+        tt = TranspositionTable(size_mb=TT_MB)
+        solver = Solver()
+
+        def run():
+            Strategy.minimax_pick(sb, depth=depth, tt=tt, solver=solver)
+        return run, 1
+    return setup
+
+
+def benchmarks(max_depth=DEPTHS[-1]):
+    out = [
+        ('SuperBoard.make_move', bench_make_move()),
+        ('SuperBoard.clone', bench_clone()),
+        ('Minimax.legal_moves', bench_legal_moves()),
+        ('Minimax.heuristic', bench_heuristic()),
+        ('File.parse_board', bench_parse_board()),
+    ]
+    for depth in DEPTHS:
+        if depth > max_depth:
+            break
+        for name, sb in corpus():
+            out.append((f"minimax/d{depth}/{name}", bench_minimax(name, sb, depth)))
+            out.append((f"searcher/d{depth}/{name}", bench_searcher(sb, depth)))
+            out.append((f"minimax_pick/d{depth}/{name}", bench_minimax_pick(sb, depth)))
+    return out
+
+
+def measure(setup, warmup, repeat, min_time):
+    """
+    Seconds per op of each of `repeat` samples, after `warmup` untimed
+    samples. A sample loops run() until it has taken at least min_time.
+    """
+    def sample():
+        elapsed = 0.0
+        done = 0
+        while True:
+            run, ops = setup()  # fresh state each loop, e.g. unplayed boards for make_move
+            start = time.perf_counter()
+            run()
+            elapsed += time.perf_counter() - start
+            done += ops
+            if elapsed >= min_time:
+                return elapsed / done
+    for _ in range(warmup):
+        sample()
+    return [sample() for _ in range(repeat)]
+
+
+def peak_memory(setup):
+    """Peak bytes traced by tracemalloc during one run()."""
+    run, _ = setup()
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(select=None, warmup=1, repeat=5, min_time=0.05, max_depth=DEPTHS[-1], memory=False,
+              log=None):
+    """{name: stats dict} for every benchmark whose name contains select."""
+    results = {}
+    for name, setup in benchmarks(max_depth):
+        if select and select not in name:
+            continue
+        times = measure(setup, warmup, repeat, min_time)
+        stats = {
+            'median_us': statistics.median(times) * 1e6,
+            'min_us': min(times) * 1e6,
+            'mean_us': statistics.fmean(times) * 1e6,
+            'stdev_us': statistics.stdev(times) * 1e6 if len(times) > 1 else 0.0,
+            'repeat': len(times),
+        }
+        if memory:
+            stats['peak_kb'] = peak_memory(setup) / 1024
+        results[name] = stats
+        if log:
+            log(f"{name:42} {stats['median_us']:12.1f} us  (min {stats['min_us']:.1f}, "
+                f"sd {stats['stdev_us']:.1f})" + (f"  peak {stats['peak_kb']:.0f} KB" if memory else ""))
+    return results
+
+
+def environment():
+    return {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'machine': platform.machine(), 'system': platform.system()}
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    [(name, baseline us, current us, ratio)] of benchmarks slower than
+    baseline by more than threshold. The fastest sample is compared, as
+    the one least disturbed by the rest of the machine.
+    """
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = stats['min_us'] / base['min_us']
+        if ratio > 1 + threshold:
+            regressions.append((name, base['min_us'], stats['min_us'], ratio))
+    return regressions
+
+
+def profile(select, max_depth, top=25):
+    """Print the cProfile hot spots of every benchmark matching select, run once each."""
+    profiler = cProfile.Profile()
+    for name, setup in benchmarks(max_depth):
+        if select and select not in name:
+            continue
+        run, _ = setup()
+        profiler.runcall(run)
+    pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the engine's hot paths and compare against a baseline.")
+    parser.add_argument('-k', dest='select', help="only benchmarks whose name contains this")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--min-time', type=float, default=0.05, help="seconds per sample")
+    parser.add_argument('--max-depth', type=int, default=DEPTHS[-1], help="deepest minimax benchmark")
+    parser.add_argument('--quick', action='store_true', help="one short sample each, minimax up to depth 3")
+    parser.add_argument('--save', nargs='?', const=BASELINE, help="write results as the baseline")
+    parser.add_argument('--compare', nargs='?', const=BASELINE, help="fail if slower than this baseline")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    parser.add_argument('--profile', action='store_true', help="print cProfile hot spots instead of timing")
+    parser.add_argument('--memory', action='store_true', help="also record tracemalloc peak memory")
+    args = parser.parse_args()
+    if args.quick:
+        args.repeat, args.warmup, args.min_time = 1, 0, 0.0
+        args.max_depth = min(args.max_depth, 3)
+
+    if args.profile:
+        profile(args.select, args.max_depth)
+        return 0
+
+    results = run_suite(args.select, args.warmup, args.repeat, args.min_time, args.max_depth,
+                        args.memory, log=print)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, indent=1, sort_keys=True)
+        print(f"baseline written to {args.save}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('environment') != environment():
+            print(f"warning: baseline is from {baseline.get('environment')}, this is {environment()}")
+        regressions = compare(results, baseline['results'], args.threshold)
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before:.1f} us -> {after:.1f} us ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"no regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+import random
+
+X = "X"
+O = "O"
+
+WINNING_COMBINATIONS = [
+    [0, 1, 2], [3, 4, 5], [6, 7, 8],
+    [0, 3, 6], [1, 4, 7], [2, 5, 8],
+    [0, 4, 8], [2, 4, 6]
+]
+
+FULL = 0x1FF  # all nine cells of a 3x3 board
+
+LINE_MASKS = [(1 << a) | (1 << b) | (1 << c) for a, b, c in WINNING_COMBINATIONS]
+
+# WINS[m] is truthy when the 9-bit mask m contains a winning line.
+WINS = bytes(any(m & line == line for line in LINE_MASKS) for m in range(512))
+
+# MOVES[b][m] lists the (board, position) pairs for the empty-cell mask m of board b.
+MOVES = [
+    [tuple((b, p) for p in range(9) if m >> p & 1) for m in range(512)]
+    for b in range(9)
+]
+
+# SPAN[m] is the 81-bit mask covering every local board whose bit is set in m.
+SPAN = [
+    sum(FULL << (9 * b) for b in range(9) if m >> b & 1)
+    for m in range(512)
+]
+
+# Zobrist keys: one per (cell, player), one per forced next_board (index 0
+# is "free choice") and one for O to move. Seeded so hashes are stable
+# across processes and runs.
+_rng = random.Random(0x5EED)
+ZOBRIST_X = [_rng.getrandbits(64) for _ in range(81)]
+ZOBRIST_O = [_rng.getrandbits(64) for _ in range(81)]
+ZOBRIST_NEXT = [_rng.getrandbits(64) for _ in range(10)]
+ZOBRIST_O_TO_MOVE = _rng.getrandbits(64)
+del _rng
+
+# flags packed into BitBoard undo entries above the cell index and next_board
+_OWNED = 1 << 11
+_CLOSED = 1 << 12
+_WON = 1 << 13
+
+
+class BitBoard:
+    """
+    Compact SuperBoard position.
+
+    Cells live in two 81-bit masks (bit board*9 + position), local board
+    owners in two 9-bit masks, and `closed` marks boards that are won or
+    full. Cloning copies a handful of ints. `key` is the Zobrist hash of
+    the cells, next_board and side to move, kept up to date by push()/pop().
+    """
+    __slots__ = ('xbits', 'obits', 'xowned', 'oowned', 'closed',
+                 'current_player', 'next_board', 'winner', 'key', '_stack')
+
+    def __init__(self):
+        self.xbits = 0
+        self.obits = 0
+        self.xowned = 0
+        self.oowned = 0
+        self.closed = 0
+        self.current_player = X
+        self.next_board = None
+        self.winner = None
+        self.key = ZOBRIST_NEXT[0]
+        self._stack = []
+
+    @classmethod
+    def from_superboard(cls, sb):
+        pos = cls()
+        for b_idx, board in enumerate(sb.grid):
+            for p, cell in enumerate(board.grid):
+                if cell == X:
+                    pos.xbits |= 1 << (b_idx * 9 + p)
+                elif cell == O:
+                    pos.obits |= 1 << (b_idx * 9 + p)
+            if board.winner == X:
+                pos.xowned |= 1 << b_idx
+            elif board.winner == O:
+                pos.oowned |= 1 << b_idx
+        pos.current_player = sb.current_player
+        pos.next_board = sb.next_board
+        pos.winner = sb.winner
+        pos._refresh_closed()
+        pos.key = pos.compute_key()
+        return pos
+
+    def compute_key(self):
+        """Zobrist hash of the position computed from scratch."""
+        key = ZOBRIST_NEXT[0 if self.next_board is None else self.next_board + 1]
+        if self.current_player == O:
+            key ^= ZOBRIST_O_TO_MOVE
+        for idx in range(81):
+            if self.xbits >> idx & 1:
+                key ^= ZOBRIST_X[idx]
+            elif self.obits >> idx & 1:
+                key ^= ZOBRIST_O[idx]
+        return key
+
+    def _refresh_closed(self):
+        closed = self.xowned | self.oowned
+        occ = self.xbits | self.obits
+        for b in range(9):
+            if (occ >> (9 * b)) & FULL == FULL:
+                closed |= 1 << b
+        self.closed = closed
+
+    def cell(self, board, position):
+        bit = 1 << (board * 9 + position)
+        if self.xbits & bit:
+            return X
+        if self.obits & bit:
+            return O
+        return None
+
+    def board_winner(self, board):
+        if self.xowned >> board & 1:
+            return X
+        if self.oowned >> board & 1:
+            return O
+        return None
+
+    def is_full(self, board_index):
+        return ((self.xbits | self.obits) >> (9 * board_index)) & FULL == FULL
+
+    def legal_moves(self):
+        """Same order and rules as Minimax.legal_moves."""
+        occ = self.xbits | self.obits
+        closed = self.closed
+        nb = self.next_board
+        if nb is not None and not closed >> nb & 1:
+            return list(MOVES[nb][~(occ >> (9 * nb)) & FULL])
+        moves = []
+        for b in range(9):
+            if not closed >> b & 1:
+                moves.extend(MOVES[b][~(occ >> (9 * b)) & FULL])
+        return moves
+
+    def make_move(self, position, board=None):
+        if board is None:
+            if self.next_board is not None:
+                board = self.next_board
+            else:
+                raise ValueError("You must specify which board to play in.")
+        self.push(board, position)
+
+    def push(self, board, position):
+        """
+        Play a move that pop() can take back.
+
+        Only the changed state is saved, packed into one int: the cell index,
+        the previous next_board and whether this move won the local board,
+        closed it, or won the game. The side to move simply toggles back.
+        """
+        shift = 9 * board
+        idx = shift + position
+        bit = 1 << idx
+        occ = self.xbits | self.obits
+        if occ & bit:
+            raise ValueError("Board position taken up!")
+
+        nb = 0 if self.next_board is None else self.next_board + 1
+        undo = idx | nb << 7
+        zkeys = ZOBRIST_NEXT[nb] ^ ZOBRIST_NEXT[position + 1] ^ ZOBRIST_O_TO_MOVE
+        board_bit = 1 << board
+        if self.current_player == X:
+            self.key ^= ZOBRIST_X[idx] ^ zkeys
+            self.xbits |= bit
+            if WINS[(self.xbits >> shift) & FULL] and not (self.xowned | self.oowned) & board_bit:
+                self.xowned |= board_bit
+                undo |= _OWNED
+                if WINS[self.xowned] and self.winner is None:
+                    self.winner = X
+                    undo |= _WON
+            self.current_player = O
+        else:
+            self.key ^= ZOBRIST_O[idx] ^ zkeys
+            self.obits |= bit
+            if WINS[(self.obits >> shift) & FULL] and not (self.xowned | self.oowned) & board_bit:
+                self.oowned |= board_bit
+                undo |= _OWNED
+                if WINS[self.oowned] and self.winner is None:
+                    self.winner = O
+                    undo |= _WON
+            self.current_player = X
+
+        if not self.closed & board_bit and (
+                undo & _OWNED or ((occ | bit) >> shift) & FULL == FULL):
+            self.closed |= board_bit
+            undo |= _CLOSED
+        self.next_board = position
+        self._stack.append(undo)
+
+    def pop(self):
+        """Take back the last push()."""
+        undo = self._stack.pop()
+        idx = undo & 0x7F
+        board_bit = 1 << (idx // 9)
+        nb = (undo >> 7) & 0xF
+        zkeys = ZOBRIST_NEXT[nb] ^ ZOBRIST_NEXT[idx % 9 + 1] ^ ZOBRIST_O_TO_MOVE
+        self.next_board = None if nb == 0 else nb - 1
+        mask = ~(1 << idx)
+        if self.current_player == O:
+            self.current_player = X
+            self.key ^= ZOBRIST_X[idx] ^ zkeys
+            self.xbits &= mask
+            if undo & _OWNED:
+                self.xowned &= ~board_bit
+        else:
+            self.current_player = O
+            self.key ^= ZOBRIST_O[idx] ^ zkeys
+            self.obits &= mask
+            if undo & _OWNED:
+                self.oowned &= ~board_bit
+        if undo & _CLOSED:
+            self.closed &= ~board_bit
+        if undo & _WON:
+            self.winner = None
+
+    def check_winner(self):
+        if WINS[self.xowned]:
+            self.winner = X
+            return True
+        if WINS[self.oowned]:
+            self.winner = O
+            return True
+        return False
+
+    def clone(self):
+        pos = self.__class__.__new__(self.__class__)
+        pos.xbits = self.xbits
+        pos.obits = self.obits
+        pos.xowned = self.xowned
+        pos.oowned = self.oowned
+        pos.closed = self.closed
+        pos.current_player = self.current_player
+        pos.next_board = self.next_board
+        pos.winner = self.winner
+        pos.key = self.key
+        pos._stack = list(self._stack)
+        return pos
+
+    def evaluate(self, ai_player=X):
+        """Bit-parallel equivalent of Minimax.heuristic."""
+        if self.winner == ai_player:
+            return 100000
+        elif self.winner is not None:
+            return -100000
+
+        open_cells = SPAN[~(self.xowned | self.oowned) & FULL]
+        score = (500 * (self.xowned.bit_count() - self.oowned.bit_count())
+                 + (self.xbits & open_cells).bit_count()
+                 - (self.obits & open_cells).bit_count())
+        return score if ai_player == X else -score
@@ -1,6 +1,10 @@
-from game_engine import SuperBoard, Strategy, X, O
+from game_engine import SuperBoard, X, O
+from ai_worker import AIWorker
+import argparse
 import sys
 
+AI_TIME_MS = 1000
+
 def get_player_move(sb: SuperBoard):
     """Ask the human player for a valid move."""
     while True:
@@ -24,7 +28,7 @@ def get_player_move(sb: SuperBoard):
             print("Invalid input. Please enter integers between 0–8.")
 
 
-def main():
+def main(engine='minimax', show_stats=False):
     print("=== Super Tic Tac Toe ===")
     print("You are 'O'. The AI is 'X'.")
     print("Boards and positions are indexed 0–8 like a 3×3 grid.")
@@ -32,17 +36,42 @@ def main():
 
     sb = SuperBoard()
     ai_player = X
+    # searches run in a background process, which ponders while you type
+    worker = AIWorker(engine=engine, time_ms=AI_TIME_MS, stats=show_stats)
+    try:
+        play(sb, ai_player, worker)
+    finally:
+        worker.close()
+
+    print("\nGame history:")
+    print(sb.history_df())
 
+
+def play(sb, ai_player, worker):
+    """Alternate human and AI moves until the game ends."""
     while not sb.winner:
         print(sb)
         print()
 
-        if sb.current_player == O:
+        if sb.current_player != ai_player:
+            worker.ponder(sb)
             b_idx, pos = get_player_move(sb)
         else:
             print("AI thinking...")
-            b_idx, pos = Strategy.minimax_pick(sb, depth=4, ai_player=ai_player)
-            print(f"AI plays on board {b_idx}, position {pos}.\n")
+            worker.search(sb)
+            result = worker.wait()
+            b_idx, pos = result['move']
+            if result['playouts'] is not None:
+                print(f"AI plays on board {b_idx}, position {pos} "
+                      f"({result['playouts']} playouts, {result['playouts'] / result['seconds']:.0f}/s).\n")
+            else:
+                source = "from the book" if result['book'] else f"searched {result['depth']} plies"
+                if result['ponderhit']:
+                    source += ", pondered"
+                print(f"AI plays on board {b_idx}, position {pos} ({source}).\n")
+                if result['stats']:
+                    print(result['stats'])
+                    print()
 
         try:
             sb.make_move(pos, board=b_idx)
@@ -60,12 +89,13 @@ def main():
             print("It's a draw!")
             break
 
-    print("\nGame history:")
-    print(sb.history_df())
-
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play Super Tic Tac Toe against the AI.")
+    parser.add_argument('--engine', choices=['minimax', 'mcts'], default='minimax')
+    parser.add_argument('--stats', action='store_true', help="print search statistics after each AI move")
+    args = parser.parse_args()
     try:
-        main()
+        main(engine=args.engine, show_stats=args.stats)
     except KeyboardInterrupt:
         sys.exit("\nGame exited.")
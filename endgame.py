@@ -0,0 +1,190 @@
+import argparse
+import math
+import time
+
+from bitboard import SPAN, FULL
+from Minimax import Searcher, WIN
+
+# Solver scores, from the side to move: MATE - n is a win n plies from
+# the end, -(MATE - n) a loss n plies from the end, 0 a draw.
+MATE = 1000
+MAX_CELLS = 18          # solve when at most this many cells are still playable
+MAX_NODES = 50_000      # give up (and let the heuristic search run) after this many nodes
+SOLVE_SHARE = 0.25      # fraction of a timed move a solve may use before the search takes over
+CACHE_SIZE = 1 << 16    # entries kept before the cache is cleared
+
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class EndgameAborted(Exception):
+    """Raised when a solve runs past its node budget or deadline."""
+
+
+def playable_cells(pos):
+    """Empty cells on boards that are neither won nor full."""
+    return (~(pos.xbits | pos.obits) & SPAN[~pos.closed & FULL]).bit_count()
+
+
+def describe(value):
+    """('win' | 'loss' | 'draw', plies to the end) for a solver score."""
+    if value > 0:
+        return 'win', MATE - value
+    if value < 0:
+        return 'loss', MATE + value
+    return 'draw', None
+
+
+def search_score(value):
+    """A solver score on the Searcher scale: WIN, -WIN or 0."""
+    return WIN if value > 0 else -WIN if value < 0 else 0
+
+
+class Solver:
+    """
+    Exact alpha-beta search to the end of the game for late positions.
+
+    Positions with at most max_cells playable cells are searched without
+    a depth limit, so the result is a proven win, loss or draw with the
+    distance to the end: the fastest win and the slowest loss are
+    preferred. A position where every local board is won or full without
+    a global winner is a draw.
+
+    Results are kept in a dict keyed by Zobrist key, as exact values or
+    alpha-beta bounds with distances counted from that position, so the
+    same cache serves every later query of the game (and of other games).
+    A solve that needs more than max_nodes nodes, or runs past its
+    deadline, raises EndgameAborted; what it proved so far stays cached.
+    """
+
+    def __init__(self, max_cells=MAX_CELLS, max_nodes=MAX_NODES, cache_size=CACHE_SIZE):
+        self.max_cells = max_cells
+        self.max_nodes = max_nodes
+        self.cache_size = cache_size
+        self.cache = {}
+        self.nodes = 0
+        self.deadline = None
+        self._orderer = Searcher()
+
+    def should_solve(self, pos):
+        return pos.winner is None and playable_cells(pos) <= self.max_cells
+
+    def solve(self, pos, deadline=None):
+        """
+        Return (value, move) for the side to move in pos (a BitBoard,
+        left unchanged). value is a solver score, see describe(); move is
+        None when the game is over.
+        """
+        self.nodes = 0
+        self.deadline = deadline
+        if len(self.cache) > self.cache_size:
+            self.cache.clear()
+        value = self._search(pos, -MATE, MATE, 0)
+        entry = self.cache.get(pos.key)
+        return value, entry[2] if entry is not None else None
+
+    def pick(self, pos, deadline=None):
+        """(move, value) if pos is late enough and solves in budget, else None."""
+        if not self.should_solve(pos):
+            return None
+        try:
+            value, move = self.solve(pos, deadline)
+        except EndgameAborted:
+            return None
+        if move is None:
+            return None
+        return move, value
+
+    def pick_move(self, pos, time_ms=None):
+        """
+        The endgame step of choosing a move: (move, value) to play, or None
+        to search as usual. A lone legal move comes back with value None
+        and no solve. A late position gets SOLVE_SHARE of time_ms, so an
+        aborted solve leaves most of the move's time to the search;
+        time_ms None limits it only by max_nodes and by a deadline set
+        from another thread.
+        """
+        if pos.winner is not None:
+            return None
+        moves = pos.legal_moves()
+        if len(moves) == 1:
+            return moves[0], None
+        if not self.should_solve(pos):
+            return None
+        deadline = math.inf if time_ms is None else time.perf_counter() + time_ms * SOLVE_SHARE / 1000
+        return self.pick(pos, deadline)
+
+    def _search(self, pos, alpha, beta, ply):
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise EndgameAborted()
+        if not self.nodes & 1023 and self.deadline is not None and time.perf_counter() > self.deadline:
+            raise EndgameAborted()
+        if pos.winner is not None:
+            return -(MATE - ply)  # the previous move won
+        moves = pos.legal_moves()
+        if not moves:
+            return 0
+
+        key = pos.key
+        hash_move = None
+        entry = self.cache.get(key)
+        if entry is not None:
+            flag, value, hash_move = entry
+            # cached distances are from that position; make them from the root
+            if value > 0:
+                value -= ply
+            elif value < 0:
+                value += ply
+            if flag == EXACT or (flag == LOWER and value >= beta) or (flag == UPPER and value <= alpha):
+                return value
+
+        alpha0 = alpha
+        best = -MATE
+        best_move = None
+        for mv in self._orderer.order_moves(pos, moves, ply, hash_move):
+            pos.push(mv[0], mv[1])
+            try:
+                value = -self._search(pos, -beta, -alpha, ply + 1)
+            finally:
+                pos.pop()
+            if value > best:
+                best = value
+                best_move = mv
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+
+        flag = UPPER if best <= alpha0 else LOWER if best >= beta else EXACT
+        stored = best + ply if best > 0 else best - ply if best < 0 else 0
+        self.cache[key] = (flag, stored, best_move)
+        return best
+
+
+def main():
+    from game_engine import File
+
+    parser = argparse.ArgumentParser(description="Solve late-game positions exactly.")
+    parser.add_argument('path', help="board file or compact positions, one per line")
+    parser.add_argument('--max-nodes', type=int, default=10_000_000)
+    args = parser.parse_args()
+    solver = Solver(max_nodes=args.max_nodes)
+    with open(args.path, encoding='utf-8') as f:
+        boards = list(File.iter_boards(f))
+    for sb in boards:
+        pos = sb.to_bitboard()
+        pos.check_winner()
+        start = time.perf_counter()
+        try:
+            value, move = solver.solve(pos)
+        except EndgameAborted:
+            print(f"{File.to_compact(sb)}: not solved within {args.max_nodes} nodes")
+            continue
+        result, plies = describe(value)
+        end = f" in {plies} plies" if plies is not None else ""
+        print(f"{File.to_compact(sb)}: {sb.current_player} {result}s{end}, move {move}, "
+              f"{solver.nodes} nodes, {time.perf_counter() - start:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+import argparse
+import math
+import sys
+import threading
+import time
+
+from evaluation import EvalBoard
+from endgame import Solver, playable_cells, search_score
+from game_engine import File
+from Minimax import Searcher
+from opening_book import OpeningBook
+from transposition import TranspositionTable
+
+NAME = "super-tic-tac-toe"
+MAX_DEPTH = 81
+
+
+def format_move(move):
+    """Protocol move: two digits, board then position, e.g. "40"."""
+    return f"{move[0]}{move[1]}"
+
+
+def parse_move(text):
+    if len(text) != 2 or not text.isdigit() or '9' in text:
+        raise ValueError(f"bad move {text!r}")
+    return int(text[0]), int(text[1])
+
+
+class _Search:
+    """One `go`: the thread running it and how to stop or time it."""
+
+    def __init__(self, time_ms, wait):
+        self.time_ms = time_ms
+        self.wait = wait          # hold bestmove until stop/ponderhit (go infinite, go ponder)
+        self.release = threading.Event()
+        self.stopped = False
+        self.limit = None         # perf_counter time the search must end by, once known
+        self.target = None        # the Searcher or Solver doing the work
+        self.thread = None
+        if not wait:
+            self.release.set()
+
+    def enforce(self):
+        target = self.target
+        if target is None or self.limit is None:
+            return
+        target.time_limit = self.limit
+        if target.deadline is not None:
+            target.deadline = self.limit
+
+    def remaining_ms(self):
+        """Milliseconds left before limit, or None while there is no limit."""
+        if self.limit is None:
+            return None
+        return max(1, (self.limit - time.perf_counter()) * 1000)
+
+    def stop(self):
+        self.stopped = True
+        self.limit = 0.0
+        self.enforce()
+        self.release.set()
+
+    def ponderhit(self):
+        self.limit = math.inf if self.time_ms is None else time.perf_counter() + self.time_ms / 1000
+        self.enforce()
+        self.release.set()
+
+
+class Engine:
+    """
+    UCI-style engine speaking a line protocol, for driving the AI from
+    another process. One Engine keeps its transposition table, endgame
+    cache and opening book between commands.
+
+    Commands (moves are two digits, board then position, e.g. "40"):
+      uci                       -> id name ..., uciok
+      isready                   -> readyok
+      ucinewgame                clear the search caches
+      position startpos [moves m1 m2 ...]
+      position compact <cells> <player> <board|-> [moves ...]   (see File.to_compact)
+      go [movetime N] [depth N] [infinite] [ponder]
+                                -> info depth D score cp S nodes N nps R time T pv M ...
+                                -> bestmove M   (bestmove none when the game is over)
+      stop                      end the search now and send bestmove
+      ponderhit                 the pondered move was played: search on under movetime
+      quit
+
+    A search runs in a background thread, so stop is answered mid-search.
+    `go infinite` and `go ponder` send bestmove only after stop or
+    ponderhit, as in UCI. Errors are reported as `info string` lines.
+    """
+
+    def __init__(self, out=None, tt_mb=64, book=True):
+        self.out = out if out is not None else sys.stdout
+        self.tt = TranspositionTable(size_mb=tt_mb)
+        self.solver = Solver()
+        self.book = OpeningBook.open_default() if book else None
+        self.pos = EvalBoard()
+        self.search = None
+        self._lock = threading.Lock()
+
+    def send(self, line):
+        with self._lock:
+            self.out.write(line + '\n')
+            self.out.flush()
+
+    def handle(self, line):
+        """Run one command line. Returns False once the engine should exit."""
+        words = line.split()
+        if not words:
+            return True
+        cmd, args = words[0], words[1:]
+        try:
+            if cmd == 'uci':
+                self.send(f"id name {NAME}")
+                self.send("uciok")
+            elif cmd == 'isready':
+                self.send("readyok")
+            elif cmd == 'ucinewgame':
+                self.stop()
+                self.tt.clear()
+                self.solver.cache.clear()
+            elif cmd == 'position':
+                self.stop()
+                self.pos = self._parse_position(args)
+            elif cmd == 'go':
+                self.stop()
+                self.go(args)
+            elif cmd == 'stop':
+                self.stop()
+            elif cmd == 'ponderhit':
+                if self.search is not None:
+                    self.search.ponderhit()
+            elif cmd == 'quit':
+                self.stop()
+                return False
+            else:
+                self.send(f"info string unknown command {cmd}")
+        except ValueError as e:
+            self.send(f"info string error: {e}")
+        return True
+
+    def _parse_position(self, args):
+        if args[:1] == ['startpos']:
+            pos = EvalBoard()
+            rest = args[1:]
+        elif args[:1] == ['compact'] and len(args) >= 4:
+            pos = EvalBoard.from_superboard(File.parse_compact(' '.join(args[1:4])))
+            pos.check_winner()
+            rest = args[4:]
+        else:
+            raise ValueError("position needs startpos or compact <cells> <player> <board>")
+        if rest:
+            if rest[0] != 'moves':
+                raise ValueError(f"unexpected {rest[0]!r}")
+            for text in rest[1:]:
+                move = parse_move(text)
+                if pos.winner is not None or move not in pos.legal_moves():
+                    raise ValueError(f"illegal move {text}")
+                pos.push(*move)
+        return pos
+
+    def go(self, args):
+        time_ms = None
+        depth = MAX_DEPTH
+        wait = False
+        it = iter(args)
+        for word in it:
+            if word == 'movetime':
+                time_ms = int(next(it, ''))
+            elif word == 'depth':
+                depth = int(next(it, ''))
+            elif word in ('infinite', 'ponder'):
+                wait = True
+            else:
+                raise ValueError(f"unknown go option {word}")
+        if time_ms is None and depth == MAX_DEPTH and not wait:
+            time_ms = 1000
+        search = self.search = _Search(time_ms, wait)
+        if not wait and time_ms is not None:
+            search.limit = time.perf_counter() + time_ms / 1000
+        search.thread = threading.Thread(target=self._run, args=(search, self.pos.clone(), depth),
+                                         daemon=True)
+        search.thread.start()
+
+    def stop(self):
+        """Stop the running search and wait for its bestmove."""
+        search, self.search = self.search, None
+        if search is None:
+            return
+        search.stop()
+        # a searcher that was just starting may have reset its own time limit
+        while search.thread.is_alive():
+            search.thread.join(0.05)
+            search.enforce()
+
+    def _run(self, search, pos, depth):
+        start = time.perf_counter()
+        move = self._think(search, pos, depth, start) if pos.winner is None and pos.legal_moves() else None
+        search.release.wait()
+        self.send(f"bestmove {format_move(move) if move is not None else 'none'}")
+
+    def _info(self, start, depth, score, nodes, move):
+        elapsed = time.perf_counter() - start
+        nps = int(nodes / elapsed) if elapsed > 0 else 0
+        pv = f" pv {format_move(move)}" if move is not None else ""
+        self.send(f"info depth {depth} score cp {score} nodes {nodes} nps {nps} "
+                  f"time {int(elapsed * 1000)}{pv}")
+
+    def _think(self, search, pos, depth, start):
+        if self.book is not None:
+            entry = self.book.probe(pos)
+            if entry is not None:
+                self.send("info string book")
+                self._info(start, entry[1], entry[2], 0, entry[0])
+                return entry[0]
+
+        search.target = self.solver
+        solved = self.solver.pick_move(pos, search.remaining_ms())
+        if solved is not None:
+            if solved[1] is not None:
+                self._info(start, playable_cells(pos), search_score(solved[1]), self.solver.nodes, solved[0])
+            return solved[0]
+
+        searcher = Searcher(self.tt)
+        self.tt.new_search()
+        search.target = searcher
+        time_ms = search.remaining_ms()
+        # the first iteration always completes, so there is a move to play even after stop
+        def progress(d, score, mv, nodes):
+            search.enforce()  # in case ponderhit came before iterate set its own limit
+            self._info(start, d, score, nodes, mv)
+
+        _, move, _ = searcher.iterate(pos, time_ms, depth, progress=progress)
+        return move
+
+    def run(self, lines=None):
+        lines = lines if lines is not None else sys.stdin
+        for line in iter(lines.readline, ''):
+            if not self.handle(line):
+                break
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the AI over a UCI-style stdin/stdout protocol.")
+    parser.add_argument('--tt-mb', type=int, default=64, help="transposition table size")
+    parser.add_argument('--no-book', action='store_true', help="do not use the opening book")
+    args = parser.parse_args()
+    Engine(tt_mb=args.tt_mb, book=not args.no_book).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+from array import array
+
+from bitboard import BitBoard, WINNING_COMBINATIONS, FULL, X
+from local_table import (CELL_WEIGHTS, TWO_WEIGHT, CELLS, TERNARY, TERNARY_O,
+                         X_THREATS, O_THREATS, EVAL)
+
+WIN = 100000
+
+
+class EvalWeights:
+    """
+    Tunable evaluation weights (all ints, scores are from X's side).
+
+    cell:          value of a mark on each cell of an undecided local board
+    local_two:     each open two-in-a-row on a local board (third cell empty)
+    owned:         each local board won
+    board:         multiplier for everything on local board b (centre and
+                   corner boards count for more on the global board)
+    global_two:    two won boards in a global line whose third board is still open
+    free_move:     bonus for the side to move when it may play anywhere
+    """
+
+    def __init__(self, cell=CELL_WEIGHTS, local_two=TWO_WEIGHT, owned=60,
+                 board=(3, 2, 3, 2, 4, 2, 3, 2, 3), global_two=250, free_move=40):
+        self.cell = tuple(cell)
+        self.local_two = local_two
+        self.owned = owned
+        self.board = tuple(board)
+        self.global_two = global_two
+        self.free_move = free_move
+
+    def __repr__(self):
+        return (f"EvalWeights(cell={self.cell}, local_two={self.local_two}, owned={self.owned}, "
+                f"board={self.board}, global_two={self.global_two}, free_move={self.free_move})")
+
+
+def local_scores(cell, local_two):
+    """
+    Scores of every local board code (see local_table) for the given cell
+    weights and open-two weight. The default weights are the table's own
+    eval column, shared read-only; other weights get a private array.
+    """
+    if tuple(cell) == CELL_WEIGHTS and local_two == TWO_WEIGHT:
+        return EVAL
+    mark = [sum(cell[p] for p in CELLS[m]) for m in range(512)]
+    scores = array('q', bytes(8 * len(EVAL)))
+    for xm in range(512):
+        free = FULL & ~xm
+        om = free
+        while True:
+            c = TERNARY[xm] + TERNARY_O[om]
+            scores[c] = mark[xm] - mark[om] + local_two * (X_THREATS[c] - O_THREATS[c])
+            if not om:
+                break
+            om = (om - 1) & free
+    return scores
+
+
+class Evaluator:
+    """
+    Scores positions from EvalWeights. Local board scores come from a table
+    indexed by local board code and global scores are memoized by owner
+    masks. Pickles as its weights only.
+    """
+
+    def __init__(self, weights=None):
+        self.weights = weights or EvalWeights()
+        self.local = local_scores(self.weights.cell, self.weights.local_two)
+        self._global = {}
+
+    def __reduce__(self):
+        return (Evaluator, (self.weights,))
+
+    def local_score(self, xm, om):
+        """Score of an undecided local board with 9-bit X and O masks."""
+        return self.local[TERNARY[xm] + TERNARY_O[om]]
+
+    def board_score(self, pos, b):
+        """Contribution of local board b to the running total."""
+        w = self.weights
+        if pos.closed >> b & 1:
+            if pos.xowned >> b & 1:
+                return w.board[b] * w.owned
+            if pos.oowned >> b & 1:
+                return -w.board[b] * w.owned
+            return 0
+        shift = 9 * b
+        return w.board[b] * self.local_score((pos.xbits >> shift) & FULL, (pos.obits >> shift) & FULL)
+
+    def global_score(self, xowned, oowned, closed):
+        """Open two-board threats on the global board."""
+        key = xowned | oowned << 9 | closed << 18
+        score = self._global.get(key)
+        if score is None:
+            score = 0
+            for a, b, c in WINNING_COMBINATIONS:
+                line = (1 << a) | (1 << b) | (1 << c)
+                open_cells = line & ~closed
+                if open_cells.bit_count() != 1:
+                    continue
+                if (xowned & line).bit_count() == 2:
+                    score += self.weights.global_two
+                elif (oowned & line).bit_count() == 2:
+                    score -= self.weights.global_two
+            self._global[key] = score
+        return score
+
+    def full_score(self, pos):
+        """Running total computed from scratch (without the free-move term)."""
+        return (sum(self.board_score(pos, b) for b in range(9))
+                + self.global_score(pos.xowned, pos.oowned, pos.closed))
+
+
+DEFAULT_EVALUATOR = Evaluator()
+
+
+class EvalBoard(BitBoard):
+    """
+    BitBoard that carries its evaluation with it.
+
+    push() adjusts `score` by the change in the one local board played in
+    (and the global threat term when a board was won or filled), saving
+    the old total so pop() restores it exactly. evaluate() is then O(1):
+    the running total plus the free-move bonus for the side to move.
+    """
+    __slots__ = ('evaluator', 'score', '_scores')
+
+    def __init__(self, evaluator=None):
+        super().__init__()
+        self.evaluator = evaluator or DEFAULT_EVALUATOR
+        self.score = self.evaluator.full_score(self)
+        self._scores = []
+
+    @classmethod
+    def from_superboard(cls, sb, evaluator=None):
+        pos = super().from_superboard(sb)
+        pos.evaluator = evaluator or DEFAULT_EVALUATOR
+        pos.score = pos.evaluator.full_score(pos)
+        pos._scores = []
+        return pos
+
+    def push(self, board, position):
+        ev = self.evaluator
+        local = ev.local
+        shift = 9 * board
+        before = local[TERNARY[(self.xbits >> shift) & FULL] + TERNARY_O[(self.obits >> shift) & FULL]]
+        xowned, oowned, closed = self.xowned, self.oowned, self.closed
+        BitBoard.push(self, board, position)
+        score = self.score
+        self._scores.append(score)
+        if self.closed == closed:
+            after = local[TERNARY[(self.xbits >> shift) & FULL] + TERNARY_O[(self.obits >> shift) & FULL]]
+            self.score = score + ev.weights.board[board] * (after - before)
+        else:
+            self.score = (score + ev.board_score(self, board) - ev.weights.board[board] * before
+                          + ev.global_score(self.xowned, self.oowned, self.closed)
+                          - ev.global_score(xowned, oowned, closed))
+
+    def pop(self):
+        BitBoard.pop(self)
+        self.score = self._scores.pop()
+
+    def clone(self):
+        pos = BitBoard.clone(self)
+        pos.evaluator = self.evaluator
+        pos.score = self.score
+        pos._scores = list(self._scores)
+        return pos
+
+    def evaluate(self, ai_player=X):
+        if self.winner is not None:
+            return WIN if self.winner == ai_player else -WIN
+        score = self.score
+        nb = self.next_board
+        if nb is None or self.closed >> nb & 1:
+            free = self.evaluator.weights.free_move
+            score += free if self.current_player == X else -free
+        return score if ai_player == X else -score
@@ -1,7 +1,15 @@
-from Minimax import minimax
+from Minimax import Searcher, SearchStats, iterative_deepening
+from bitboard import BitBoard
+from evaluation import EvalBoard
+from local_table import code_of, WINNER, IS_FULL
+from transposition import TranspositionTable
+from mcts import MCTSTree
+from endgame import playable_cells, search_score
+from symmetry import canonicalize
 import random
-from copy import deepcopy
-import pandas as pd
+import time
+import warnings
+from array import array
 
 X = "X"
 O = "O"
@@ -12,6 +20,41 @@ WINNING_COMBINATIONS = [
     [0, 4, 8], [2, 4, 6]
 ]
 
+# SuperBoard.move_log packs each move into one int: board | position << 4 |
+# player << 8 | local board winner << 9 | global winner << 11, where a
+# player is 0 for X and 1 for O and a winner is 0 none, 1 X, 2 O.
+_PLAYER_CODE = {X: 0, O: 1}
+_WINNER_CODE = {None: 0, X: 1, O: 2}
+_WINNERS = (None, X, O)
+
+
+def _pack_move(board, position, player, small_winner, global_winner):
+    return (board | position << 4 | _PLAYER_CODE[player] << 8
+            | _WINNER_CODE[small_winner] << 9 | _WINNER_CODE[global_winner] << 11)
+
+
+def unpack_move(packed):
+    """(board, position, player, small_winner, global_winner) of a move_log entry."""
+    return (packed & 15, packed >> 4 & 15, O if packed >> 8 & 1 else X,
+            _WINNERS[packed >> 9 & 3], _WINNERS[packed >> 11])
+
+
+def _history_entry(number, packed):
+    """The history dict of the move packed as `packed`, the number-th of the game."""
+    board, position, player, small_winner, global_winner = unpack_move(packed)
+    entry = {
+        'move': number,
+        'player': player,
+        'board': board,
+        'position': position,
+        'next_board': position,
+        'small_winner': small_winner,
+    }
+    if global_winner:
+        entry['global_winner'] = global_winner
+    return entry
+
+
 class Board:
     def __init__(self, current_player):
         self.grid = [None for i in range(9)]
@@ -32,11 +75,16 @@ class Board:
             return '\n'.join(rows) + '\n' + status
         return '\n'.join(rows)
 
+    @property
+    def code(self):
+        """Index of this board in the local_table columns."""
+        return code_of(self.grid)
+
     def check_winner(self):
-        for combo in WINNING_COMBINATIONS:
-            if (self.grid[combo[0]] == self.grid[combo[1]] == self.grid[combo[2]]) and (self.grid[combo[0]] in [X, O]):
-                self.winner = self.grid[combo[0]]
-                return True
+        winner = WINNER[code_of(self.grid)]
+        if winner:
+            self.winner = X if winner == 1 else O
+            return True
         return False
 
     def clone(self):
@@ -52,7 +100,8 @@ class SuperBoard:
         self.current_player = X
         self.next_board = None
         self.winner = None
-        self.history = []
+        self.move_log = array('H')
+        self._undo = []
 
     def __str__(self):
         def cell_repr(val):
@@ -104,35 +153,88 @@ class SuperBoard:
             raise ValueError("Board position taken up!")
 
         self.grid[board].check_winner()
+        self.check_winner()
+        self.move_log.append(_pack_move(board, position, player, self.grid[board].winner, self.winner))
 
-        move_num = len(self.history) + 1
-        small_winner = self.grid[board].winner
-        entry = {
-            'move': move_num,
-            'player': player,
-            'board': board,
-            'position': position,
-            'next_board': self.next_board,
-            'small_winner': small_winner,
-        }
-        self.history.append(entry)
+        self.current_player = O if self.current_player == X else X
 
-        self.check_winner()
-        if self.winner:
-            self.history[-1]['global_winner'] = self.winner
+    def push(self, board, position):
+        """
+        Play a move that pop() can take back exactly.
+
+        Unlike make_move this only re-checks the board that was played in,
+        and saves just the cell, next_board, local and global winner.
+        """
+        local = self.grid[board]
+        if local.grid[position] is not None:
+            raise ValueError("Board position taken up!")
 
+        player = self.current_player
+        self._undo.append((board, position, self.next_board, local.winner, self.winner))
+        local.grid[position] = player
+        self.next_board = position
+        if local.winner is None:
+            local.check_winner()
+
+        if self.winner is None:
+            self.check_winner()
+        self.move_log.append(_pack_move(board, position, player, local.winner, self.winner))
+
+        self.current_player = O if player == X else X
+
+    def pop(self):
+        """Take back the last push()."""
+        board, position, next_board, small_winner, winner = self._undo.pop()
+        self.grid[board].grid[position] = None
+        self.grid[board].winner = small_winner
+        self.next_board = next_board
+        self.winner = winner
+        self.move_log.pop()
         self.current_player = O if self.current_player == X else X
 
     def clone(self):
         sb = SuperBoard()
-        sb.grid = [deepcopy(board) for board in deepcopy(self.grid)]
+        sb.grid = [board.clone() for board in self.grid]
         sb.current_player = self.current_player
         sb.next_board = self.next_board
         sb.winner = self.winner
-        sb.history = [h.copy() for h in self.history]
+        sb.move_log = array('H', self.move_log)
+        sb._undo = list(self._undo)
+        return sb
+
+    def to_bitboard(self):
+        """Return the position as a compact bitboard.BitBoard (history is not kept)."""
+        return BitBoard.from_superboard(self)
+
+    @classmethod
+    def from_bitboard(cls, pos):
+        sb = cls()
+        for b_idx, board in enumerate(sb.grid):
+            board.grid = [pos.cell(b_idx, p) for p in range(9)]
+            board.winner = pos.board_winner(b_idx)
+        sb.current_player = pos.current_player
+        sb.next_board = pos.next_board
+        sb.winner = pos.winner
         return sb
 
+    def canonical(self):
+        """
+        (canonical SuperBoard, t): the orientation of this position shared
+        by all its rotations and reflections, and the symmetry.PERMS index
+        that produces it. Map moves back with symmetry.unmap_move(move, t).
+        History is not kept.
+        """
+        pos, t = canonicalize(self.to_bitboard())
+        return SuperBoard.from_bitboard(pos), t
+
+    @property
+    def history(self):
+        """One dict per move played, built from move_log on each access."""
+        return [_history_entry(i, packed) for i, packed in enumerate(self.move_log, 1)]
+
     def history_df(self):
+        import pandas as pd  # only needed here, and slow to import
+
         df = pd.DataFrame(self.history)
         df.attrs['winner'] = self.winner
         return df
@@ -147,8 +249,7 @@ class SuperBoard:
         return False
 
     def is_full(self, board_index):
-        b = self.grid[board_index]
-        return all(cell in [X, O] for cell in b.grid)
+        return bool(IS_FULL[code_of(self.grid[board_index].grid)])
 
 class Strategy:
     @staticmethod
@@ -156,12 +257,217 @@ class Strategy:
         return (random.randint(0, 8), random.randint(0, 8))
 
     @staticmethod
-    def minimax_pick(superboard, depth=20, ai_player=X):
-        maximizing = (superboard.current_player == ai_player)
-        score, move = minimax(superboard, maximizing, ai_player, depth)
+    def _ai_player_ignored(ai_player):
+        if ai_player is not None:
+            warnings.warn("ai_player is ignored; the search plays for superboard.current_player",
+                          DeprecationWarning, stacklevel=3)
+
+    @staticmethod
+    def minimax_pick(superboard, depth=4, ai_player=None, tt=None, workers=1, deterministic=True,
+                     stats=None, evaluator=None, book=None, solver=None):
+        """
+        Best move for superboard.current_player at a fixed depth.
+
+        depth defaults to 4 rather than the original 20, which the search
+        never finished from an open board; use timed_pick to go deeper.
+        ai_player is deprecated and ignored.
+
+        Pass the same TranspositionTable on every turn to reuse search
+        results across the moves of a game.
+
+        workers > 1 splits the root moves over a persistent process pool
+        (see parallel_search.parallel_pick); in deterministic mode the
+        move is the same one the serial search picks.
+
+        stats, a Minimax.SearchStats, is reset and filled in by the serial
+        search. evaluator, an evaluation.Evaluator, sets the leaf weights.
+        book, an opening_book.OpeningBook, is consulted before searching.
+        solver, an endgame.Solver, plays late positions perfectly when it
+        can prove their result within its node budget, and plays a lone
+        legal move without searching. Keep one per player or game, as its
+        cache outlives the call.
+        """
+        Strategy._ai_player_ignored(ai_player)
+        pos = EvalBoard.from_superboard(superboard, evaluator)
+        pos.check_winner()
+        if book is not None:
+            entry = book.probe(pos)
+            if entry is not None:
+                return entry[0]
+        if solver is not None:
+            solved = solver.pick_move(pos)
+            if solved is not None:
+                if stats is not None:
+                    stats.reset()
+                    if solved[1] is not None:
+                        stats.finish_iteration(playable_cells(pos), search_score(solved[1]), 0.0)
+                return solved[0]
+        if tt is not None:
+            tt.new_search()
+        if workers > 1:
+            from parallel_search import parallel_pick  # keeps multiprocessing out of startup
+
+            score, move, nodes = parallel_pick(pos, depth, workers, tt, deterministic)
+            return move
+        if stats is not None:
+            stats.reset()
+        score, move = Searcher(tt, stats).pick(pos, depth)
         return move
 
+    @staticmethod
+    def timed_pick(superboard, time_ms=1000, max_depth=20, ai_player=None, tt=None, stats=None,
+                   evaluator=None, book=None, solver=None):
+        """
+        Iterative deepening under a time budget.
+
+        Returns (move, depth): the best move of the deepest search that
+        finished within time_ms, and that depth. stats, a
+        Minimax.SearchStats, is reset and filled in. A hit in book (an
+        opening_book.OpeningBook) is returned with the book's search depth
+        and no search. A position solved by solver (see minimax_pick) is
+        returned with the number of cells left to play as its depth, a lone
+        legal move with depth 0. The solve may use only part of time_ms
+        (endgame.SOLVE_SHARE); if it gives up, the rest goes to the search.
+        ai_player is deprecated and ignored, as in minimax_pick.
+        """
+        Strategy._ai_player_ignored(ai_player)
+        start = time.perf_counter()
+        pos = EvalBoard.from_superboard(superboard, evaluator)
+        pos.check_winner()
+        if book is not None:
+            entry = book.probe(pos)
+            if entry is not None:
+                return entry[0], entry[1]
+        if stats is not None:
+            stats.reset()
+        if solver is not None:
+            solved = solver.pick_move(pos, time_ms)
+            if solved is not None:
+                if solved[1] is None:
+                    return solved[0], 0
+                depth = playable_cells(pos)
+                if stats is not None:
+                    stats.finish_iteration(depth, search_score(solved[1]), time.perf_counter() - start)
+                return solved[0], depth
+            time_ms = max(1, time_ms - (time.perf_counter() - start) * 1000)
+        if tt is None:
+            tt = TranspositionTable(size_mb=4)
+        tt.new_search()
+        score, move, depth = iterative_deepening(pos, pos.current_player, time_ms, max_depth, tt, stats)
+        return move, depth
+
+    @staticmethod
+    def mcts_pick(superboard, playouts=None, time_ms=None, tree=None):
+        """
+        Monte Carlo tree search for the side to move; stops after
+        `playouts` playouts or `time_ms` (1000 ms if neither is given).
+
+        Pass the same MCTSTree every turn to keep the subtree under the
+        moves actually played; tree.playouts_per_second reports the speed.
+        """
+        pos = superboard.to_bitboard()
+        pos.check_winner()
+        if tree is None:
+            tree = MCTSTree()
+        return tree.search(pos, playouts, time_ms)
+
 class File:
+    # compact notation: the 81 cells as 9 groups of 9 (board by board, each
+    # row by row) of X, O or '.', then the player to move and the active
+    # board or '-', e.g. "X........./.../... O 0" with all nine groups
+    _COMPACT_CELL = {'X': X, 'O': O, '.': None}
+
+    @staticmethod
+    def to_compact(sb):
+        boards = '/'.join(''.join(c or '.' for c in b.grid) for b in sb.grid)
+        nb = '-' if sb.next_board is None else str(sb.next_board)
+        return f"{boards} {sb.current_player} {nb}"
+
+    @staticmethod
+    def parse_compact(line):
+        """Parse one line of compact notation (see to_compact)."""
+        try:
+            boards, player, nb = line.split()
+            groups = boards.split('/')
+            cell = File._COMPACT_CELL
+            if len(groups) != 9 or any(len(g) != 9 for g in groups) or player not in (X, O):
+                raise ValueError
+            sb = SuperBoard()
+            for board, group in zip(sb.grid, groups):
+                board.grid = [cell[c] for c in group]
+                board.check_winner()
+            sb.current_player = player
+            sb.next_board = None if nb == '-' else int(nb)
+        except (ValueError, KeyError):
+            raise ValueError(f"Not a compact position: {line!r}") from None
+        sb.check_winner()
+        return sb
+
+    @staticmethod
+    def _board_index(line):
+        """The local board index of a "(row,col)" grid header line, else None."""
+        if not (line.startswith('(') and ',' in line and line.endswith(')')):
+            return None
+        try:
+            r, c = line.strip('()').split(',')
+            return (int(r) - 1) * 3 + (int(c) - 1)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def iter_boards(lines):
+        """
+        Yield every position in a stream of lines: compact lines one by
+        one, and parse_board blocks, so several board files can be
+        concatenated. A block ends where the next one's header lines
+        ("Current Player", "Active Board", ... in any order, or none)
+        follow a board's grid, or where a local board already in the block
+        appears again. Raises ValueError for a block without any local
+        board and for input with no positions at all.
+        """
+        block = []
+        seen = set()    # local boards already in block
+        rows_left = 0   # grid rows still expected under the last "(row,col)"
+        found = False
+
+        def flush():
+            if not seen:
+                raise ValueError(f"no boards in {' / '.join(ln.strip() for ln in block if ln.strip())!r}")
+            return File.parse_board(block)
+
+        for ln in lines:
+            stripped = ln.strip()
+            if stripped.count('/') == 8 and len(stripped.split()) == 3:
+                if block:
+                    yield flush()
+                    block, seen, rows_left = [], set(), 0
+                found = True
+                yield File.parse_compact(stripped)
+                continue
+            if not stripped:
+                if block:
+                    block.append(ln)
+                continue
+            idx = File._board_index(stripped)
+            if idx is not None:
+                if idx in seen:
+                    yield flush()
+                    block, seen = [], set()
+                seen.add(idx)
+                rows_left = 3
+            elif rows_left:
+                rows_left -= 1
+            elif seen:
+                # a header line after a grid starts the next board
+                yield flush()
+                block, seen = [], set()
+            block.append(ln)
+            found = True
+        if block:
+            yield flush()
+        if not found:
+            raise ValueError("no positions found")
+
     @staticmethod
     def parse_board(file):
         # read lines
@@ -0,0 +1,283 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+from game_engine import SuperBoard, X, O, unpack_move
+
+MAGIC = b'STTGAMES'
+INDEX_MAGIC = b'STTGMIDX'
+VERSION = 1
+FILE_HEADER = struct.Struct('<8sHHI')   # magic, version, unused, unused
+INDEX_HEADER = struct.Struct('<8sHHIQ')  # magic, version, unused, unused, data bytes indexed
+RECORD = struct.Struct('<BBBBB')        # result, first player, x tag length, o tag length, moves
+OFFSET = struct.Struct('<Q')
+
+# result codes
+UNFINISHED, X_WINS, O_WINS, DRAW = 0, 1, 2, 3
+
+GameRecord = namedtuple('GameRecord', 'moves result x_engine o_engine first_player')
+GameRecord.__doc__ = """
+One game: moves is a bytes object of board*9 + position per move, result
+one of UNFINISHED/X_WINS/O_WINS/DRAW, the engine tags are strings and
+first_player is X or O.
+"""
+
+
+def index_path(path):
+    return path + '.idx'
+
+
+def result_code(winner, finished=True):
+    if winner == X:
+        return X_WINS
+    if winner == O:
+        return O_WINS
+    return DRAW if finished else UNFINISHED
+
+
+def encode(record):
+    x_tag = record.x_engine.encode('utf-8')[:255]
+    o_tag = record.o_engine.encode('utf-8')[:255]
+    first = 0 if record.first_player == X else 1
+    return RECORD.pack(record.result, first, len(x_tag), len(o_tag), len(record.moves)) \
+        + x_tag + o_tag + bytes(record.moves)
+
+
+def decode(buf, offset):
+    """The record at offset and the offset just past it."""
+    result, first, x_len, o_len, length = RECORD.unpack_from(buf, offset)
+    start = offset + RECORD.size
+    x_tag = bytes(buf[start:start + x_len]).decode('utf-8')
+    start += x_len
+    o_tag = bytes(buf[start:start + o_len]).decode('utf-8')
+    start += o_len
+    moves = bytes(buf[start:start + length])
+    return GameRecord(moves, result, x_tag, o_tag, O if first else X), start + length
+
+
+def _record_end(buf, offset):
+    _, _, x_len, o_len, length = RECORD.unpack_from(buf, offset)
+    return offset + RECORD.size + x_len + o_len + length
+
+
+def from_history(history, result=None, x_engine='', o_engine=''):
+    """GameRecord from SuperBoard.history; result defaults to that of the replayed game."""
+    first = history[0]['player'] if history else X
+    moves = bytes(h['board'] * 9 + h['position'] for h in history)
+    record = GameRecord(moves, UNFINISHED if result is None else result, x_engine, o_engine, first)
+    if result is None:
+        sb = to_superboard(record)
+        record = record._replace(result=result_code(sb.winner, _finished(sb)))
+    return record
+
+
+def _finished(sb):
+    """A game is over once it has a winner or no moves are left."""
+    from Minimax import legal_moves
+
+    return sb.winner is not None or next(legal_moves(sb), None) is None
+
+
+def from_superboard(sb, x_engine='', o_engine=''):
+    """GameRecord of the moves played on sb (a finished game if it has a winner or no moves left)."""
+    finished = _finished(sb)
+    unpacked = [unpack_move(m) for m in sb.move_log]
+    first = unpacked[0][2] if unpacked else X
+    moves = bytes(board * 9 + position for board, position, *_ in unpacked)
+    return GameRecord(moves, result_code(sb.winner, finished), x_engine, o_engine, first)
+
+
+def to_superboard(record):
+    """Replay a record through SuperBoard.make_move, history included."""
+    sb = SuperBoard()
+    sb.current_player = record.first_player
+    for mv in record.moves:
+        board, position = divmod(mv, 9)
+        sb.make_move(position, board=board)
+    return sb
+
+
+def to_history(record):
+    return to_superboard(record).history
+
+
+class GameWriter:
+    """
+    Append-only writer. Each write() adds one record to the data file and
+    its offset to the index file; both are flushed on flush()/close().
+    Opening an existing file continues it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        if not new:
+            # validates the header, brings the index up to date and drops a torn last record
+            with GameReader(path) as reader:
+                end = reader.end
+            if end < os.path.getsize(path):
+                os.truncate(path, end)
+        self._data = open(path, 'ab')
+        if new:
+            self._data.write(FILE_HEADER.pack(MAGIC, VERSION, 0, 0))
+        self._offset = self._data.tell()
+        self._index = open(index_path(path), 'r+b' if not new else 'w+b')
+        if new:
+            self._index.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, 0, 0, self._offset))
+        self._index.seek(0, os.SEEK_END)
+        self.written = 0
+
+    def write(self, record):
+        """Append a GameRecord; returns its offset in the data file."""
+        data = encode(record)
+        offset = self._offset
+        self._data.write(data)
+        self._index.write(OFFSET.pack(offset))
+        self._offset += len(data)
+        self.written += 1
+        return offset
+
+    def write_superboard(self, sb, x_engine='', o_engine=''):
+        return self.write(from_superboard(sb, x_engine, o_engine))
+
+    def flush(self):
+        # data first, so an index entry never points past the end of the data
+        self._data.flush()
+        self._index.seek(0)
+        self._index.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, 0, 0, self._offset))
+        self._index.seek(0, os.SEEK_END)
+        self._index.flush()
+
+    def close(self):
+        self.flush()
+        self._data.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GameReader:
+    """
+    Memory-mapped reader. Iterating walks the records in order; len() and
+    reader[k] use the index file (rebuilt or extended here if it is
+    missing or behind the data file), so seeking to game k is O(1).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, _ = FILE_HEADER.unpack_from(self._buf)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a game record file")
+        if version != VERSION:
+            raise ValueError(f"{path} is game record version {version}, expected {VERSION}")
+        self._index_buf = None
+        self._index, on_disk = self._load_index()
+        if on_disk and sys.byteorder == 'little':
+            try:
+                with open(index_path(path), 'rb') as f:
+                    self._index_buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._index = memoryview(self._index_buf)[INDEX_HEADER.size:].cast('Q')
+            except (OSError, ValueError):
+                self._index_buf = None
+
+    def _load_index(self):
+        """
+        Offsets of every complete record, and whether the index file now
+        matches them. Index entries past the data the index header vouches
+        for are dropped and the rest of the data file is scanned, so a
+        crash mid-write loses at most the torn record.
+        """
+        buf = self._buf
+        offsets = array('Q')
+        offset = FILE_HEADER.size
+        changed = True
+        try:
+            with open(index_path(self.path), 'rb') as f:
+                magic, version, _, _, covered = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+                raw = f.read()
+            if magic == INDEX_MAGIC and version == VERSION and covered <= len(buf):
+                offsets.frombytes(raw[:len(raw) - len(raw) % OFFSET.size])
+                changed = len(raw) % OFFSET.size != 0
+                while offsets and offsets[-1] >= covered:
+                    offsets.pop()
+                    changed = True
+                offset = covered
+        except (OSError, struct.error):
+            pass
+        while offset + RECORD.size <= len(buf):
+            end = _record_end(buf, offset)
+            if end > len(buf):
+                break
+            offsets.append(offset)
+            offset = end
+            changed = True
+        self.end = offset
+        if changed:
+            try:
+                with open(index_path(self.path), 'wb') as f:
+                    f.write(INDEX_HEADER.pack(INDEX_MAGIC, VERSION, 0, 0, offset))
+                    f.write(offsets.tobytes())
+            except OSError:
+                return offsets, False
+        return offsets, True
+
+    def __len__(self):
+        return len(self._index)
+
+    def __getitem__(self, k):
+        return decode(self._buf, self._index[k])[0]
+
+    def __iter__(self):
+        buf = self._buf
+        offset = FILE_HEADER.size
+        end = self.end
+        while offset < end:
+            record, offset = decode(buf, offset)
+            yield record
+
+    def close(self):
+        if self._index_buf is not None:
+            self._index.release()
+            self._index_buf.close()
+        self._buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize a game record file.")
+    parser.add_argument('path')
+    parser.add_argument('--show', type=int, action='append', default=[], help="print game k")
+    args = parser.parse_args()
+    with GameReader(args.path) as reader:
+        counts = [0, 0, 0, 0]
+        plies = 0
+        for record in reader:
+            counts[record.result] += 1
+            plies += len(record.moves)
+        n = len(reader)
+        print(f"{n} games, avg length {plies / n if n else 0:.1f}")
+        print(f"{X}: {counts[X_WINS]}  {O}: {counts[O_WINS]}  draws: {counts[DRAW]}  "
+              f"unfinished: {counts[UNFINISHED]}")
+        for k in args.show:
+            record = reader[k]
+            print(f"game {k}: {record.x_engine or '?'} vs {record.o_engine or '?'}, result {record.result}")
+            print(to_superboard(record))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,14 @@
+import argparse
 import sys
+import time
 import pygame
-from game_engine import SuperBoard, Strategy, X, O
+from game_engine import SuperBoard, X, O
+from ai_worker import AIWorker
 
 
 WIDTH, HEIGHT = 720, 720
 FPS = 30
+AI_TIME_MS = 1000
 
 BACKGROUND = (28, 28, 28)
 LINE_COLOR = (200, 200, 200)
@@ -12,68 +16,120 @@ X_COLOR = (200, 50, 50)
 O_COLOR = (50, 200, 50)
 
 
-def draw_board(screen, sb: SuperBoard, font):
-    screen.fill(BACKGROUND)
+MARGIN = 40
+BOARD_SIZE = min(WIDTH, HEIGHT) - MARGIN * 2
+CELL = BOARD_SIZE // 9  # because we will draw 9x9 small cells
+TOP_LEFT_X = (WIDTH - BOARD_SIZE) // 2
+TOP_LEFT_Y = (HEIGHT - BOARD_SIZE) // 2
+HIGHLIGHT = (255, 255, 0, 40)
+
+# screen areas redrawn as a whole when their text changes
+HEADER = pygame.Rect(0, 0, WIDTH, TOP_LEFT_Y - 3)
+FOOTER = pygame.Rect(0, TOP_LEFT_Y + BOARD_SIZE + 3, WIDTH, HEIGHT - (TOP_LEFT_Y + BOARD_SIZE + 3))
+
+
+def board_rect(board_idx):
+    x = TOP_LEFT_X + (board_idx % 3) * 3 * CELL
+    y = TOP_LEFT_Y + (board_idx // 3) * 3 * CELL
+    return pygame.Rect(x, y, CELL * 3, CELL * 3)
+
+
+class Renderer:
+    """
+    Draws the game from cached surfaces and only where something changed.
+
+    The background and grid are rendered once, X and O are pre-drawn
+    sprites, and the next-board highlight is one reused surface. draw()
+    repaints just the local boards, header and footer whose contents
+    differ from the previous frame and returns their rectangles for
+    pygame.display.update(); an unchanged frame returns [].
+    """
+
+    def __init__(self, screen, font):
+        self.screen = screen
+        self.font = font
+        self.grid = self._render_grid()
+        self.glyphs = {X: self._render_x(), O: self._render_o()}
+        self.highlight = pygame.Surface((CELL * 3, CELL * 3), pygame.SRCALPHA)
+        self.highlight.fill(HIGHLIGHT)
+        self.invalidate()
+
+    def invalidate(self):
+        """Repaint everything on the next draw(), e.g. after the window was exposed."""
+        self._boards = [None] * 9
+        self._header = None
+        self._footer = None
+        self._full = True
+
+    def _render_grid(self):
+        surface = pygame.Surface((WIDTH, HEIGHT))
+        surface.fill(BACKGROUND)
+        x0, y0 = TOP_LEFT_X, TOP_LEFT_Y
+        # draw small grid (9x9)
+        for i in range(10):
+            x = x0 + i * CELL
+            pygame.draw.line(surface, LINE_COLOR, (x, y0), (x, y0 + BOARD_SIZE), 1)
+            y = y0 + i * CELL
+            pygame.draw.line(surface, LINE_COLOR, (x0, y), (x0 + BOARD_SIZE, y), 1)
+        # draw thicker lines to separate 3x3 super-boards
+        for i in range(4):
+            x = x0 + i * 3 * CELL
+            pygame.draw.line(surface, LINE_COLOR, (x, y0), (x, y0 + BOARD_SIZE), 4)
+            y = y0 + i * 3 * CELL
+            pygame.draw.line(surface, LINE_COLOR, (x0, y), (x0 + BOARD_SIZE, y), 4)
+        return surface
+
+    def _render_x(self):
+        sprite = pygame.Surface((CELL, CELL), pygame.SRCALPHA)
+        c = CELL // 2
+        off = CELL // 3
+        pygame.draw.line(sprite, X_COLOR, (c - off, c - off), (c + off, c + off), 3)
+        pygame.draw.line(sprite, X_COLOR, (c - off, c + off), (c + off, c - off), 3)
+        return sprite
+
+    def _render_o(self):
+        sprite = pygame.Surface((CELL, CELL), pygame.SRCALPHA)
+        pygame.draw.circle(sprite, O_COLOR, (CELL // 2, CELL // 2), CELL // 3, 3)
+        return sprite
+
+    def _text_area(self, area, lines):
+        self.screen.blit(self.grid, area, area)
+        for pos, text in lines:
+            self.screen.blit(self.font.render(text, True, LINE_COLOR), pos)
+        return area
+
+    def draw(self, sb, header, footer):
+        """header and footer are lists of ((x, y), text). Returns the dirty rectangles."""
+        screen = self.screen
+        dirty = []
+        full = self._full
+        if full:
+            screen.blit(self.grid, (0, 0))
+            self._full = False
 
-    margin = 40
-    board_size = min(WIDTH, HEIGHT) - margin * 2
-    cell_size = board_size // 9  # because we will draw 9x9 small cells
-
-    top_left_x = (WIDTH - board_size) // 2
-    top_left_y = (HEIGHT - board_size) // 2
-
-    # draw small grid (9x9)
-    for i in range(10):
-        # vertical
-        x = top_left_x + i * cell_size
-        pygame.draw.line(screen, LINE_COLOR, (x, top_left_y), (x, top_left_y + board_size), 1)
-        # horizontal
-        y = top_left_y + i * cell_size
-        pygame.draw.line(screen, LINE_COLOR, (top_left_x, y), (top_left_x + board_size, y), 1)
-
-    # draw thicker lines to separate 3x3 super-boards
-    for i in range(4):
-        x = top_left_x + i * 3 * cell_size
-        pygame.draw.line(screen, LINE_COLOR, (x, top_left_y), (x, top_left_y + board_size), 4)
-        y = top_left_y + i * 3 * cell_size
-        pygame.draw.line(screen, LINE_COLOR, (top_left_x, y), (top_left_x + board_size, y), 4)
-
-    # draw X/O in cells
-    for big_idx, board in enumerate(sb.grid):
-        br = big_idx // 3
-        bc = big_idx % 3
-        for pos, val in enumerate(board.grid):
-            sr = pos // 3
-            sc = pos % 3
-            x = top_left_x + (bc * 3 + sc) * cell_size
-            y = top_left_y + (br * 3 + sr) * cell_size
-            center = (x + cell_size // 2, y + cell_size // 2)
-            if val == X:
-                # draw X
-                off = cell_size // 3
-                pygame.draw.line(screen, X_COLOR, (center[0]-off, center[1]-off), (center[0]+off, center[1]+off), 3)
-                pygame.draw.line(screen, X_COLOR, (center[0]-off, center[1]+off), (center[0]+off, center[1]-off), 3)
-            elif val == O:
-                pygame.draw.circle(screen, O_COLOR, center, cell_size // 3, 3)
-
-    # highlight next board if set
-    if sb.next_board is not None and not sb.grid[sb.next_board].winner:
         nb = sb.next_board
-        br = nb // 3
-        bc = nb % 3
-        x = top_left_x + (bc * 3) * cell_size
-        y = top_left_y + (br * 3) * cell_size
-        rect = pygame.Rect(x, y, cell_size * 3, cell_size * 3)
-        s = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-        s.fill((255, 255, 0, 40))
-        screen.blit(s, rect.topleft)
-
-    # show status
-    status = f"Current: {sb.current_player}"
-    if sb.winner:
-        status = f"Winner: {sb.winner}"
-    text = font.render(status, True, LINE_COLOR)
-    screen.blit(text, (10, 10))
+        highlighted = nb if nb is not None and not sb.grid[nb].winner else None
+        for b_idx, board in enumerate(sb.grid):
+            state = (tuple(board.grid), b_idx == highlighted)
+            if state == self._boards[b_idx]:
+                continue
+            self._boards[b_idx] = state
+            rect = board_rect(b_idx)
+            screen.blit(self.grid, rect, rect)
+            for pos, val in enumerate(board.grid):
+                if val is not None:
+                    screen.blit(self.glyphs[val], (rect.x + (pos % 3) * CELL, rect.y + (pos // 3) * CELL))
+            if state[1]:
+                screen.blit(self.highlight, rect)
+            dirty.append(rect)
+
+        if header != self._header:
+            self._header = header
+            dirty.append(self._text_area(HEADER, header))
+        if footer != self._footer:
+            self._footer = footer
+            dirty.append(self._text_area(FOOTER, footer))
+        return [screen.get_rect()] if full else dirty
 
 
 def pos_to_board_cell(pos, margin=40):
@@ -105,14 +161,17 @@ def pos_to_board_cell(pos, margin=40):
     return board_idx, cell_idx
 
 
-def main():
+def main(engine='minimax', idle=True, full_redraw=False):
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Super Tic-Tac-Toe")
     clock = pygame.time.Clock()
     font = pygame.font.SysFont(None, 28)
+    renderer = Renderer(screen, font)
 
     sb = SuperBoard()
+    # the AI searches in a background process so the window keeps drawing
+    worker = AIWorker(engine=engine, time_ms=AI_TIME_MS)
 
     # choose mode: Human vs AI (default) or Human vs Human (press H)
     mode_ai = True
@@ -120,19 +179,39 @@ def main():
     running = True
     ai_thinking = False
 
-    while running:
-        clock.tick(FPS)
+    # frame-time counter (F): average ms spent drawing and updating the display
+    show_frame_time = False
+    frame_ms = 0.0
+    frame_text = ""
+    frame_text_at = 0
 
-        for event in pygame.event.get():
+    while running:
+        ai_turn = not sb.winner and mode_ai and sb.current_player == X
+        if idle and not ai_turn:
+            # nothing changes on screen until the next event, so sleep until it comes
+            events = [pygame.event.wait()] + pygame.event.get()
+        else:
+            clock.tick(FPS)
+            events = pygame.event.get()
+
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                renderer.invalidate()
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
                     running = False
                 elif event.key == pygame.K_r:
+                    worker.cancel()
+                    ai_thinking = False
                     sb = SuperBoard()
                 elif event.key == pygame.K_h:
+                    worker.cancel()
+                    ai_thinking = False
                     mode_ai = not mode_ai
+                elif event.key == pygame.K_f:
+                    show_frame_time = not show_frame_time
                 elif event.key == pygame.K_s:
                     # print history to console
                     print(sb.history_df())
@@ -159,32 +238,60 @@ def main():
                 except Exception as e:
                     print("Error:", e)
 
-        # AI move
+        # AI move: start a search, then pick up the result on a later frame
         if not sb.winner and mode_ai and sb.current_player == X:
-            ai_thinking = True
-            pygame.display.set_caption("Super Tic-Tac-Toe - AI thinking...")
-            pygame.event.pump()
-            try:
-                b_idx, pos_idx = Strategy.minimax_pick(sb, depth=4, ai_player=X)
-                if b_idx is not None:
-                    sb.make_move(pos_idx, board=b_idx)
-            except Exception as e:
-                print("AI Error:", e)
-            ai_thinking = False
-            pygame.display.set_caption("Super Tic-Tac-Toe")
-
-        draw_board(screen, sb, font)
-
+            if not ai_thinking:
+                ai_thinking = True
+                worker.search(sb)
+                pygame.display.set_caption("Super Tic-Tac-Toe - AI thinking...")
+            result = worker.poll()
+            if result is not None:
+                ai_thinking = False
+                pygame.display.set_caption("Super Tic-Tac-Toe")
+                try:
+                    if result['move'] is not None:
+                        b_idx, pos_idx = result['move']
+                        sb.make_move(pos_idx, board=b_idx)
+                except Exception as e:
+                    print("AI Error:", e)
+                if not sb.winner:
+                    worker.ponder(sb)
+
+        # show status
+        status = f"Winner: {sb.winner}" if sb.winner else f"Current: {sb.current_player}"
+        header = [((10, 10), status)]
+        if ai_thinking:
+            progress = worker.progress
+            thinking = f"AI thinking... depth {progress.get('depth') or '-'}  nodes {progress.get('nodes', 0)}"
+            header.append(((WIDTH // 2 - 60, 10), thinking))
+        if show_frame_time:
+            now = pygame.time.get_ticks()
+            if now - frame_text_at >= 500:  # a steadier number, and fewer header redraws
+                frame_text = f"frame {frame_ms:.2f} ms"
+                frame_text_at = now
+            header.append(((150, 10), frame_text))
         # footer
-        footer = f"Mode: {'AI' if mode_ai else 'Human'}   (R)eset  (H) Toggle mode  (S)how history  (Esc) Quit"
-        ft = font.render(footer, True, LINE_COLOR)
-        screen.blit(ft, (10, HEIGHT - 30))
-
-        pygame.display.flip()
-
+        footer = [((10, HEIGHT - 30),
+                   f"Mode: {'AI' if mode_ai else 'Human'}   (R)eset  (H) Toggle mode  (S)how history  (F)rame time  (Esc) Quit")]
+
+        start = time.perf_counter()
+        if full_redraw:
+            renderer.invalidate()
+        dirty = renderer.draw(sb, header, footer)
+        if dirty:
+            pygame.display.update(dirty)
+        frame_ms = 0.9 * frame_ms + 0.1 * (time.perf_counter() - start) * 1000
+
+    worker.close()
     pygame.quit()
     sys.exit()
 
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description="Super Tic-Tac-Toe (Pygame).")
+    parser.add_argument('--engine', choices=['minimax', 'mcts'], default='minimax')
+    parser.add_argument('--no-idle', action='store_true', help="redraw at FPS even when nothing happens")
+    parser.add_argument('--full-redraw', action='store_true',
+                        help="repaint the whole window every frame (to compare frame times)")
+    args = parser.parse_args()
+    main(engine=args.engine, idle=not args.no_idle, full_redraw=args.full_redraw)
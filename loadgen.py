@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import json
+import time
+
+from game_engine import SuperBoard, File
+from game_records import GameReader
+from tournament import percentile
+
+
+def game_positions(record):
+    """File.to_compact of every position in a recorded game, before each move."""
+    sb = SuperBoard()
+    sb.current_player = record.first_player
+    positions = []
+    for mv in record.moves:
+        positions.append(File.to_compact(sb))
+        board, position = divmod(mv, 9)
+        sb.push(board, position)
+        if sb.winner:
+            break
+    return positions
+
+
+async def request(host, port, method, path, payload=None, unix=None):
+    """One HTTP request to the service; returns (status, decoded JSON body)."""
+    if unix:
+        reader, writer = await asyncio.open_unix_connection(unix)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    try:
+        status = int((await reader.readline()).split()[1])
+        length = 0
+        while True:
+            header = await reader.readline()
+            if header in (b'\r\n', b''):
+                break
+            name, _, value = header.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        data = json.loads(await reader.readexactly(length)) if length else None
+    finally:
+        writer.close()
+    return status, data
+
+
+async def run_load(records, host='127.0.0.1', port=8765, clients=8, time_ms=100, deadline_ms=None,
+                   games=None, unix=None):
+    """
+    Replay recorded games against the service: each of `clients` tasks
+    takes the next game and asks for a move at every position of it in
+    turn, the way one live game would. Returns a summary dict with the
+    request count, statuses, throughput and latency percentiles.
+    """
+    with GameReader(records) as reader:
+        pending = [game_positions(record) for record in reader][:games]
+    latencies = []
+    statuses = {}
+    payload = {'time_ms': time_ms}
+    if deadline_ms is not None:
+        payload['deadline_ms'] = deadline_ms
+
+    async def client():
+        while pending:
+            for position in pending.pop():
+                start = time.perf_counter()
+                status, _ = await request(host, port, 'POST', '/move', dict(payload, position=position),
+                                          unix=unix)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    return {
+        'requests': len(latencies),
+        'statuses': statuses,
+        'seconds': round(elapsed, 2),
+        'per_second': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'p50_ms': percentile(latencies, 0.5),
+        'p90_ms': percentile(latencies, 0.9),
+        'p99_ms': percentile(latencies, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded games against service.py and report throughput.")
+    parser.add_argument('records', help="game record file (see game_records.py, tournament.py --records)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="connect to this Unix socket instead of TCP")
+    parser.add_argument('--clients', type=int, default=8, help="games played at once")
+    parser.add_argument('--games', type=int, help="replay only this many games")
+    parser.add_argument('--time-ms', type=int, default=100, help="search time per move")
+    parser.add_argument('--deadline-ms', type=float)
+    args = parser.parse_args()
+
+    summary = asyncio.run(run_load(args.records, args.host, args.port, args.clients, args.time_ms,
+                                   args.deadline_ms, args.games, args.unix))
+    for name, value in summary.items():
+        print(f"{name}: {value}")
+    status, metrics = asyncio.run(request(args.host, args.port, 'GET', '/metrics', unix=args.unix))
+    print(json.dumps(metrics, indent=2))
+
+
+if __name__ == '__main__':
+    main()
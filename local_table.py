@@ -0,0 +1,168 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from array import array
+
+from bitboard import WINNING_COMBINATIONS, LINE_MASKS, FULL, X, O
+
+SIZE = 3 ** 9  # every 3x3 board, empty/X/O per cell
+
+# TERNARY[m] is the base-3 value of a 9-bit mask with each set cell as a 1
+# digit, so the code of a local board is TERNARY[xmask] + 2 * TERNARY[omask].
+TERNARY = [sum(3 ** p for p in range(9) if m >> p & 1) for m in range(512)]
+TERNARY_O = [2 * t for t in TERNARY]
+
+# static eval of a local board from X's side: mark weights plus open twos
+CELL_WEIGHTS = (2, 1, 2, 1, 3, 1, 2, 1, 2)
+TWO_WEIGHT = 6
+
+# CELLS[m] lists the positions set in the 9-bit mask m
+CELLS = [tuple(p for p in range(9) if m >> p & 1) for m in range(512)]
+
+MAGIC = b'STTLOCAL'
+VERSION = 1
+HEADER = struct.Struct('=8sHHI')  # magic, version, byte-order marker, entries
+ORDER_MARK = 0x0102
+COLUMNS = (
+    ('winner', 'B'),     # 0 none, 1 X, 2 O (first line in WINNING_COMBINATIONS order)
+    ('full', 'B'),       # 1 when no cell is empty
+    ('empty', 'H'),      # 9-bit mask of empty cells
+    ('x_threats', 'B'),  # lines with two X and an empty third cell
+    ('o_threats', 'B'),
+    ('eval', 'h'),       # CELL_WEIGHTS and TWO_WEIGHT score from X's side
+)
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'local_table.bin')
+
+
+def code(xmask, omask):
+    return TERNARY[xmask] + TERNARY_O[omask]
+
+
+_GRID_DIGIT = {None: 0, X: 1, O: 2}
+
+
+def code_of(grid):
+    """Code of a game_engine.Board grid (a list of X, O or None)."""
+    d = _GRID_DIGIT
+    return (d[grid[0]] + 3 * d[grid[1]] + 9 * d[grid[2]] + 27 * d[grid[3]] + 81 * d[grid[4]]
+            + 243 * d[grid[5]] + 729 * d[grid[6]] + 2187 * d[grid[7]] + 6561 * d[grid[8]])
+
+
+def masks(c):
+    """(xmask, omask) of a local board code."""
+    xm = om = 0
+    for p in range(9):
+        c, digit = divmod(c, 3)
+        if digit == 1:
+            xm |= 1 << p
+        elif digit == 2:
+            om |= 1 << p
+    return xm, om
+
+
+def threats(own, opp):
+    return sum(1 for line in LINE_MASKS if not line & opp and (own & line).bit_count() == 2)
+
+
+def build():
+    """Compute the table. Returns the file contents as bytes."""
+    cols = {name: array(fmt) for name, fmt in COLUMNS}
+    for c in range(SIZE):
+        xm, om = masks(c)
+        winner = 0
+        for (a, b, d), line in zip(WINNING_COMBINATIONS, LINE_MASKS):
+            if xm & line == line:
+                winner = 1
+                break
+            if om & line == line:
+                winner = 2
+                break
+        xt, ot = threats(xm, om), threats(om, xm)
+        cols['winner'].append(winner)
+        cols['full'].append((xm | om) == FULL)
+        cols['empty'].append(FULL & ~(xm | om))
+        cols['x_threats'].append(xt)
+        cols['o_threats'].append(ot)
+        cols['eval'].append(sum(CELL_WEIGHTS[p] for p in CELLS[xm])
+                            - sum(CELL_WEIGHTS[p] for p in CELLS[om])
+                            + TWO_WEIGHT * (xt - ot))
+    out = bytearray(HEADER.pack(MAGIC, VERSION, ORDER_MARK, SIZE))
+    for name, _ in COLUMNS:
+        out += cols[name].tobytes()
+        if len(out) % 2:
+            out += b'\0'
+    return bytes(out)
+
+
+def _valid(buf):
+    return (len(buf) >= HEADER.size
+            and HEADER.unpack_from(buf) == (MAGIC, VERSION, ORDER_MARK, SIZE))
+
+
+def write(path=PATH):
+    """Build the table and write it atomically to path."""
+    data = build()
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return data
+
+
+def load(path=PATH):
+    """
+    Memory-map the table file read-only, building it first if it is missing
+    or stale. Every process maps the same file, so the pages are shared.
+    If the file cannot be written the table is kept in memory instead.
+    """
+    try:
+        with open(path, 'rb') as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if _valid(buf):
+            return buf
+        buf.close()
+    except (OSError, ValueError):
+        pass
+    try:
+        write(path)
+        with open(path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except OSError:
+        return build()
+
+
+def _columns(buf):
+    view = memoryview(buf)
+    offset = HEADER.size
+    cols = {}
+    for name, fmt in COLUMNS:
+        size = struct.calcsize(fmt) * SIZE
+        cols[name] = view[offset:offset + size].cast(fmt)
+        offset += size + size % 2
+    return cols
+
+
+_cols = _columns(load())
+WINNER = _cols['winner']
+IS_FULL = _cols['full']
+EMPTY = _cols['empty']
+X_THREATS = _cols['x_threats']
+O_THREATS = _cols['o_threats']
+EVAL = _cols['eval']
+del _cols
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the local board table file.")
+    parser.add_argument('--out', default=PATH)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    data = write(args.out)
+    print(f"wrote {len(data)} bytes ({SIZE} boards) to {args.out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+import math
+import random
+import time
+from array import array
+from collections import deque
+
+from bitboard import WINS, FULL, X
+
+NO_MOVE = 255
+
+
+class MCTSTree:
+    """
+    Monte Carlo tree search with UCT selection over a bitboard.BitBoard.
+
+    Nodes are stored in parallel arrays rather than one object each: node i
+    has its parent, the index of its first child (children of a node are
+    contiguous), its child count, the move that led to it as board*9 +
+    position, its visit count and its total reward from the point of view
+    of the player who made that move (1 for a win, 0.5 for a draw).
+
+    Keep one tree for a whole game: search() looks for the new position a
+    ply or two below the previous root and keeps that subtree.
+    """
+
+    def __init__(self, exploration=1.4, rollout='light', max_nodes=2_000_000, seed=None):
+        self.exploration = exploration
+        self.rollout = rollout
+        self.max_nodes = max_nodes
+        self.rng = random.Random(seed)
+        self.root_pos = None
+        self.last_playouts = 0
+        self.last_seconds = 0.0
+        self.reused_visits = 0
+        self.time_limit = math.inf
+        self._clear()
+
+    def _clear(self):
+        self.parent = array('i')
+        self.first_child = array('i')
+        self.num_children = array('B')
+        self.move = array('B')
+        self.visits = array('I')
+        self.value = array('d')
+        self._add(-1, NO_MOVE, 0, 0.0)
+
+    def _add(self, parent, move, visits, value):
+        self.parent.append(parent)
+        self.first_child.append(0)
+        self.num_children.append(0)
+        self.move.append(move)
+        self.visits.append(visits)
+        self.value.append(value)
+
+    def __len__(self):
+        return len(self.visits)
+
+    @property
+    def playouts_per_second(self):
+        return self.last_playouts / self.last_seconds if self.last_seconds else 0.0
+
+    def set_root(self, pos):
+        """
+        Make pos the root. If pos is the old root or one or two plies below
+        it, that subtree is kept and everything else is dropped.
+        """
+        found = None
+        if self.root_pos is not None and self.num_children[0]:
+            if self.root_pos.key == pos.key:
+                found = 0
+            else:
+                found = self._find(pos.key)
+        if found is None:
+            self._clear()
+        elif found:
+            self._extract(found)
+        self.reused_visits = self.visits[0]
+        self.root_pos = pos.clone()
+
+    def _find(self, key):
+        root = self.root_pos.clone()
+        first, count = self.first_child[0], self.num_children[0]
+        for child in range(first, first + count):
+            b, p = divmod(self.move[child], 9)
+            root.push(b, p)
+            if root.key == key:
+                return child
+            grand = self.first_child[child]
+            for gc in range(grand, grand + self.num_children[child]):
+                gb, gp = divmod(self.move[gc], 9)
+                root.push(gb, gp)
+                hit = root.key == key
+                root.pop()
+                if hit:
+                    return gc
+            root.pop()
+        return None
+
+    def _extract(self, new_root):
+        """Copy the subtree under new_root into fresh arrays, new_root becoming node 0."""
+        old_first, old_count = self.first_child, self.num_children
+        old_move, old_visits, old_value = self.move, self.visits, self.value
+        self._clear()
+        self.visits[0] = old_visits[new_root]
+        self.value[0] = old_value[new_root]
+        queue = deque([(new_root, 0)])
+        while queue:
+            old, new = queue.popleft()
+            count = old_count[old]
+            if not count:
+                continue
+            start = len(self.visits)
+            self.first_child[new] = start
+            self.num_children[new] = count
+            for i in range(count):
+                oc = old_first[old] + i
+                self._add(new, old_move[oc], old_visits[oc], old_value[oc])
+                queue.append((oc, start + i))
+
+    def _expand(self, node, pos):
+        moves = pos.legal_moves()
+        if not moves or len(self.visits) + len(moves) > self.max_nodes:
+            return
+        self.first_child[node] = len(self.visits)
+        self.num_children[node] = len(moves)
+        for b, p in moves:
+            self._add(node, b * 9 + p, 0, 0.0)
+
+    def _select(self, node):
+        visits = self.visits
+        value = self.value
+        first = self.first_child[node]
+        log_n = math.log(visits[node] or 1)
+        c = self.exploration
+        best, best_score = first, -1.0
+        for child in range(first, first + self.num_children[node]):
+            v = visits[child]
+            if v == 0:
+                return child
+            score = value[child] / v + c * math.sqrt(log_n / v)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def _playout(self, pos):
+        """Finish the game from pos with random (or 'light') moves. Returns the winner or None."""
+        rand = self.rng.random
+        light = self.rollout == 'light'
+        while pos.winner is None:
+            moves = pos.legal_moves()
+            if not moves:
+                return None
+            if light:
+                own = pos.xbits if pos.current_player == X else pos.obits
+                for b, p in moves:
+                    if WINS[((own >> (9 * b)) & FULL) | (1 << p)]:
+                        break
+                else:
+                    b, p = moves[int(rand() * len(moves))]
+            else:
+                b, p = moves[int(rand() * len(moves))]
+            pos.push(b, p)
+        return pos.winner
+
+    def run(self, playouts=None, time_ms=None):
+        """
+        Run playouts from root_pos until either limit is hit. Another
+        thread may end the run early by lowering self.time_limit.
+        """
+        if playouts is None and time_ms is None:
+            time_ms = 1000
+        start = time.perf_counter()
+        self.time_limit = math.inf if time_ms is None else start + time_ms / 1000
+        root_pos = self.root_pos
+        first_child, num_children = self.first_child, self.num_children
+        done = 0
+        while playouts is None or done < playouts:
+            if done & 63 == 0 and time.perf_counter() > self.time_limit:
+                break
+            pos = root_pos.clone()
+            node = 0
+            path = [0]
+            movers = [None]
+            while num_children[node] and pos.winner is None:
+                node = self._select(node)
+                b, p = divmod(self.move[node], 9)
+                movers.append(pos.current_player)
+                pos.push(b, p)
+                path.append(node)
+            if pos.winner is None and (self.visits[node] or node == 0):
+                self._expand(node, pos)
+                if num_children[node]:
+                    node = self._select(node)
+                    b, p = divmod(self.move[node], 9)
+                    movers.append(pos.current_player)
+                    pos.push(b, p)
+                    path.append(node)
+            winner = self._playout(pos)
+            visits, value = self.visits, self.value
+            for n, mover in zip(path, movers):
+                visits[n] += 1
+                if winner is None:
+                    value[n] += 0.5
+                elif winner == mover:
+                    value[n] += 1.0
+            done += 1
+        self.last_playouts = done
+        self.last_seconds = time.perf_counter() - start
+        return done
+
+    def best_move(self):
+        """The most visited root move as (board, position), or None."""
+        first, count = self.first_child[0], self.num_children[0]
+        if not count:
+            return None
+        best = max(range(first, first + count), key=self.visits.__getitem__)
+        return divmod(self.move[best], 9)
+
+    def search(self, pos, playouts=None, time_ms=None):
+        self.set_root(pos)
+        self.run(playouts, time_ms)
+        return self.best_move()
@@ -0,0 +1,198 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from bitboard import BitBoard
+from game_engine import SuperBoard, Strategy, TranspositionTable, SearchStats
+from symmetry import canonicalize, canonical_key, unmap_move
+
+MAGIC = b'STTBOOK\0'
+VERSION = 2  # 2: keyed by the canonical position (see symmetry.py)
+HEADER = struct.Struct('<8sHHII')  # magic, version, search depth, plies covered, entries
+ENTRY = struct.Struct('<QBBhi')    # key, move (board*9 + position), depth, unused, score
+KEY = struct.Struct('<Q')
+
+PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'opening_book.bin')
+
+
+class OpeningBook:
+    """
+    Read-only opening book: a sorted array of fixed-size entries keyed by
+    the Zobrist key of the canonical position (symmetry.canonicalize), so
+    one entry serves all eight rotations and reflections of a position.
+    The file is memory-mapped and searched by bisection.
+
+    lookup(key) returns (move, depth, score) for a canonical key, with the
+    move as (board, position) in the canonical orientation and the score
+    from the side to move, or None. probe(pos) takes any position.
+    """
+
+    def __init__(self, path=PATH):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._buf) < HEADER.size:
+            raise ValueError(f"{path} is not an opening book")
+        magic, version, self.depth, self.plies, self.entries = HEADER.unpack_from(self._buf)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an opening book")
+        if version != VERSION:
+            raise ValueError(f"{path} is book version {version}, expected {VERSION}")
+        if len(self._buf) != HEADER.size + self.entries * ENTRY.size:
+            raise ValueError(f"{path} is truncated")
+
+    @classmethod
+    def open_default(cls):
+        """The book at PATH, or None if it has not been built."""
+        try:
+            return cls(PATH)
+        except (OSError, ValueError):
+            return None
+
+    def __len__(self):
+        return self.entries
+
+    def close(self):
+        self._buf.close()
+
+    def lookup(self, key):
+        buf = self._buf
+        unpack = KEY.unpack_from
+        lo, hi = 0, self.entries
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if unpack(buf, HEADER.size + mid * ENTRY.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.entries:
+            return None
+        k, move, depth, _, score = ENTRY.unpack_from(buf, HEADER.size + lo * ENTRY.size)
+        if k != key:
+            return None
+        return divmod(move, 9), depth, score
+
+    def probe(self, pos):
+        """Book move for a BitBoard if it has one and it is legal there."""
+        key, t = canonical_key(pos)
+        entry = self.lookup(key)
+        if entry is None:
+            return None
+        move = unmap_move(entry[0], t)
+        if move not in pos.legal_moves():
+            return None
+        return (move,) + entry[1:]
+
+
+def write_book(path, entries, depth, plies):
+    """Write (key, move, depth, score) tuples as a sorted book file, atomically."""
+    entries = sorted(entries)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, depth, plies, len(entries)))
+        for key, move, d, score in entries:
+            f.write(ENTRY.pack(key, move, d, 0, score))
+    os.replace(tmp, path)
+
+
+def book_positions(plies):
+    """
+    Positions with fewer than `plies` moves played, as canonical BitBoards,
+    one per symmetry class.
+    """
+    seen = {}
+    frontier = [BitBoard()]
+    for ply in range(plies):
+        next_frontier = []
+        for pos in frontier:
+            pos, _ = canonicalize(pos)
+            if pos.key in seen or pos.winner is not None:
+                continue
+            seen[pos.key] = pos
+            if ply + 1 < plies:
+                for b, p in pos.legal_moves():
+                    child = pos.clone()
+                    child.push(b, p)
+                    next_frontier.append(child)
+        frontier = next_frontier
+    return list(seen.values())
+
+
+def _search_position(pos, depth):
+    """Worker task: (key, move, depth, score) for one position."""
+    sb = SuperBoard.from_bitboard(pos)
+    stats = SearchStats()
+    b, p = Strategy.minimax_pick(sb, depth=depth, tt=TranspositionTable(size_mb=16), stats=stats)
+    return pos.key, b * 9 + p, depth, stats.score
+
+
+def _read_progress(path):
+    done = {}
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 4:  # a run killed mid-write leaves a short last line
+                    key, move, depth, score = map(int, parts)
+                    done[key] = (key, move, depth, score)
+    return done
+
+
+def build_book(path=PATH, plies=2, depth=6, workers=1, progress=None, log=print):
+    """
+    Search every position of the first `plies` plies to `depth` with
+    Strategy.minimax_pick and write the book to path.
+
+    Finished positions are appended to a progress file (path + '.progress'
+    by default) as they come in, so an interrupted build picks up where it
+    stopped. The progress file is removed once the book is written.
+    """
+    progress = progress or path + '.progress'
+    positions = book_positions(plies)
+    wanted = {pos.key for pos in positions}
+    done = {k: v for k, v in _read_progress(progress).items() if v[2] >= depth and k in wanted}
+    todo = [pos for pos in positions if pos.key not in done]
+    log(f"{len(done)} positions already searched, {len(todo)} to go")
+
+    start = time.perf_counter()
+    with open(progress, 'a', encoding='utf-8') as out:
+        def record(entry):
+            done[entry[0]] = entry
+            out.write(' '.join(map(str, entry)) + '\n')
+            out.flush()
+            count = len(done)
+            if count % 50 == 0:
+                log(f"{count} positions, {time.perf_counter() - start:.0f}s")
+
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_search_position, pos, depth) for pos in todo]
+                for f in as_completed(futures):
+                    record(f.result())
+        else:
+            for pos in todo:
+                record(_search_position(pos, depth))
+
+    write_book(path, done.values(), depth, plies)
+    os.remove(progress)
+    return len(done)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the opening book from deep searches.")
+    parser.add_argument('--plies', type=int, default=2, help="cover positions with fewer than this many moves")
+    parser.add_argument('--depth', type=int, default=6, help="search depth per position")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--out', default=PATH)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    n = build_book(args.out, args.plies, args.depth, args.workers)
+    print(f"wrote {n} positions to {args.out} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
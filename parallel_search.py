@@ -0,0 +1,204 @@
+import argparse
+import atexit
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from bitboard import BitBoard
+from Minimax import Searcher, INF
+from transposition import TranspositionTable
+
+WORKER_TT_MB = 16
+
+_pool = None
+_pool_workers = 0
+_shared_alpha = None
+_search_id = 0
+
+# per-process state set up by _init_worker
+_worker_alpha = None
+_worker_tt = None
+_worker_search_id = None
+
+
+def _init_worker(shared_alpha, tt_mb):
+    global _worker_alpha, _worker_tt
+    _worker_alpha = shared_alpha
+    _worker_tt = TranspositionTable(size_mb=tt_mb)
+
+
+def get_pool(workers):
+    """
+    Return the shared process pool, (re)starting it if the size changed.
+    The pool lives until shutdown_pool() or interpreter exit, so a game
+    only pays process start-up once.
+    """
+    global _pool, _pool_workers, _shared_alpha
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _shared_alpha = multiprocessing.Value('q', -INF)
+        _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                    initargs=(_shared_alpha, WORKER_TT_MB))
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+        _pool_workers = 0
+
+
+atexit.register(shutdown_pool)
+
+
+def _search_root_move(pos, move, depth, deterministic, search_id):
+    """
+    Worker task: score one root move. Returns (score, alpha, nodes), where
+    alpha is the bound the search ran against: a score <= alpha failed
+    low and is only an upper bound.
+    """
+    global _worker_search_id
+    if deterministic:
+        searcher = Searcher(TranspositionTable(size_mb=1))
+        alpha = -INF
+    else:
+        if _worker_search_id != search_id:
+            _worker_search_id = search_id
+            _worker_tt.new_search()
+        searcher = Searcher(_worker_tt)
+        alpha = _worker_alpha.value
+    pos.push(move[0], move[1])
+    score = -searcher.search(pos, depth - 1, -INF, -alpha, 1)
+    if not deterministic and score > alpha:
+        with _worker_alpha.get_lock():
+            if score > _worker_alpha.value:
+                _worker_alpha.value = score
+    return score, alpha, searcher.nodes
+
+
+def parallel_pick(pos, depth, workers, tt=None, deterministic=True):
+    """
+    Root-split search of pos to depth on `workers` processes.
+
+    Returns (score, move, nodes) with the score from the side to move.
+    tt, if given, only supplies the root hash move for ordering.
+
+    In deterministic mode every root move gets a full-window search with
+    a fresh transposition table, so the scores are exact and the move
+    picked (the first best in the serial root order) is the one
+    Searcher.pick returns. Otherwise the first move is searched alone to
+    set alpha, the rest are fanned out, and workers share alpha through
+    shared memory and keep their own table across calls. That prunes more;
+    only moves that beat the alpha they read have exact scores, and a move
+    that failed low at the best score is re-searched, so ties go to the
+    first move in root order as in the serial search. Deeper results left
+    in the workers' tables by earlier calls can still shift scores.
+    """
+    global _search_id
+    moves = pos.legal_moves()
+    if pos.winner is not None or depth == 0 or not moves:
+        return Searcher().search(pos, depth), None, 1
+
+    root = Searcher(tt)
+    hash_move = None
+    if tt is not None:
+        entry = tt.probe(pos.key)
+        if entry is not None:
+            hash_move = entry[3]
+    moves = root.order_moves(pos, moves, 0, hash_move)
+
+    pool = get_pool(workers)
+    _search_id += 1
+    if deterministic:
+        futures = [pool.submit(_search_root_move, pos, mv, depth, True, _search_id)
+                   for mv in moves]
+        results = [f.result() for f in futures]
+    else:
+        _shared_alpha.value = -INF
+        first = pool.submit(_search_root_move, pos, moves[0], depth, False, _search_id).result()
+        futures = [pool.submit(_search_root_move, pos, mv, depth, False, _search_id)
+                   for mv in moves[1:]]
+        results = [first] + [f.result() for f in futures]
+
+    best, best_move, nodes = _choose(pos, depth, moves, results)
+    return best, best_move, nodes + 1
+
+
+def _choose(pos, depth, moves, results):
+    """
+    (score, move, nodes) from the _search_root_move results of moves, in
+    root order. Only exact scores compete; a move before the winner that
+    failed low at the winning score is re-searched with a null window, as
+    the serial search plays the first of equal moves.
+    """
+    best, best_move = -INF, None
+    nodes = 0
+    for mv, (score, alpha, n) in zip(moves, results):
+        nodes += n
+        if score > alpha and score > best:
+            best, best_move = score, mv
+    # a move before best_move that failed low against alpha == best may tie it
+    for mv, (score, alpha, n) in zip(moves, results):
+        if mv == best_move:
+            break
+        if score <= alpha and score >= best:
+            searcher = Searcher()
+            pos.push(mv[0], mv[1])
+            try:
+                tied = -searcher.search(pos, depth - 1, -best, -best + 1, 1) >= best
+            finally:
+                pos.pop()
+            nodes += searcher.nodes
+            if tied:
+                best_move = mv
+                break
+    return best, best_move, nodes
+
+
+def benchmark(pos, depth, workers, deterministic=True):
+    """Time the serial and parallel search of pos and report the speedup."""
+    get_pool(workers)  # start-up is paid once per game, so keep it out of the timing
+
+    start = time.perf_counter()
+    serial = Searcher()
+    serial_score, serial_move = serial.pick(pos.clone(), depth)
+    serial_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    score, move, nodes = parallel_pick(pos.clone(), depth, workers, deterministic=deterministic)
+    parallel_time = time.perf_counter() - start
+
+    return {
+        'depth': depth,
+        'workers': workers,
+        'deterministic': deterministic,
+        'serial': {'score': serial_score, 'move': serial_move,
+                   'nodes': serial.nodes, 'seconds': serial_time},
+        'parallel': {'score': score, 'move': move,
+                     'nodes': nodes, 'seconds': parallel_time},
+        'speedup': serial_time / parallel_time if parallel_time else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare serial and parallel search speed.")
+    parser.add_argument('--depth', type=int, default=6)
+    parser.add_argument('--workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--fast', action='store_true', help="shared-alpha mode instead of deterministic")
+    args = parser.parse_args()
+
+    pos = BitBoard()
+    pos.push(4, 4)
+    report = benchmark(pos, args.depth, args.workers, deterministic=not args.fast)
+    for mode in ('serial', 'parallel'):
+        r = report[mode]
+        print(f"{mode:8} move={r['move']} score={r['score']} nodes={r['nodes']} "
+              f"time={r['seconds']:.3f}s nps={r['nodes'] / r['seconds']:.0f}")
+    print(f"speedup: {report['speedup']:.2f}x with {args.workers} workers")
+
+
+if __name__ == '__main__':
+    main()
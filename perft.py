@@ -0,0 +1,112 @@
+import argparse
+import time
+
+from game_engine import SuperBoard, File
+from Minimax import legal_moves
+
+
+def perft(pos, depth, cache=None):
+    """
+    Number of move sequences of exactly depth plies from pos (a BitBoard,
+    left unchanged). A won game has no moves, so it only counts at depth
+    0. The last ply is counted from the length of the move list without
+    playing it.
+
+    cache, a dict, remembers counts by (key, depth) so transpositions are
+    counted once; pass the same dict to reuse it across calls.
+    """
+    if depth == 0:
+        return 1
+    if pos.winner is not None:
+        return 0
+    moves = pos.legal_moves()
+    if depth == 1:
+        return len(moves)
+    if cache is not None:
+        entry = (pos.key, depth)
+        count = cache.get(entry)
+        if count is not None:
+            return count
+    count = 0
+    push = pos.push
+    pop = pos.pop
+    for mv in moves:
+        push(mv[0], mv[1])
+        count += perft(pos, depth - 1, cache)
+        pop()
+    if cache is not None:
+        cache[entry] = count
+    return count
+
+
+def divide(pos, depth, cache=None):
+    """[(move, perft of depth - 1 after it)] for every legal move of pos."""
+    if pos.winner is not None or depth < 1:
+        return []
+    result = []
+    for mv in pos.legal_moves():
+        pos.push(mv[0], mv[1])
+        result.append((mv, perft(pos, depth - 1, cache)))
+        pos.pop()
+    return result
+
+
+def reference_perft(sb, depth):
+    """
+    perft on a game_engine.SuperBoard with Minimax.legal_moves and
+    SuperBoard.push/pop, the engine's original rules; slow, but the
+    standard the bitboard counts are checked against.
+    """
+    if depth == 0:
+        return 1
+    if sb.winner is not None:
+        return 0
+    count = 0
+    for b, p in list(legal_moves(sb)):
+        sb.push(b, p)
+        count += reference_perft(sb, depth - 1)
+        sb.pop()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Count move sequences (perft) to check and time move generation.")
+    parser.add_argument('position', nargs='?',
+                        help="board file or compact position (default: the start position)")
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--divide', action='store_true', help="print the count under each root move")
+    parser.add_argument('--hash', action='store_true', help="count transpositions once")
+    parser.add_argument('--reference', action='store_true',
+                        help="also count with the SuperBoard rules and compare")
+    args = parser.parse_args()
+
+    if args.position is None:
+        sb = SuperBoard()
+    elif args.position.count('/') == 8:
+        sb = File.parse_compact(args.position)
+    else:
+        sb = File.parse_board(args.position)
+    pos = sb.to_bitboard()
+    pos.check_winner()
+    cache = {} if args.hash else None
+
+    for depth in range(1, args.depth + 1):
+        start = time.perf_counter()
+        nodes = perft(pos, depth, cache)
+        elapsed = time.perf_counter() - start
+        print(f"depth {depth}: {nodes} nodes in {elapsed:.3f}s ({nodes / max(elapsed, 1e-9):,.0f} nps)")
+
+    if args.divide:
+        for (b, p), count in divide(pos, args.depth, cache):
+            print(f"  {b} {p}: {count}")
+
+    if args.reference:
+        start = time.perf_counter()
+        expected = reference_perft(sb, args.depth)
+        elapsed = time.perf_counter() - start
+        ok = "matches" if expected == perft(pos, args.depth, cache) else "DIFFERS"
+        print(f"reference: {expected} nodes in {elapsed:.3f}s, {ok}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,378 @@
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import time
+
+import local_table  # builds local_table.bin before the workers map it
+from ai_worker import AIWorker
+from game_engine import File
+from Minimax import legal_moves
+
+MAX_QUEUE = 256          # queued requests beyond this are turned away with 503
+DEFAULT_TIME_MS = 500    # search time when a request does not give one
+POLL_SECS = 0.005        # how often busy workers are checked for results
+DEADLINE_MARGIN_MS = 20  # kept back from a request's deadline for the reply
+MAX_BODY = 1 << 16
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 503: 'Service Unavailable',
+           504: 'Gateway Timeout'}
+
+
+class ServiceError(Exception):
+    """A request the service will not answer with a move; status is the HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Histogram:
+    """Counts of values (milliseconds) at or below each bound, plus one overflow bucket."""
+
+    def __init__(self, bounds=BUCKETS_MS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, ms):
+        i = 0
+        while i < len(self.bounds) and ms > self.bounds[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += ms
+
+    def as_dict(self):
+        labels = [f"le_{b}" for b in self.bounds] + ['inf']
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count, 2) if self.count else None,
+            'buckets': dict(zip(labels, self.counts)),
+        }
+
+
+class _Request:
+    __slots__ = ('sb', 'time_ms', 'priority', 'deadline', 'arrived', 'started', 'future',
+                 'slot', 'cancelled')
+
+    def __init__(self, sb, time_ms, priority, deadline, future):
+        self.sb = sb
+        self.time_ms = time_ms
+        self.priority = priority
+        self.deadline = deadline  # perf_counter time, or None
+        self.arrived = time.perf_counter()
+        self.started = None
+        self.future = future
+        self.slot = None
+        self.cancelled = False
+
+
+class MoveService:
+    """
+    Schedules move requests for many games onto a fixed pool of
+    ai_worker.AIWorker processes.
+
+    Waiting requests are served highest priority first and, within a
+    priority, earliest deadline first. A request's search time is cut so
+    the reply can make its deadline; one whose deadline has passed before
+    a worker is free fails with status 504 without being searched. At most
+    max_queue requests wait; more are refused with 503. cancel() drops a
+    waiting request or stops its worker mid-search.
+
+    Every worker keeps its own transposition table and endgame cache
+    between requests. The precomputed tables (local_table.bin and the
+    opening book) are memory-mapped files, so all workers share one copy
+    through the page cache.
+    """
+
+    def __init__(self, workers=2, max_queue=MAX_QUEUE, tt_mb=16, book=True):
+        self.n_workers = workers
+        self.max_queue = max_queue
+        self.tt_mb = tt_mb
+        self.book = book
+        self.workers = []
+        self._busy = {}      # worker index -> _Request
+        self._queue = []     # heap of (-priority, deadline, seq, _Request)
+        self._seq = itertools.count()
+        self._wake = None
+        self._task = None
+        self.counters = dict(completed=0, rejected=0, expired=0, cancelled=0, errors=0)
+        self.latency = Histogram()
+        self.queue_wait = Histogram()
+        self.search_time = Histogram()
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.workers = await asyncio.gather(*(
+            loop.run_in_executor(None, lambda: AIWorker(tt_mb=self.tt_mb, book=self.book))
+            for _ in range(self.n_workers)))
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._dispatch())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        for _, _, _, req in self._queue:
+            if not req.future.done():
+                req.future.set_exception(ServiceError(503, "service shutting down"))
+        self._queue = []
+        for worker in self.workers:
+            worker.close()
+
+    async def submit(self, sb, time_ms=DEFAULT_TIME_MS, priority=0, deadline_ms=None):
+        """
+        Queue a move request for sb and wait for the result dict (see
+        AIWorker) plus 'queued_ms' and 'total_ms'. Raises ServiceError.
+        Cancelling the awaiting task cancels the request.
+        """
+        if sb.winner or next(legal_moves(sb), None) is None:
+            raise ServiceError(400, "the game is over")
+        if self.queue_depth() >= self.max_queue:
+            self.counters['rejected'] += 1
+            raise ServiceError(503, "queue full")
+        deadline = None if deadline_ms is None else time.perf_counter() + deadline_ms / 1000
+        req = _Request(sb, time_ms, priority, deadline, asyncio.get_running_loop().create_future())
+        heapq.heappush(self._queue, (-priority, deadline if deadline is not None else float('inf'),
+                                     next(self._seq), req))
+        self._wake.set()
+        try:
+            return await req.future
+        except asyncio.CancelledError:
+            self.cancel(req)
+            raise
+
+    def cancel(self, req):
+        if req.cancelled:
+            return
+        req.cancelled = True
+        self.counters['cancelled'] += 1
+        if req.slot is not None:
+            self.workers[req.slot].cancel()
+            del self._busy[req.slot]
+            req.slot = None
+        # a queued request is skipped when it reaches the front
+
+    def queue_depth(self):
+        return sum(1 for *_, req in self._queue if not (req.cancelled or req.future.done()))
+
+    def metrics(self):
+        return {
+            'workers': self.n_workers,
+            'queue_depth': self.queue_depth(),
+            'in_flight': len(self._busy),
+            **self.counters,
+            'latency_ms': self.latency.as_dict(),
+            'queue_wait_ms': self.queue_wait.as_dict(),
+            'search_ms': self.search_time.as_dict(),
+        }
+
+    def _finish(self, req, result):
+        now = time.perf_counter()
+        queued = (req.started - req.arrived) * 1000
+        total = (now - req.arrived) * 1000
+        self.queue_wait.add(queued)
+        self.search_time.add((now - req.started) * 1000)
+        self.latency.add(total)
+        if req.future.done():
+            return
+        if result.get('move') is None:
+            self.counters['errors'] += 1
+            req.future.set_exception(ServiceError(503, "no move found"))
+            return
+        self.counters['completed'] += 1
+        req.future.set_result(dict(result, queued_ms=round(queued, 1), total_ms=round(total, 1)))
+
+    def _start_next(self, slot):
+        """Give worker slot the most urgent waiting request that can still make its deadline."""
+        while self._queue:
+            _, _, _, req = heapq.heappop(self._queue)
+            if req.cancelled or req.future.done():
+                continue
+            now = time.perf_counter()
+            budget = req.time_ms
+            if req.deadline is not None:
+                budget = min(budget, (req.deadline - now) * 1000 - DEADLINE_MARGIN_MS)
+                if budget < 1:
+                    self.counters['expired'] += 1
+                    req.future.set_exception(ServiceError(504, "deadline passed before a worker was free"))
+                    continue
+            worker = self.workers[slot]
+            worker.time_ms = budget
+            req.started = now
+            req.slot = slot
+            self._busy[slot] = req
+            worker.search(req.sb)
+            return
+
+    async def _dispatch(self):
+        while True:
+            for slot, req in list(self._busy.items()):
+                result = self.workers[slot].poll()
+                if result is not None:
+                    del self._busy[slot]
+                    req.slot = None
+                    self._finish(req, result)
+            for slot in range(self.n_workers):
+                if slot not in self._busy:
+                    self._start_next(slot)
+            self._wake.clear()
+            if self._busy:
+                await asyncio.sleep(POLL_SECS)
+            else:
+                await self._wake.wait()
+
+
+async def read_request(reader):
+    """(method, path, body bytes) of one HTTP/1.1 request; ValueError if malformed."""
+    line = await reader.readline()
+    if not line:
+        raise EOFError
+    try:
+        method, path, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise ValueError("bad request line") from None
+    length = 0
+    while True:
+        header = await reader.readline()
+        if header in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = header.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    if length > MAX_BODY:
+        raise ValueError("body too large")
+    body = await reader.readexactly(length) if length else b''
+    return method, path, body
+
+
+def write_response(writer, status, payload):
+    body = json.dumps(payload).encode('utf-8')
+    writer.write(f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                 f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                 f"Connection: close\r\n\r\n".encode('latin-1') + body)
+
+
+class Server:
+    """
+    HTTP/JSON front end for a MoveService, one request per connection.
+
+      POST /move     {"position": compact, "time_ms": 500, "priority": 0, "deadline_ms": 1000}
+                     -> {"move": [board, position], "depth", "score", "nodes", "queued_ms", "total_ms", ...}
+      GET  /metrics  -> queue depth, in-flight searches, counters and latency histograms
+      GET  /health   -> {"ok": true}
+
+    position is File.to_compact notation. A client that disconnects while
+    its move is queued or being searched has the request cancelled.
+    """
+
+    def __init__(self, service):
+        self.service = service
+
+    async def handle(self, reader, writer):
+        try:
+            try:
+                method, path, body = await read_request(reader)
+            except EOFError:
+                return
+            except (ValueError, asyncio.IncompleteReadError) as e:
+                write_response(writer, 400, {'error': str(e)})
+                return
+            if method == 'GET' and path == '/metrics':
+                write_response(writer, 200, self.service.metrics())
+            elif method == 'GET' and path == '/health':
+                write_response(writer, 200, {'ok': True})
+            elif method == 'POST' and path == '/move':
+                await self._move(reader, writer, body)
+            else:
+                write_response(writer, 404, {'error': f"no route {method} {path}"})
+        finally:
+            try:
+                await writer.drain()
+                writer.close()
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+    async def _move(self, reader, writer, body):
+        try:
+            request = json.loads(body)
+            sb = File.parse_compact(request['position'])
+            args = dict(time_ms=int(request.get('time_ms', DEFAULT_TIME_MS)),
+                        priority=int(request.get('priority', 0)),
+                        deadline_ms=request.get('deadline_ms'))
+            if args['deadline_ms'] is not None:
+                args['deadline_ms'] = float(args['deadline_ms'])
+        except (ValueError, KeyError, TypeError) as e:
+            write_response(writer, 400, {'error': f"bad move request: {e}"})
+            return
+        job = asyncio.ensure_future(self.service.submit(sb, **args))
+        gone = asyncio.ensure_future(reader.read(1))  # completes when the client hangs up
+        done, _ = await asyncio.wait({job, gone}, return_when=asyncio.FIRST_COMPLETED)
+        if job not in done:
+            job.cancel()
+            try:
+                await job
+            except (asyncio.CancelledError, ServiceError):
+                pass
+            return
+        gone.cancel()
+        try:
+            result = job.result()
+        except ServiceError as e:
+            write_response(writer, e.status, {'error': str(e)})
+            return
+        result['move'] = list(result['move'])
+        write_response(writer, 200, result)
+
+
+async def serve(host='127.0.0.1', port=8765, unix=None, workers=2, max_queue=MAX_QUEUE, tt_mb=16,
+                book=True, ready=None):
+    """Run the service until cancelled. ready, if given, is called with the listening server."""
+    service = MoveService(workers, max_queue, tt_mb, book)
+    await service.start()
+    handler = Server(service).handle
+    if unix:
+        server = await asyncio.start_unix_server(handler, path=unix)
+    else:
+        server = await asyncio.start_server(handler, host, port)
+    if ready is not None:
+        ready(server)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve AI moves for many games over HTTP/JSON.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--unix', help="listen on this Unix socket instead of TCP")
+    parser.add_argument('--workers', type=int, default=2, help="search processes")
+    parser.add_argument('--max-queue', type=int, default=MAX_QUEUE)
+    parser.add_argument('--tt-mb', type=int, default=16, help="transposition table per worker")
+    parser.add_argument('--no-book', action='store_true')
+    args = parser.parse_args()
+
+    def ready(server):
+        where = args.unix or f"http://{args.host}:{args.port}"
+        print(f"serving on {where} with {args.workers} workers", flush=True)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.max_queue, args.tt_mb,
+                          not args.no_book, ready))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+from bitboard import BitBoard, FULL
+
+
+def _perm(f):
+    return tuple(3 * r2 + c2 for r2, c2 in (f(i // 3, i % 3) for i in range(9)))
+
+
+# The 8 symmetries of a 3x3 grid (the D4 group) as permutations of the
+# indices 0-8: index i moves to PERMS[t][i]. The same permutation is
+# applied to the local board indices and to the cells inside every board,
+# which also moves next_board along with the board it names.
+PERMS = (
+    _perm(lambda r, c: (r, c)),          # identity
+    _perm(lambda r, c: (c, 2 - r)),      # rotate 90 clockwise
+    _perm(lambda r, c: (2 - r, 2 - c)),  # rotate 180
+    _perm(lambda r, c: (2 - c, r)),      # rotate 270 clockwise
+    _perm(lambda r, c: (r, 2 - c)),      # mirror left-right
+    _perm(lambda r, c: (2 - r, c)),      # mirror top-bottom
+    _perm(lambda r, c: (c, r)),          # transpose
+    _perm(lambda r, c: (2 - c, 2 - r)),  # anti-transpose
+)
+IDENTITY = 0
+
+# INVERSE[t] undoes transform t
+INVERSE = tuple(next(u for u in range(8) if all(PERMS[u][PERMS[t][i]] == i for i in range(9)))
+                for t in range(8))
+
+# MASK_PERMS[t][m] is the 9-bit mask m with its bits moved by PERMS[t]
+MASK_PERMS = tuple(
+    tuple(sum(1 << perm[i] for i in range(9) if m >> i & 1) for m in range(512))
+    for perm in PERMS
+)
+
+# SHIFTS[t][b] is where board b's nine cells start in the transformed 81-bit mask
+SHIFTS = tuple(tuple(9 * perm[b] for b in range(9)) for perm in PERMS)
+
+
+def _cells(bits, masks, shifts):
+    out = 0
+    for b in range(9):
+        local = (bits >> (9 * b)) & FULL
+        if local:
+            out |= masks[local] << shifts[b]
+    return out
+
+
+def map_move(move, t):
+    """Where the move (board, position) lands under transform t."""
+    perm = PERMS[t]
+    return (perm[move[0]], perm[move[1]])
+
+
+def unmap_move(move, t):
+    """The move in the original orientation of a move made in transform t of it."""
+    return map_move(move, INVERSE[t])
+
+
+def _image(pos, t):
+    """(xbits, obits, next_board) of pos under transform t."""
+    masks = MASK_PERMS[t]
+    shifts = SHIFTS[t]
+    nb = pos.next_board
+    return (_cells(pos.xbits, masks, shifts), _cells(pos.obits, masks, shifts),
+            -1 if nb is None else PERMS[t][nb])
+
+
+def transform(pos, t):
+    """A new BitBoard holding pos under transform t (without move history)."""
+    masks = MASK_PERMS[t]
+    out = BitBoard()
+    out.xbits, out.obits, nb = _image(pos, t)
+    out.xowned = masks[pos.xowned]
+    out.oowned = masks[pos.oowned]
+    out.closed = masks[pos.closed]
+    out.current_player = pos.current_player
+    out.next_board = None if nb < 0 else nb
+    out.winner = pos.winner
+    out.key = out.compute_key()
+    return out
+
+
+def canonical_transform(pos):
+    """
+    The transform that takes pos to its canonical orientation: the one
+    whose (xbits, obits, next_board) compares smallest. Every position of
+    a symmetry class has the same canonical image.
+    """
+    best = None
+    best_t = IDENTITY
+    for t in range(8):
+        image = _image(pos, t)
+        if best is None or image < best:
+            best = image
+            best_t = t
+    return best_t
+
+
+def canonicalize(pos):
+    """(canonical BitBoard, t) with canonical == transform(pos, t)."""
+    t = canonical_transform(pos)
+    return transform(pos, t), t
+
+
+def canonical_key(pos):
+    """(Zobrist key of the canonical position, t), for symmetry-aware caches."""
+    canon, t = canonicalize(pos)
+    return canon.key, t
@@ -0,0 +1,31 @@
+import time
+from ai_worker import AIWorker
+from game_engine import SuperBoard, File
+from Minimax import legal_moves
+
+# O to move has a single legal move, (0, 8), so the ponder's guess is known
+FORCED = 'XOXXOOOX./........./........./........./X......../........./........./........./......... O 0'
+
+
+def test_search_ponder_and_cancel():
+    worker = AIWorker(time_ms=100, book=False)
+    try:
+        sb = SuperBoard()
+        worker.search(sb)
+        result = worker.wait(timeout=30)
+        assert result['move'] in set(legal_moves(sb)) and result['depth'] >= 1
+
+        # what the CLI and GUI do: ponder, leave the worker alone while the human thinks, search
+        sb = File.parse_compact(FORCED)
+        worker.ponder(sb)
+        time.sleep(1.0)
+        sb.make_move(8, board=0)
+        worker.search(sb)
+        result = worker.wait(timeout=30)
+        assert result['ponderhit'] and result['move'] in set(legal_moves(sb))
+
+        worker.search(sb)
+        worker.cancel()
+        assert not worker.busy and worker.poll() is None
+    finally:
+        worker.close()
@@ -0,0 +1,56 @@
+import io
+import json
+import os
+import pytest
+from game_engine import File, SuperBoard
+from analyze import run
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'example.txt')
+
+
+def test_compact_notation_round_trip():
+    sb = File.parse_board(EXAMPLE)
+    line = File.to_compact(sb)
+    assert str(File.parse_compact(line)) == str(sb)
+    assert File.to_compact(SuperBoard()) == '/'.join(['.' * 9] * 9) + ' X -'
+    with open(EXAMPLE) as f:
+        text = f.read()
+    boards = list(File.iter_boards(io.StringIO(text + line + '\n' + text)))
+    assert [File.to_compact(b) for b in boards] == [line] * 3
+
+
+def test_board_blocks_without_or_reordered_headers():
+    with open(EXAMPLE) as f:
+        text = f.read()
+    grid = text[text.index('(1,1)'):]
+    reordered = 'Active Board: (2, 1)\nCurrent Player: X\n\n' + grid
+    expected = File.to_compact(File.parse_board(EXAMPLE))
+    for layout in (grid, reordered):
+        boards = list(File.iter_boards(io.StringIO(layout + '\n' + layout)))
+        assert [File.to_compact(b) for b in boards] == [File.to_compact(File.parse_board(layout.splitlines()))] * 2
+    assert File.to_compact(list(File.iter_boards(io.StringIO(reordered)))[0]) == expected
+    for text in ('', 'Current Player: X\n', 'hello\n'):
+        with pytest.raises(ValueError):
+            list(File.iter_boards(io.StringIO(text)))
+
+
+def test_batch_analysis_resumes(tmp_path):
+    (tmp_path / 'in').mkdir()
+    (tmp_path / 'in' / 'a.txt').write_text(open(EXAMPLE).read())
+    (tmp_path / 'in' / 'b.txt').write_text(File.to_compact(SuperBoard()) + '\n'
+                                            + File.to_compact(File.parse_board(EXAMPLE)) + '\n')
+    out = str(tmp_path / 'out.jsonl')
+    assert run([str(tmp_path / 'in')], out, time_ms=1000, max_depth=2) == 3
+    with open(out) as f:
+        first = [json.loads(line) for line in f]
+    assert [r['source'].rsplit(os.sep, 1)[-1] for r in first] == ['a.txt:0', 'b.txt:0', 'b.txt:1']
+    assert all(r['depth'] == 2 and r['nodes'] > 0 and r['move'] for r in first)
+
+    with open(out, 'r+') as f:  # keep one line and a torn second one
+        f.truncate(len(f.readline()) + 10)
+    assert run([str(tmp_path / 'in')], out, time_ms=1000, max_depth=2) == 2
+    with open(out) as f:
+        again = [json.loads(line) for line in f]
+    for r in first + again:
+        del r['ms']
+    assert again == first
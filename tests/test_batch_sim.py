@@ -0,0 +1,36 @@
+import numpy as np
+from batch_sim import BatchSimulator, ONGOING, DRAW, X_CELL, O_CELL
+from bitboard import BitBoard
+from game_engine import X, O
+from Minimax import legal_moves
+
+
+def test_legal_mask_matches_bitboard():
+    sim = BatchSimulator(64, seed=5)
+    positions = [BitBoard() for _ in range(sim.n)]
+    games = sim.active()
+    while len(games):
+        mask = sim.legal_mask(games)
+        for row, g in enumerate(games):
+            expected = [b * 9 + p for b, p in positions[g].legal_moves()]
+            assert list(np.flatnonzero(mask[row])) == expected
+        moves = sim.random_moves(games)
+        assert mask[np.arange(len(games)), moves].all()
+        sim.step(games, moves)
+        for g, mv in zip(games, moves):
+            positions[g].push(*divmod(int(mv), 9))
+        games = games[sim.result[games] == ONGOING]
+    for g, pos in enumerate(positions):
+        assert sim.result[g] == {X: X_CELL, O: O_CELL, None: DRAW}[pos.winner]
+
+
+def test_finished_games_export_as_superboards():
+    sim = BatchSimulator(32, seed=9)
+    sim.run()
+    assert (sim.result != ONGOING).all()
+    for g, sb in sim.histories():
+        assert len(sb.history) == sim.length[g]
+        if sim.result[g] == DRAW:
+            assert sb.winner is None and not list(legal_moves(sb))
+        else:
+            assert sb.winner == (X if sim.result[g] == X_CELL else O)
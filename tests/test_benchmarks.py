@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+SUITE = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'bench_suite.py')
+
+
+def suite(*args):
+    return subprocess.run([sys.executable, SUITE, '--quick', *args], capture_output=True, text=True,
+                          timeout=120)
+
+
+def test_baseline_round_trip_and_regression_gate(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    proc = suite('-k', 'minimax/d2', '--memory', '--save', path)
+    assert proc.returncode == 0, proc.stderr
+    with open(path) as f:
+        baseline = json.load(f)
+    assert len(baseline['results']) == 7  # one per corpus position
+    assert all(r['min_us'] > 0 and r['peak_kb'] > 0 for r in baseline['results'].values())
+
+    # a baseline far faster than anything real must fail the comparison
+    for r in baseline['results'].values():
+        r['min_us'] /= 1000
+    with open(path, 'w') as f:
+        json.dump(baseline, f)
+    proc = suite('-k', 'minimax/d2/opening', '--compare', path)
+    assert proc.returncode == 1 and proc.stdout.count('REGRESSION') == 2
+
+    proc = suite('-k', 'Minimax.legal_moves', '--compare', path)  # not in the baseline
+    assert proc.returncode == 0 and 'no regressions' in proc.stdout
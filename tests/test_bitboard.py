@@ -0,0 +1,90 @@
+import os
+import random
+from game_engine import SuperBoard, File, X, O
+from bitboard import BitBoard
+from Minimax import minimax, legal_moves, heuristic, Searcher
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'example.txt')
+
+
+def random_superboard(plies, seed):
+    rng = random.Random(seed)
+    sb = SuperBoard()
+    for _ in range(plies):
+        moves = list(legal_moves(sb))
+        if sb.winner or not moves:
+            break
+        b_idx, pos = rng.choice(moves)
+        sb.make_move(pos, board=b_idx)
+    return sb
+
+
+def test_roundtrip_superboard():
+    for seed in range(20):
+        sb = random_superboard(30, seed)
+        back = SuperBoard.from_bitboard(sb.to_bitboard())
+        assert [b.grid for b in back.grid] == [b.grid for b in sb.grid]
+        assert [b.winner for b in back.grid] == [b.winner for b in sb.grid]
+        assert (back.current_player, back.next_board, back.winner) == \
+            (sb.current_player, sb.next_board, sb.winner)
+
+
+def test_make_move_matches_superboard():
+    for seed in range(20):
+        rng = random.Random(seed)
+        sb = SuperBoard()
+        pos = BitBoard()
+        while not sb.winner:
+            moves = list(legal_moves(sb))
+            assert pos.legal_moves() == moves
+            if not moves:
+                break
+            assert pos.evaluate(X) == heuristic(sb, X)
+            assert pos.evaluate(O) == heuristic(sb, O)
+            b_idx, p = rng.choice(moves)
+            sb.make_move(p, board=b_idx)
+            pos.make_move(p, board=b_idx)
+            assert pos.winner == sb.winner
+            assert pos.board_winner(b_idx) == sb.grid[b_idx].winner
+            assert pos.current_player == sb.current_player
+
+
+def test_search_on_bitboard_matches_minimax():
+    positions = [SuperBoard(), File.parse_board(EXAMPLE)]
+    positions += [random_superboard(n, n) for n in (10, 25, 40)]
+    for sb in positions:
+        pos = sb.to_bitboard()
+        pos.check_winner()
+        expected, _ = minimax(sb.clone(), True, sb.current_player, 2)
+        assert Searcher().search(pos, 2) == expected
+
+
+def snapshot(pos):
+    return (pos.xbits, pos.obits, pos.xowned, pos.oowned, pos.closed,
+            pos.current_player, pos.next_board, pos.winner)
+
+
+def test_push_pop_restores_position():
+    for seed in range(20):
+        rng = random.Random(seed)
+        pos = BitBoard()
+        seen = []
+        while pos.winner is None:
+            moves = pos.legal_moves()
+            if not moves:
+                break
+            seen.append(snapshot(pos))
+            pos.push(*rng.choice(moves))
+        while seen:
+            pos.pop()
+            assert snapshot(pos) == seen.pop()
+
+
+def test_superboard_push_pop():
+    sb = random_superboard(30, 7)
+    before = str(sb), len(sb.history)
+    for b_idx, p in list(legal_moves(sb))[:5]:
+        sb.push(b_idx, p)
+        assert sb.grid[b_idx].grid[p] is not None
+        sb.pop()
+        assert (str(sb), len(sb.history)) == before
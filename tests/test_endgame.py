@@ -0,0 +1,100 @@
+import random
+from bitboard import BitBoard
+from endgame import Solver, MATE, describe, playable_cells
+from game_engine import SuperBoard, Strategy, File, X, O
+from Minimax import minimax, Searcher
+
+
+def late_position(seed, cells):
+    rng = random.Random(seed)
+    pos = BitBoard()
+    while pos.winner is None and pos.legal_moves() and playable_cells(pos) > cells:
+        pos.push(*rng.choice(pos.legal_moves()))
+    return pos
+
+
+def brute_force(pos, ply=0):
+    """Plain negamax to the end: fastest win, slowest loss."""
+    if pos.winner is not None:
+        return -(MATE - ply)
+    best = None
+    for mv in pos.legal_moves():
+        pos.push(*mv)
+        value = -brute_force(pos, ply + 1)
+        pos.pop()
+        if best is None or value > best:
+            best = value
+    return 0 if best is None else best
+
+
+def test_solver_matches_brute_force():
+    solver = Solver(max_nodes=10**7)
+    solved = 0
+    for seed in range(30):
+        pos = late_position(seed, 9)
+        if pos.winner is not None:
+            continue
+        value, move = solver.solve(pos)
+        assert value == brute_force(pos)
+        if move is not None:
+            pos.push(*move)
+            assert -brute_force(pos, 1) == value
+            pos.pop()
+            solved += 1
+    assert solved > 10
+
+
+def test_cached_results_are_instant():
+    pos = late_position(3, 16)
+    solver = Solver(max_nodes=10**7)
+    first = solver.solve(pos)
+    assert solver.nodes > 1
+    assert solver.solve(pos) == first and solver.nodes == 1
+
+
+def test_closed_boards_are_a_draw():
+    # the local boards are won X O X / X O O / O X X: no line, no moves left
+    won = {X: 'XXX......', O: 'OOO......'}
+    sb = File.parse_compact('/'.join(won[w] for w in 'XOXXOOOXX') + ' X -')
+    assert sb.winner is None
+    assert minimax(sb, depth=3) == (0, None)
+    pos = sb.to_bitboard()
+    assert Searcher().search(pos, 3) == 0
+    assert describe(Solver().solve(pos)[0]) == ('draw', None)
+
+
+def test_strategy_plays_solved_move():
+    solver = Solver(max_nodes=10**7)
+    for seed in range(40):
+        pos = late_position(seed, 12)
+        if pos.winner is not None or not pos.legal_moves():
+            continue
+        value, move = solver.solve(pos)
+        if value > 0:
+            break
+    sb = SuperBoard.from_bitboard(pos)
+    assert Strategy.minimax_pick(sb, depth=1, solver=solver) == move
+    assert Strategy.timed_pick(sb, time_ms=50, solver=solver) == (move, playable_cells(pos))
+    pos.push(*move)
+    assert describe(solver.solve(pos)[0]) == ('loss', describe(value)[1] - 1)
+
+
+def test_pick_move_leaves_mid_game_to_the_search():
+    seen = set()
+    for seed in range(200):
+        rng = random.Random(seed)
+        pos = BitBoard()
+        while pos.winner is None and playable_cells(pos) > 27:
+            moves = pos.legal_moves()
+            if len(moves) <= 2 and len(moves) not in seen:
+                seen.add(len(moves))
+                solver = Solver()
+                if len(moves) == 1:
+                    assert solver.pick_move(pos, 1000) == (moves[0], None)
+                else:
+                    assert not solver.should_solve(pos) and solver.pick_move(pos, 1000) is None
+                assert solver.nodes == 0
+            pos.push(*rng.choice(moves))
+        if seen == {1, 2}:
+            break
+    assert seen == {1, 2}
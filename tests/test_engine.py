@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from engine import Engine, parse_move
+from evaluation import EvalBoard
+
+ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+
+class Output:
+    """Collects the engine's lines; wait_for blocks until one starts with a prefix."""
+
+    def __init__(self):
+        self.lines = []
+        self.changed = threading.Condition()
+
+    def write(self, text):
+        with self.changed:
+            self.lines.extend(text.splitlines())
+            self.changed.notify_all()
+
+    def flush(self):
+        pass
+
+    def wait_for(self, prefix, timeout=30):
+        with self.changed:
+            self.changed.wait_for(lambda: any(ln.startswith(prefix) for ln in self.lines), timeout)
+            found = [ln for ln in self.lines if ln.startswith(prefix)]
+            self.lines.clear()
+            return found[-1] if found else None
+
+
+def legal(move_text, moves=()):
+    pos = EvalBoard()
+    for text in moves:
+        pos.push(*parse_move(text))
+    return parse_move(move_text) in pos.legal_moves()
+
+
+def test_go_depth_and_movetime():
+    out = Output()
+    engine = Engine(out, tt_mb=1, book=False)
+    engine.handle('uci')
+    assert out.wait_for('uciok') == 'uciok'
+    engine.handle('position startpos moves 40 04')
+    engine.handle('go depth 3')
+    best = out.wait_for('bestmove')
+    assert legal(best.split()[1], ['40', '04'])
+    engine.handle('go movetime 100')
+    assert legal(out.wait_for('bestmove').split()[1], ['40', '04'])
+    engine.handle('position startpos moves 40 9x')
+    assert out.wait_for('info string').startswith('info string error')
+    engine.handle('quit')
+
+
+def test_stop_and_ponderhit_are_prompt():
+    out = Output()
+    engine = Engine(out, tt_mb=1, book=False)
+    engine.handle('position startpos')
+    engine.handle('go infinite')
+    time.sleep(0.2)
+    assert out.wait_for('bestmove', timeout=0) is None  # infinite waits for stop
+    start = time.perf_counter()
+    engine.handle('stop')
+    assert time.perf_counter() - start < 1
+    assert legal(out.wait_for('bestmove').split()[1])
+
+    engine.handle('go ponder movetime 100')
+    time.sleep(0.2)
+    start = time.perf_counter()
+    engine.handle('ponderhit')
+    assert legal(out.wait_for('bestmove').split()[1])
+    assert time.perf_counter() - start < 1
+
+
+def test_game_over_and_subprocess():
+    proc = subprocess.run(
+        [sys.executable, 'engine.py', '--no-book', '--tt-mb', '1'], cwd=ROOT, text=True,
+        capture_output=True, timeout=60,
+        input='isready\nposition compact XXX....../........./........./........./XXX....../'
+              '........./........./........./XXX...... O -\ngo movetime 50\n'
+              'position startpos\ngo movetime 50\nquit\n')
+    lines = proc.stdout.splitlines()
+    assert lines[0] == 'readyok'
+    bestmoves = [ln for ln in lines if ln.startswith('bestmove')]
+    assert bestmoves[0] == 'bestmove none' and legal(bestmoves[1].split()[1])
+    assert any(ln.startswith('info depth') and ' nps ' in ln for ln in lines)
@@ -0,0 +1,48 @@
+import os
+import pickle
+import random
+from game_engine import SuperBoard, File, Strategy, X, O
+from evaluation import EvalBoard, EvalWeights, Evaluator
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'example.txt')
+
+
+def test_incremental_score_matches_full_recompute():
+    rng = random.Random(11)
+    for _ in range(30):
+        pos = EvalBoard()
+        scores = [pos.score]
+        while pos.winner is None:
+            moves = pos.legal_moves()
+            if not moves:
+                break
+            pos.push(*rng.choice(moves))
+            assert pos.score == pos.evaluator.full_score(pos)
+            scores.append(pos.score)
+        while pos._stack:
+            scores.pop()
+            pos.pop()
+            assert pos.score == scores[-1]
+        assert pos.score == 0
+
+
+def test_from_superboard_and_symmetry():
+    sb = File.parse_board(EXAMPLE)
+    pos = EvalBoard.from_superboard(sb)
+    assert pos.score == pos.evaluator.full_score(pos)
+    assert pos.evaluate(X) == -pos.evaluate(O)
+    copy = pickle.loads(pickle.dumps(pos))
+    assert copy.score == pos.score and copy.evaluate(X) == pos.evaluate(X)
+
+
+def test_weights_are_configurable():
+    pos = EvalBoard(Evaluator(EvalWeights(free_move=0)))
+    pos.push(4, 4)
+    pos.push(4, 0)
+    heavy = EvalBoard(Evaluator(EvalWeights(cell=(1,) * 9, local_two=100)))
+    heavy.push(4, 4)
+    heavy.push(4, 0)
+    assert pos.evaluate(X) == 4 * 3 - 4 * 2
+    assert heavy.evaluate(X) != pos.evaluate(X)
+    sb = SuperBoard()
+    assert Strategy.minimax_pick(sb, depth=2, evaluator=Evaluator(EvalWeights(owned=10))) is not None
@@ -0,0 +1,69 @@
+import os
+import random
+from game_engine import SuperBoard, X, O
+from Minimax import legal_moves
+from game_records import (GameWriter, GameReader, GameRecord, from_history, from_superboard,
+                          to_superboard, to_history, index_path, X_WINS, O_WINS, DRAW, UNFINISHED)
+
+
+def random_game(seed, plies=81):
+    rng = random.Random(seed)
+    sb = SuperBoard()
+    for _ in range(plies):
+        moves = list(legal_moves(sb))
+        if sb.winner or not moves:
+            break
+        b, p = rng.choice(moves)
+        sb.make_move(p, board=b)
+    return sb
+
+
+def test_round_trip_and_random_access(tmp_path):
+    path = str(tmp_path / 'games.bin')
+    games = [random_game(seed, plies=81 if seed % 3 else 10) for seed in range(30)]
+    with GameWriter(path) as writer:
+        for i, sb in enumerate(games[:20]):
+            writer.write_superboard(sb, 'random', f'engine-{i}')
+    with GameWriter(path) as writer:  # appending continues the file and its index
+        for sb in games[20:]:
+            writer.write(from_history(sb.history))
+
+    with GameReader(path) as reader:
+        assert len(reader) == 30
+        records = list(reader)
+        assert records[7] == reader[7]
+        for k in (0, 13, 29):
+            sb = games[k]
+            record = reader[k]
+            assert to_history(record) == sb.history
+            assert str(to_superboard(record)) == str(sb)
+            if sb.winner:
+                assert record.result == (X_WINS if sb.winner == X else O_WINS)
+        assert records[3].o_engine == 'engine-3' and records[25].x_engine == ''
+        assert records[0].result == UNFINISHED
+
+
+def test_results_of_histories():
+    drawn = random_game(6)
+    assert not drawn.winner and next(legal_moves(drawn), None) is None
+    assert from_history(drawn.history).result == DRAW
+    assert from_history(random_game(6, plies=10).history).result == UNFINISHED
+    for seed in range(10):
+        sb = random_game(seed)
+        assert from_history(sb.history) == from_superboard(sb)
+    assert from_history([]).result == UNFINISHED
+
+
+def test_index_rebuilt_and_torn_record_dropped(tmp_path):
+    path = str(tmp_path / 'games.bin')
+    with GameWriter(path) as writer:
+        for seed in range(5):
+            writer.write_superboard(random_game(seed))
+    os.remove(index_path(path))
+    with open(path, 'ab') as f:
+        f.write(bytes([DRAW, 0, 0, 0, 40, 1, 2]))  # header promising 40 moves, only 2 written
+    with GameWriter(path) as writer:
+        writer.write(GameRecord(bytes([40, 36]), UNFINISHED, 'a', 'b', O))
+    with GameReader(path) as reader:
+        assert len(reader) == 6 and len(list(reader)) == 6
+        assert reader[5].first_player == O and reader[5].moves == bytes([40, 36])
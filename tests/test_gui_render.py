@@ -0,0 +1,39 @@
+import os
+import random
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+import pygame
+from game_engine import SuperBoard
+from gui_game import WIDTH, HEIGHT, Renderer
+from Minimax import legal_moves
+
+
+def pixels(surface):
+    return pygame.image.tobytes(surface, 'RGB')
+
+
+def test_dirty_rectangles_match_a_full_redraw():
+    pygame.init()
+    try:
+        font = pygame.font.SysFont(None, 28)
+        renderer = Renderer(pygame.Surface((WIDTH, HEIGHT)), font)
+        full = Renderer(pygame.Surface((WIDTH, HEIGHT)), font)
+        rng = random.Random(1)
+        sb = SuperBoard()
+        footer = [((10, HEIGHT - 30), "footer")]
+        assert renderer.draw(sb, [((10, 10), "X")], footer) == [renderer.screen.get_rect()]
+        assert renderer.draw(sb, [((10, 10), "X")], footer) == []  # nothing changed, nothing drawn
+        while not sb.winner:
+            moves = list(legal_moves(sb))
+            if not moves:
+                break
+            b, p = rng.choice(moves)
+            sb.make_move(p, board=b)
+            header = [((10, 10), f"Current: {sb.current_player}")]
+            dirty = renderer.draw(sb, header, footer)
+            # the played board, the old and new highlight, the header
+            assert 1 <= len(dirty) <= 4 and renderer.screen.get_rect() not in dirty
+            full.invalidate()
+            full.draw(sb, header, footer)
+            assert pixels(renderer.screen) == pixels(full.screen)
+    finally:
+        pygame.quit()
@@ -0,0 +1,48 @@
+import os
+import subprocess
+import random
+import sys
+from game_engine import SuperBoard, X, O, unpack_move
+from Minimax import legal_moves
+
+
+def test_history_entries():
+    sb = SuperBoard()
+    for b, p in [(0, 0), (0, 4), (4, 0), (0, 8), (8, 0)]:
+        sb.make_move(p, board=b)
+    sb.push(0, 1)
+    assert sb.history[0] == {'move': 1, 'player': X, 'board': 0, 'position': 0,
+                             'next_board': 0, 'small_winner': None}
+    assert sb.history[-1] == {'move': 6, 'player': O, 'board': 0, 'position': 1,
+                              'next_board': 1, 'small_winner': None}
+    copy = sb.clone()
+    sb.pop()
+    assert len(sb.history) == 5 and len(copy.history) == 6
+    df = copy.history_df()
+    assert list(df['board']) == [0, 0, 4, 0, 8, 0]
+
+
+def test_push_and_make_move_log_the_same_entries():
+    rng = random.Random(3)
+    played = pushed = None
+    while played is None or not played.winner:
+        played, pushed = SuperBoard(), SuperBoard()
+        moves_after_win = 0
+        while moves_after_win < 2:
+            moves = list(legal_moves(played))
+            if not moves:
+                break
+            b, p = rng.choice(moves)
+            played.make_move(p, board=b)
+            pushed.push(b, p)
+            assert played.move_log == pushed.move_log
+            assert unpack_move(played.move_log[-1])[:3] == (b, p, O if pushed.current_player == X else X)
+            moves_after_win += played.winner is not None
+    assert played.history[-1]['global_winner'] == played.winner
+
+
+def test_game_engine_does_not_import_pandas():
+    code = "import sys, game_engine; print('pandas' in sys.modules)"
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                         cwd=os.path.join(os.path.dirname(__file__), '..'))
+    assert out.stdout.strip() == 'False'
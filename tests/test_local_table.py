@@ -0,0 +1,38 @@
+import os
+import random
+import local_table
+from local_table import (code, code_of, masks, load, WINNER, IS_FULL, EMPTY,
+                         X_THREATS, O_THREATS, EVAL, SIZE)
+from bitboard import WINS
+from game_engine import Board, X, O
+
+
+def test_entries_match_direct_computation():
+    rng = random.Random(12)
+    for c in [0, SIZE - 1] + [rng.randrange(SIZE) for _ in range(500)]:
+        xm, om = masks(c)
+        assert code(xm, om) == c
+        grid = [X if xm >> p & 1 else O if om >> p & 1 else None for p in range(9)]
+        assert code_of(grid) == c
+        board = Board(X)
+        board.grid = grid
+        found = any(grid[a] is not None and grid[a] == grid[b] == grid[d]
+                    for a, b, d in local_table.WINNING_COMBINATIONS)
+        assert board.check_winner() == found
+        if not (WINS[xm] and WINS[om]):
+            assert WINNER[c] == (1 if WINS[xm] else 2 if WINS[om] else 0)
+        assert IS_FULL[c] == (None not in grid)
+        assert EMPTY[c] == sum(1 << p for p in range(9) if grid[p] is None)
+        assert X_THREATS[c] == local_table.threats(xm, om)
+        assert O_THREATS[c] == local_table.threats(om, xm)
+    assert EVAL[code(0b10000, 0)] == 3
+
+
+def test_load_rebuilds_stale_file(tmp_path):
+    path = str(tmp_path / 'table.bin')
+    with open(path, 'wb') as f:
+        f.write(b'stale')
+    buf = load(path)
+    assert bytes(buf[:len(local_table.MAGIC)]) == local_table.MAGIC
+    assert os.path.getsize(path) == len(local_table.build())
+    assert isinstance(load(str(tmp_path / 'missing' / 'table.bin')), bytes)
@@ -0,0 +1,31 @@
+from game_engine import SuperBoard, Strategy, X, O
+from mcts import MCTSTree
+
+
+def test_mcts_finds_winning_move():
+    sb = SuperBoard()
+    sb.grid[0].grid = [X, X, X, None, None, None, None, None, None]
+    sb.grid[1].grid = [X, X, X, None, None, None, None, None, None]
+    sb.grid[2].grid = [X, X, None, O, O, None, None, None, None]
+    sb.grid[5].grid = [O, O, O, None, None, None, None, None, None]
+    for b in sb.grid:
+        b.check_winner()
+    sb.next_board = 2
+    tree = MCTSTree(seed=1)
+    assert Strategy.mcts_pick(sb, playouts=500, tree=tree) == (2, 2)
+    assert tree.last_playouts == 500
+    assert tree.playouts_per_second > 0
+
+
+def test_tree_reused_after_moves():
+    sb = SuperBoard()
+    tree = MCTSTree(seed=2)
+    b_idx, pos = Strategy.mcts_pick(sb, playouts=300, tree=tree)
+    sb.make_move(pos, board=b_idx)
+    reply = next(p for p in range(9) if sb.grid[sb.next_board].grid[p] is None)
+    sb.make_move(reply)
+    Strategy.mcts_pick(sb, playouts=300, tree=tree)
+    assert tree.reused_visits > 0
+    assert tree.visits[0] == tree.reused_visits + 300
+    assert all(tree.parent[c] == 0 for c in range(tree.first_child[0],
+                                                   tree.first_child[0] + tree.num_children[0]))
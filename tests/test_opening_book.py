@@ -0,0 +1,43 @@
+import pytest
+from bitboard import BitBoard
+from game_engine import SuperBoard, Strategy
+from opening_book import OpeningBook, build_book, book_positions, HEADER, MAGIC
+from symmetry import transform, map_move, canonical_key
+
+
+def test_book_matches_search_and_resumes(tmp_path):
+    path = str(tmp_path / 'book.bin')
+    start_key = BitBoard().key
+    with open(path + '.progress', 'w') as f:
+        f.write(f"{start_key} 40 2 7\n123 4")  # one finished entry and a torn line
+    logs = []
+    # the 81 first moves fall into 15 symmetry classes
+    assert build_book(path, plies=2, depth=2, log=logs.append) == 16
+    assert logs[0] == "1 positions already searched, 15 to go"
+
+    book = OpeningBook(path)
+    assert len(book) == 16 and book.depth == 2
+    assert book.lookup(start_key) == ((4, 4), 2, 7)
+    assert book.lookup(12345) is None
+    for pos in book_positions(2)[1:6]:
+        sb = SuperBoard.from_bitboard(pos)
+        move, depth, _ = book.lookup(pos.key)
+        assert move == Strategy.minimax_pick(sb, depth=2)
+        assert Strategy.minimax_pick(sb, depth=5, book=book) == move
+        assert Strategy.timed_pick(sb, time_ms=50, book=book) == (move, 2)
+        for t in range(8):
+            # the book move, seen in a rotated or mirrored board (up to the
+            # position's own symmetries)
+            image = transform(pos, t)
+            played, expected = image.clone(), image.clone()
+            played.push(*book.probe(image)[0])
+            expected.push(*map_move(move, t))
+            assert canonical_key(played)[0] == canonical_key(expected)[0]
+
+
+def test_book_version_checked(tmp_path):
+    path = str(tmp_path / 'book.bin')
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 99, 1, 1, 0))
+    with pytest.raises(ValueError):
+        OpeningBook(path)
@@ -0,0 +1,71 @@
+import random
+from bitboard import BitBoard
+from game_engine import SuperBoard, Strategy
+from Minimax import Searcher, INF
+from parallel_search import parallel_pick, shutdown_pool, _choose
+
+
+def test_deterministic_parallel_matches_serial():
+    try:
+        for seed, plies in ((1, 1), (2, 14), (3, 30)):
+            rng = random.Random(seed)
+            pos = BitBoard()
+            for _ in range(plies):
+                pos.push(*rng.choice(pos.legal_moves()))
+            serial = Searcher().pick(pos.clone(), 4)
+            score, move, nodes = parallel_pick(pos.clone(), 4, workers=2)
+            assert (score, move) == serial
+            fast_score, _, _ = parallel_pick(pos.clone(), 4, workers=2, deterministic=False)
+            assert fast_score == serial[0]
+    finally:
+        shutdown_pool()
+
+
+def tie_positions():
+    # several root moves share the best score, and at depth 2 or 3 the
+    # first move with it is not first in the search order
+    for seed, plies in ((4, 0), (0, 30), (2, 30), (3, 30), (4, 20)):
+        rng = random.Random(seed)
+        pos = BitBoard()
+        for _ in range(plies):
+            pos.push(*rng.choice(pos.legal_moves()))
+        yield pos
+
+
+def test_fail_low_bounds_do_not_win_ties():
+    # When the last move with the best score finishes first, the moves
+    # searched after it may fail low with bounds equal to its score. The
+    # pick must still be the serial one: the first move with that score.
+    for pos in tie_positions():
+        for depth in (2, 3):
+            serial = Searcher().pick(pos.clone(), depth)
+            moves = Searcher().order_moves(pos, pos.legal_moves(), 0, None)
+            exact = []
+            for mv in moves:
+                child = pos.clone()
+                child.push(*mv)
+                exact.append(-Searcher().search(child, depth - 1, -INF, INF, 1))
+            last = max(i for i, score in enumerate(exact) if score == serial[0])
+            results = [(score, -INF, 1) if i in (0, last) else (serial[0], serial[0], 1)
+                       for i, score in enumerate(exact)]
+            assert _choose(pos, depth, moves, results)[:2] == serial
+
+
+def test_shared_alpha_matches_serial_move():
+    for pos in tie_positions():
+        try:
+            serial = Searcher().pick(pos.clone(), 3)
+            score, move, _ = parallel_pick(pos.clone(), 3, workers=3, deterministic=False)
+            assert (score, move) == serial
+        finally:
+            shutdown_pool()  # fresh worker tables, so scores match a fresh serial search
+
+
+def test_minimax_pick_workers():
+    sb = SuperBoard()
+    sb.make_move(4, board=4)
+    try:
+        assert Strategy.minimax_pick(sb, depth=3, workers=2) == \
+            Strategy.minimax_pick(sb, depth=3)
+    finally:
+        shutdown_pool()
@@ -0,0 +1,58 @@
+import os
+from bitboard import BitBoard
+from game_engine import SuperBoard, File
+from perft import perft, divide, reference_perft
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'example.txt')
+
+# Reference counts for depths 1, 2, ... from the engine's original rules.
+# Any change to move generation, or a new position representation, must
+# reproduce them.
+POSITIONS = [
+    (None, [81, 720, 6336, 55080, 473256]),
+    (EXAMPLE, [9, 72, 574, 4506]),
+    # O is sent to board 0, which X has won: free choice
+    ('XXXOO..../......O../........./........./........./........./........./........./......... O 0',
+     [71, 1111, 16777, 244327]),
+    # X is sent to board 4, which is full without a winner: free choice
+    ('........./........./........./........./XOXXOOOXX/........./........./........./......... X 4',
+     [72, 1136, 17304, 254352]),
+    # three boards open; lines get completed within the horizon
+    ('XXX....../OOO....../XO.OX.O../OOO....../X.O.O.X../XXX....../.XO.OX..X/XXX....../OOO...... X -',
+     [13, 131, 1274, 9982, 73753]),
+]
+
+
+def load(spec):
+    if spec is None:
+        return SuperBoard()
+    if spec.count('/') == 8:
+        return File.parse_compact(spec)
+    return File.parse_board(spec)
+
+
+def test_reference_counts():
+    for spec, counts in POSITIONS:
+        pos = load(spec).to_bitboard()
+        pos.check_winner()
+        assert [perft(pos, d + 1) for d in range(len(counts))] == counts
+        assert perft(pos, len(counts), {}) == counts[-1]
+
+
+def test_bitboard_matches_superboard_rules():
+    for spec, counts in POSITIONS[1:]:
+        assert reference_perft(load(spec), 3) == counts[2]
+
+
+def test_divide_sums_to_perft():
+    pos = BitBoard()
+    split = divide(pos, 3)
+    assert len(split) == 81 and sum(n for _, n in split) == 6336
+    assert perft(pos, 3) == 6336 and pos.key == BitBoard().key
+
+
+def test_won_game_has_no_moves():
+    sb = load('XXX....../........./........./........./XXX....../........./........./........./XXX...... O -')
+    pos = sb.to_bitboard()
+    pos.check_winner()
+    assert perft(pos, 0) == 1 and perft(pos, 3) == 0 and divide(pos, 2) == []
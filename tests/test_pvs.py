@@ -0,0 +1,49 @@
+import os
+import random
+from game_engine import SuperBoard, File
+from Minimax import minimax, legal_moves, Searcher
+from transposition import TranspositionTable
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), '..', 'assets', 'example.txt')
+
+
+def fixed_positions():
+    positions = [SuperBoard(), File.parse_board(EXAMPLE)]
+    for plies, seed in ((6, 1), (15, 2), (24, 3), (33, 4), (42, 5)):
+        rng = random.Random(seed)
+        sb = SuperBoard()
+        for _ in range(plies):
+            moves = list(legal_moves(sb))
+            if sb.winner or not moves:
+                break
+            b_idx, pos = rng.choice(moves)
+            sb.make_move(pos, board=b_idx)
+        positions.append(sb)
+    return positions
+
+
+def test_pvs_scores_match_minimax():
+    for sb in fixed_positions():
+        for depth in (1, 2, 3):
+            expected, _ = minimax(sb.clone(), True, sb.current_player, depth)
+            pos = sb.to_bitboard()
+            pos.check_winner()
+            score, move = Searcher(TranspositionTable(size_mb=1)).pick(pos, depth)
+            assert score == expected
+            assert Searcher().pick(pos, depth)[0] == expected
+            if move is not None:
+                pos.push(*move)
+                reply, _ = minimax(SuperBoard.from_bitboard(pos), False, sb.current_player, depth - 1)
+                assert reply == expected
+
+
+def test_local_win_ordered_first():
+    sb = SuperBoard()
+    for b_idx, p in ((4, 0), (0, 4), (4, 1), (1, 4), (4, 3), (3, 4)):
+        sb.make_move(p, board=b_idx)
+    # X to move in board 4 and can complete the top row or the left column
+    pos = sb.to_bitboard()
+    ordered = Searcher().order_moves(pos, pos.legal_moves(), 0, None)
+    assert ordered[:2] == [(4, 2), (4, 6)]
+    hash_first = Searcher().order_moves(pos, pos.legal_moves(), 0, (4, 8))
+    assert hash_first[0] == (4, 8)
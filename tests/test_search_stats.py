@@ -0,0 +1,48 @@
+import random
+from bitboard import BitBoard
+from game_engine import SuperBoard, Strategy, TranspositionTable
+from Minimax import Searcher, SearchStats
+
+
+def midgame():
+    rng = random.Random(4)
+    pos = BitBoard()
+    for _ in range(16):
+        pos.push(*rng.choice(pos.legal_moves()))
+    return pos
+
+
+def test_stats_do_not_change_search():
+    pos = midgame()
+    stats = SearchStats()
+    searcher = Searcher(TranspositionTable(size_mb=1), stats)
+    result = searcher.pick(pos.clone(), 5)
+    assert result == Searcher(TranspositionTable(size_mb=1)).pick(pos.clone(), 5)
+    assert stats.nodes == searcher.nodes
+    assert stats.nodes_by_ply[0] == 1
+    assert stats.depth == 5 and stats.score == result[0]
+    assert 0 <= stats.first_move_cutoff_rate <= 1
+    assert stats.evaluations > 0 and stats.movegen_time > 0
+
+
+def test_principal_variation_is_playable():
+    pos = midgame()
+    stats = SearchStats()
+    score, move = Searcher(stats=stats).pick(pos.clone(), 4)
+    assert stats.pv[0] == move
+    for mv in stats.pv:
+        assert mv in pos.legal_moves()
+        pos.push(*mv)
+
+
+def test_strategy_stats_reset_per_call():
+    sb = SuperBoard()
+    sb.make_move(4, board=4)
+    stats = SearchStats()
+    Strategy.minimax_pick(sb, depth=3, stats=stats)
+    first = stats.nodes
+    Strategy.minimax_pick(sb, depth=3, stats=stats)
+    assert stats.nodes == first
+    move, depth = Strategy.timed_pick(sb, time_ms=100, max_depth=3, stats=stats)
+    assert stats.depth == depth and stats.pv[0] == move
+    assert 'pv:' in str(stats)
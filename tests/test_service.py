@@ -0,0 +1,91 @@
+import asyncio
+import random
+import pytest
+from game_engine import SuperBoard, File
+from game_records import GameWriter
+from loadgen import request, run_load
+from Minimax import legal_moves
+from service import MoveService, Server, ServiceError
+
+
+def random_games(path, n, seed=0):
+    rng = random.Random(seed)
+    with GameWriter(path) as writer:
+        for _ in range(n):
+            sb = SuperBoard()
+            while not sb.winner:
+                moves = list(legal_moves(sb))
+                if not moves:
+                    break
+                b, p = rng.choice(moves)
+                sb.make_move(p, board=b)
+            writer.write_superboard(sb)
+
+
+async def wait_until(condition, timeout=10):
+    end = asyncio.get_running_loop().time() + timeout
+    while not condition() and asyncio.get_running_loop().time() < end:
+        await asyncio.sleep(0.01)
+    return condition()
+
+
+async def scenario(records):
+    service = MoveService(workers=1, max_queue=3, tt_mb=1, book=False)
+    await service.start()
+    server = await asyncio.start_server(Server(service).handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    sb = SuperBoard()
+    start = File.to_compact(sb)
+    try:
+        status, data = await request('127.0.0.1', port, 'POST', '/move', {'position': start, 'time_ms': 20})
+        assert status == 200 and tuple(data['move']) in set(legal_moves(sb))
+        status, _ = await request('127.0.0.1', port, 'POST', '/move', {'position': 'nonsense'})
+        assert status == 400
+
+        # a client that hangs up mid-search has its search stopped
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        body = f'{{"position": "{start}", "time_ms": 10000}}'.encode()
+        writer.write(b"POST /move HTTP/1.1\r\nContent-Length: %d\r\n\r\n" % len(body) + body)
+        await writer.drain()
+        assert await wait_until(lambda: service.metrics()['in_flight'] == 1)
+        writer.close()
+        assert await wait_until(lambda: service.metrics()['cancelled'] == 1 and not service.metrics()['in_flight'])
+
+        # priorities, deadlines and the queue cap
+        finished = []
+
+        async def move(name, **kwargs):
+            try:
+                await service.submit(sb, **kwargs)
+                finished.append(name)
+            except ServiceError as e:
+                finished.append((name, e.status))
+
+        tasks = [asyncio.create_task(move('busy', time_ms=300))]
+        assert await wait_until(lambda: service.metrics()['in_flight'] == 1)
+        for name, kwargs in [('late', dict(time_ms=20, deadline_ms=50)), ('low', dict(time_ms=20)),
+                             ('high', dict(time_ms=20, priority=5))]:
+            tasks.append(asyncio.create_task(move(name, **kwargs)))
+            await asyncio.sleep(0)
+        with pytest.raises(ServiceError) as full:
+            await service.submit(sb)
+        assert full.value.status == 503
+        await asyncio.gather(*tasks)
+        assert finished == ['busy', 'high', ('late', 504), 'low']
+
+        status, metrics = await request('127.0.0.1', port, 'GET', '/metrics')
+        assert status == 200 and metrics['rejected'] == 1 and metrics['expired'] == 1
+        assert metrics['latency_ms']['count'] == metrics['completed'] == 4
+
+        summary = await run_load(records, port=port, clients=2, time_ms=5)
+        assert summary['statuses'] == {200: summary['requests']} and summary['requests'] > 10
+    finally:
+        server.close()
+        await server.wait_closed()
+        await service.close()
+
+
+def test_service(tmp_path):
+    records = str(tmp_path / 'games.bin')
+    random_games(records, 2)
+    asyncio.run(scenario(records))
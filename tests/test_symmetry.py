@@ -0,0 +1,59 @@
+import random
+from bitboard import BitBoard
+from game_engine import SuperBoard
+from symmetry import PERMS, INVERSE, transform, canonicalize, canonical_key, map_move, unmap_move
+
+
+def random_position(seed, plies):
+    rng = random.Random(seed)
+    pos = BitBoard()
+    for _ in range(plies):
+        if pos.winner is not None:
+            break
+        pos.push(*rng.choice(pos.legal_moves()))
+    return pos
+
+
+def test_transforms_form_a_group():
+    assert len(set(PERMS)) == 8
+    for t in range(8):
+        assert all(PERMS[INVERSE[t]][PERMS[t][i]] == i for i in range(9))
+        assert PERMS[t][4] == 4  # the centre stays put
+
+
+def test_transform_commutes_with_moves():
+    for seed in range(20):
+        pos = random_position(seed, 30)
+        for t in range(8):
+            image = transform(pos, t)
+            assert image.key == image.compute_key()
+            assert sorted(image.legal_moves()) == sorted(map_move(mv, t) for mv in pos.legal_moves())
+            if pos.legal_moves():
+                mv = pos.legal_moves()[0]
+                child = pos.clone()
+                child.push(*mv)
+                image.push(*map_move(mv, t))
+                assert image.key == transform(child, t).key
+                assert image.winner == child.winner and image.closed == transform(child, t).closed
+
+
+def test_symmetric_positions_share_canonical_key():
+    for seed in range(20):
+        pos = random_position(seed, seed + 5)
+        key, t = canonical_key(pos)
+        canon, _ = canonicalize(pos)
+        assert canon.key == key and transform(pos, t).key == key
+        for u in range(8):
+            assert canonical_key(transform(pos, u))[0] == key
+        mv = (pos.legal_moves() or [(0, 0)])[0]
+        assert unmap_move(map_move(mv, t), t) == mv
+
+
+def test_superboard_canonical():
+    sb = SuperBoard()
+    sb.make_move(2, board=0)  # corner of the corner board
+    canon, t = sb.canonical()
+    assert canon.next_board == PERMS[t][2]
+    other = SuperBoard()
+    other.make_move(6, board=8)
+    assert other.canonical()[0].to_bitboard().key == canon.to_bitboard().key
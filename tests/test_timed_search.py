@@ -0,0 +1,32 @@
+import time
+import pytest
+from game_engine import SuperBoard, Strategy, TranspositionTable, O
+from Minimax import legal_moves
+
+
+def test_timed_pick_respects_max_depth():
+    sb = SuperBoard()
+    sb.make_move(4, board=4)
+    move, depth = Strategy.timed_pick(sb, time_ms=10000, max_depth=3)
+    assert depth == 3
+    assert move == Strategy.minimax_pick(sb, depth=3)
+
+
+def test_timed_pick_meets_deadline():
+    sb = SuperBoard()
+    start = time.perf_counter()
+    move, depth = Strategy.timed_pick(sb, time_ms=200, max_depth=81, tt=TranspositionTable(size_mb=1))
+    elapsed = time.perf_counter() - start
+    assert move in list(legal_moves(sb))
+    assert depth >= 1
+    assert elapsed < 1.0
+
+
+def test_ai_player_is_deprecated():
+    sb = SuperBoard()
+    sb.make_move(4, board=4)
+    with pytest.warns(DeprecationWarning):
+        move = Strategy.minimax_pick(sb, depth=2, ai_player=O)
+    assert move == Strategy.minimax_pick(sb, depth=2)
+    with pytest.warns(DeprecationWarning):
+        assert Strategy.timed_pick(sb, time_ms=10000, max_depth=2, ai_player=O) == (move, 2)
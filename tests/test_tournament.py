@@ -0,0 +1,37 @@
+import json
+from tournament import Engine, play_game, run_tournament, score_interval, elo_difference
+from game_engine import SuperBoard, X, O
+from game_records import GameReader
+
+
+def test_engine_specs():
+    sb = SuperBoard()
+    for spec in ('random', 'minimax:2', 'timed:20', 'mcts:20'):
+        move, nodes = Engine(spec, seed=1).pick(sb)
+        assert 0 <= move[0] <= 8 and 0 <= move[1] <= 8
+
+
+def test_play_game_finishes():
+    game = play_game('minimax:1', 'random', [(4, 4)], seed=3)
+    assert game['moves'][0] == (4, 4)
+    assert game['winner'] in (X, O, None)
+    assert len(game['stats'][X]['latency']) + len(game['stats'][O]['latency']) == len(game['moves']) - 1
+
+
+def test_run_tournament_report(tmp_path):
+    records = str(tmp_path / 'games.bin')
+    report = run_tournament(['random', 'minimax:1'], games_per_pair=4, seed=2, records=records)
+    json.dumps(report)
+    with GameReader(records) as reader:
+        assert len(reader) == 4 and {reader[0].x_engine, reader[0].o_engine} == {'random', 'minimax:1'}
+    (m,) = report['matchups']
+    assert m['wins'] + m['draws'] + m['losses'] == 4
+    assert report['engines']['random']['elo'] == 0
+    assert report['engines']['minimax:1']['latency_ms']['p95'] is not None
+
+
+def test_score_interval_and_elo():
+    mean, lo, hi = score_interval(6, 2, 2)
+    assert lo < mean == 0.7 < hi
+    assert elo_difference(0.5) == 0
+    assert elo_difference(0.75) > 0
@@ -0,0 +1,54 @@
+import random
+from bitboard import BitBoard
+from game_engine import SuperBoard
+from Minimax import minimax, legal_moves, Searcher
+from transposition import TranspositionTable, EXACT, LOWER
+
+
+def test_incremental_key_matches_full_hash():
+    rng = random.Random(3)
+    pos = BitBoard()
+    keys = []
+    while pos.winner is None and pos.legal_moves():
+        keys.append(pos.key)
+        pos.push(*rng.choice(pos.legal_moves()))
+        assert pos.key == pos.compute_key()
+        assert pos.key == SuperBoard.from_bitboard(pos).to_bitboard().key
+    while keys:
+        pos.pop()
+        assert pos.key == keys.pop()
+
+
+def test_store_probe_and_memory_cap():
+    tt = TranspositionTable(size_mb=0.001)
+    assert tt.size_bytes <= 0.001 * 2**20
+    tt.store(12345, 3, LOWER, -250, (4, 7))
+    assert tt.probe(12345) == (3, LOWER, -250, (4, 7))
+    assert tt.probe(54321) is None
+
+
+def test_depth_preferred_slot_survives_shallow_stores():
+    tt = TranspositionTable(size_mb=0.001)
+    deep = 7
+    shallow = deep + tt.buckets  # same bucket
+    tt.store(deep, 6, EXACT, 10, (0, 0))
+    tt.store(shallow, 1, EXACT, 20, (1, 1))
+    assert tt.probe(deep) == (6, EXACT, 10, (0, 0))
+    assert tt.probe(shallow) == (1, EXACT, 20, (1, 1))
+    tt.new_search()
+    tt.store(shallow + tt.buckets, 1, EXACT, 30, (2, 2))
+    assert tt.probe(deep) is None
+
+
+def test_search_with_table_matches_plain_search():
+    rng = random.Random(11)
+    sb = SuperBoard()
+    for _ in range(12):
+        b, p = rng.choice(list(legal_moves(sb)))
+        sb.make_move(p, board=b)
+    pos = sb.to_bitboard()
+    expected, _ = minimax(sb.clone(), True, sb.current_player, 4)
+    tt = TranspositionTable(size_mb=1)
+    assert Searcher(tt).search(pos, 4) == expected
+    assert tt.stores > 0
+    assert Searcher(tt).search(pos, 4) == expected  # answered from the table
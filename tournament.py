@@ -0,0 +1,277 @@
+import argparse
+import itertools
+import json
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from game_engine import SuperBoard, Strategy, TranspositionTable, MCTSTree, X, O
+from Minimax import Searcher, legal_moves
+from evaluation import EvalBoard
+from endgame import Solver
+from game_records import GameWriter, GameRecord, result_code
+
+
+class Engine:
+    """
+    A tournament player built from a spec string, so workers can rebuild it:
+
+        random          Strategy.random_pick, redrawn until the move is legal
+        minimax:D       fixed-depth search (Searcher.pick) to depth D
+        timed:MS        iterative deepening with MS milliseconds per move
+        mcts:MS         Monte Carlo tree search with MS milliseconds per move
+
+    minimax and timed play like the AI worker without its opening book:
+    the endgame solver first (Solver.pick_move), then the search, with a
+    transposition table and solver kept for the whole game. pick() returns
+    (move, nodes); for MCTS nodes counts playouts.
+    """
+
+    def __init__(self, spec, seed=None):
+        self.spec = spec
+        kind, _, arg = spec.partition(':')
+        if kind not in ('random', 'minimax', 'timed', 'mcts'):
+            raise ValueError(f"Unknown engine spec: {spec}")
+        self.kind = kind
+        self.arg = int(arg) if arg else None
+        self.seed = seed
+        self.new_game()
+
+    def new_game(self):
+        self.tt = TranspositionTable(size_mb=8) if self.kind in ('minimax', 'timed') else None
+        self.solver = Solver() if self.tt is not None else None
+        self.tree = MCTSTree(seed=self.seed) if self.kind == 'mcts' else None
+
+    def pick(self, sb):
+        if self.kind == 'random':
+            while True:
+                board, position = Strategy.random_pick()
+                if (board, position) in legal_moves(sb):
+                    return (board, position), 0
+        pos = EvalBoard.from_superboard(sb) if self.tt is not None else sb.to_bitboard()
+        pos.check_winner()
+        if self.kind == 'mcts':
+            move = self.tree.search(pos, time_ms=self.arg or 1000)
+            return move, self.tree.last_playouts
+        start = time.perf_counter()
+        time_ms = (self.arg or 1000) if self.kind == 'timed' else None
+        solved = self.solver.pick_move(pos, time_ms)
+        if solved is not None:
+            return solved[0], self.solver.nodes if solved[1] is not None else 0
+        self.tt.new_search()
+        searcher = Searcher(self.tt)
+        if self.kind == 'minimax':
+            _, move = searcher.pick(pos, self.arg or 4)
+        else:
+            _, move, _ = searcher.iterate(pos, time_ms=max(1, time_ms - (time.perf_counter() - start) * 1000))
+        return move, searcher.nodes
+
+
+def random_opening(plies, rng):
+    """A list of random legal (board, position) moves from the start position."""
+    sb = SuperBoard()
+    moves = []
+    for _ in range(plies):
+        options = list(legal_moves(sb))
+        if sb.winner or not options:
+            break
+        board, position = rng.choice(options)
+        sb.make_move(position, board=board)
+        moves.append((board, position))
+    return moves
+
+
+def play_game(x_spec, o_spec, opening, seed):
+    """
+    Play one game after the given opening moves. Returns a dict with the
+    winner ('X', 'O' or None), the move list and per-side move latencies
+    (seconds) and node counts.
+    """
+    random.seed(seed)
+    engines = {X: Engine(x_spec, seed), O: Engine(o_spec, seed + 1)}
+    stats = {X: {'latency': [], 'nodes': 0}, O: {'latency': [], 'nodes': 0}}
+    sb = SuperBoard()
+    moves = []
+    for board, position in opening:
+        sb.make_move(position, board=board)
+        moves.append((board, position))
+    while not sb.winner and any(True for _ in legal_moves(sb)):
+        player = sb.current_player
+        start = time.perf_counter()
+        (board, position), nodes = engines[player].pick(sb)
+        stats[player]['latency'].append(time.perf_counter() - start)
+        stats[player]['nodes'] += nodes
+        sb.make_move(position, board=board)
+        moves.append((board, position))
+    return {'x': x_spec, 'o': o_spec, 'winner': sb.winner, 'moves': moves, 'stats': stats}
+
+
+def score_interval(wins, draws, losses, z=1.96):
+    """Mean score (win=1, draw=0.5) and its normal-approximation confidence interval."""
+    n = wins + draws + losses
+    if n == 0:
+        return 0.5, 0.0, 1.0
+    mean = (wins + 0.5 * draws) / n
+    var = (wins * (1 - mean) ** 2 + draws * (0.5 - mean) ** 2 + losses * mean ** 2) / n
+    half = z * math.sqrt(var / n)
+    return mean, max(0.0, mean - half), min(1.0, mean + half)
+
+
+def elo_difference(score):
+    """Elo difference implied by an expected score, clamped away from +/-infinity."""
+    score = min(max(score, 1e-3), 1 - 1e-3)
+    return -400 * math.log10(1 / score - 1)
+
+
+def fit_elo(specs, pair_scores, iterations=200):
+    """
+    Fit one rating per engine to all pairwise results (Bradley-Terry by
+    gradient steps on the logistic model), anchored so the first engine
+    is 0. pair_scores maps (a, b) to (points for a, games).
+    """
+    ratings = {s: 0.0 for s in specs}
+    for _ in range(iterations):
+        grad = {s: 0.0 for s in specs}
+        for (a, b), (points, games) in pair_scores.items():
+            expected = games / (1 + 10 ** ((ratings[b] - ratings[a]) / 400))
+            grad[a] += points - expected
+            grad[b] -= points - expected
+        for s in specs:
+            ratings[s] += 10 * grad[s] / max(1, sum(g for (a, b), (_, g) in pair_scores.items() if s in (a, b)))
+    anchor = ratings[specs[0]]
+    return {s: r - anchor for s, r in ratings.items()}
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * q
+    lo = math.floor(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_tournament(specs, games_per_pair=10, opening_plies=2, workers=1, seed=0, records=None):
+    """
+    Round robin between every pair of engine specs. Games come in pairs that
+    share a random opening with colours swapped. Returns a JSON-ready dict.
+    records, a game_records file path, gets every game appended to it.
+    """
+    rng = random.Random(seed)
+    tasks = []
+    for a, b in itertools.combinations(specs, 2):
+        for i in range(0, games_per_pair, 2):
+            opening = random_opening(opening_plies, rng)
+            game_seed = rng.randrange(2**31)
+            tasks.append((a, b, opening, game_seed))
+            if i + 1 < games_per_pair:
+                tasks.append((b, a, opening, game_seed))
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            games = list(pool.map(play_game, *zip(*tasks)))
+    else:
+        games = [play_game(*t) for t in tasks]
+    elapsed = time.perf_counter() - start
+
+    if records:
+        with GameWriter(records) as writer:
+            for g in games:
+                moves = bytes(b * 9 + p for b, p in g['moves'])
+                writer.write(GameRecord(moves, result_code(g['winner']), g['x'], g['o'], X))
+
+    per_engine = {s: {'latency': [], 'nodes': 0} for s in specs}
+    pairs = {}
+    for g in games:
+        for side, spec in ((X, g['x']), (O, g['o'])):
+            per_engine[spec]['latency'] += g['stats'][side]['latency']
+            per_engine[spec]['nodes'] += g['stats'][side]['nodes']
+        a, b = sorted((g['x'], g['o']), key=specs.index)
+        wdl = pairs.setdefault((a, b), [0, 0, 0])
+        a_side = X if g['x'] == a else O
+        if g['winner'] is None:
+            wdl[1] += 1
+        elif g['winner'] == a_side:
+            wdl[0] += 1
+        else:
+            wdl[2] += 1
+
+    matchups = []
+    pair_scores = {}
+    for (a, b), (w, d, l) in pairs.items():
+        mean, lo, hi = score_interval(w, d, l)
+        pair_scores[(a, b)] = (w + 0.5 * d, w + d + l)
+        matchups.append({
+            'engine': a, 'opponent': b, 'wins': w, 'draws': d, 'losses': l,
+            'score': mean, 'score_ci95': [lo, hi],
+            'elo_diff': elo_difference(mean),
+            'elo_diff_ci95': [elo_difference(lo), elo_difference(hi)],
+        })
+
+    ratings = fit_elo(specs, pair_scores)
+    engines = {}
+    for spec in specs:
+        lat = per_engine[spec]['latency']
+        total = sum(lat)
+        engines[spec] = {
+            'elo': ratings[spec],
+            'moves': len(lat),
+            'latency_ms': {
+                'mean': 1000 * total / len(lat) if lat else None,
+                'p50': 1000 * percentile(lat, 0.50) if lat else None,
+                'p95': 1000 * percentile(lat, 0.95) if lat else None,
+                'p99': 1000 * percentile(lat, 0.99) if lat else None,
+            },
+            'nodes': per_engine[spec]['nodes'],
+            'nodes_per_second': per_engine[spec]['nodes'] / total if total else None,
+        }
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {'engines': specs, 'games_per_pair': games_per_pair,
+                   'opening_plies': opening_plies, 'workers': workers, 'seed': seed},
+        'elapsed_seconds': elapsed,
+        'games': len(games),
+        'matchups': matchups,
+        'engines': engines,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Round-robin tournament between AI engines.")
+    parser.add_argument('engines', nargs='+', help="engine specs, e.g. random minimax:2 timed:200 mcts:200")
+    parser.add_argument('--games', type=int, default=10, help="games per pair of engines")
+    parser.add_argument('--opening-plies', type=int, default=2)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='tournament.json')
+    parser.add_argument('--records', help="append the games to this game_records file")
+    args = parser.parse_args()
+
+    for spec in args.engines:
+        Engine(spec)  # fail fast on a bad spec
+    report = run_tournament(args.engines, args.games, args.opening_plies, args.workers, args.seed,
+                            args.records)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for m in report['matchups']:
+        lo, hi = m['score_ci95']
+        print(f"{m['engine']:>14} vs {m['opponent']:<14} +{m['wins']} ={m['draws']} -{m['losses']}  "
+              f"score {m['score']:.3f} [{lo:.3f}, {hi:.3f}]  elo {m['elo_diff']:+.0f}")
+    for spec, e in report['engines'].items():
+        lat = e['latency_ms']
+        if lat['mean'] is None:
+            continue
+        nps = e['nodes_per_second']
+        print(f"{spec:>14}  elo {e['elo']:+6.0f}  latency ms mean {lat['mean']:.1f} "
+              f"p50 {lat['p50']:.1f} p95 {lat['p95']:.1f} p99 {lat['p99']:.1f}  "
+              f"nps {nps or 0:.0f}")
+    print(f"results written to {args.out}")
+
+
+if __name__ == '__main__':
+    main()
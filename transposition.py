@@ -0,0 +1,81 @@
+from array import array
+
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+ENTRY_BYTES = 16  # one 64-bit key plus one 64-bit packed entry per slot
+
+_SCORE_OFFSET = 1 << 20
+
+
+class TranspositionTable:
+    """
+    Fixed-size hash table of search results keyed by BitBoard.key.
+
+    Slots come in pairs: the first slot of a bucket keeps the deepest
+    result (depth-preferred), the second is always replaced. Each entry is
+    tagged with the generation of the search that wrote it, and entries
+    from older generations lose their depth preference, so one table can
+    be kept for a whole game with new_search() called before every move.
+
+    Entries pack score, best move, depth, bound type and generation into a
+    single int: (score + 2**20) << 24 | move << 17 | depth << 10 | flag << 8 | gen
+    """
+
+    def __init__(self, size_mb=16):
+        slots = max(2, int(size_mb * 2**20) // ENTRY_BYTES) & ~1
+        self.buckets = slots // 2
+        self.keys = array('Q', bytes(8 * slots))
+        self.data = array('q', bytes(8 * slots))
+        self.generation = 0
+        self.hits = 0
+        self.stores = 0
+
+    def __len__(self):
+        return sum(1 for d in self.data if d)
+
+    @property
+    def size_bytes(self):
+        return len(self.keys) * ENTRY_BYTES
+
+    def clear(self):
+        n = len(self.keys)
+        self.keys = array('Q', bytes(8 * n))
+        self.data = array('q', bytes(8 * n))
+        self.generation = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self):
+        """Start a new generation; older entries become replaceable."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def probe(self, key):
+        """Return (depth, flag, score, move) for key, or None."""
+        slot = (key % self.buckets) * 2
+        for s in (slot, slot + 1):
+            d = self.data[s]
+            if d and self.keys[s] == key:
+                self.hits += 1
+                move = (d >> 17) & 0x7F
+                return ((d >> 10) & 0x7F, (d >> 8) & 0x3,
+                        (d >> 24) - _SCORE_OFFSET,
+                        None if move == 0 else divmod(move - 1, 9))
+        return None
+
+    def store(self, key, depth, flag, score, move):
+        slot = (key % self.buckets) * 2
+        packed = ((score + _SCORE_OFFSET) << 24
+                  | (0 if move is None else move[0] * 9 + move[1] + 1) << 17
+                  | depth << 10 | flag << 8 | self.generation)
+        old = self.data[slot]
+        if (not old or self.keys[slot] == key
+                or (old & 0xFF) != self.generation
+                or depth >= (old >> 10) & 0x7F):
+            self.keys[slot] = key
+            self.data[slot] = packed
+        else:
+            self.keys[slot + 1] = key
+            self.data[slot + 1] = packed
+        self.stores += 1